@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # THE RESPONSE CACHE (FORUM.RESPONSE_CACHE) IS PROCESS-WIDE LOCAL MEMORY;
+    # EVERY TEST STARTS WITH IT EMPTY
+    from django.core.cache import cache
+
+    cache.clear()
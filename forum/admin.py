@@ -5,7 +5,7 @@ from .models import Post, Thread
 
 @admin.register(Thread)
 class ThreadAdmin(admin.ModelAdmin):
-    list_display = ("id", "title", "slug", "author", "created_at")
+    list_display = ("id", "title", "slug", "author", "created_at", "posts_count")
     search_fields = ("title", "slug", "author__username")
     list_select_related = ("author",)
 
@@ -1,6 +1,8 @@
+from django.urls import path
 from rest_framework_nested import routers
 
-from .views import PostViewSet, ThreadViewSet
+from .search import SearchView
+from .views import PostViewSet, ThreadViewSet, thread_stream
 
 router = routers.DefaultRouter()
 router.register(r"threads", ThreadViewSet, basename="thread")
@@ -8,4 +10,8 @@ router.register(r"threads", ThreadViewSet, basename="thread")
 threads_router = routers.NestedDefaultRouter(router, r"threads", lookup="thread")
 threads_router.register(r"posts", PostViewSet, basename="thread-posts")
 
-urlpatterns = router.urls + threads_router.urls
+urlpatterns = [
+    path("search/", SearchView.as_view(), name="search"),
+    path("threads/<slug:thread_slug>/stream/", thread_stream, name="thread-stream"),
+]
+urlpatterns += router.urls + threads_router.urls
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ForumConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "forum"
+
+    def ready(self):
+        # IMPORT SIGNALS TO MAINTAIN DENORMALIZED THREAD COUNTERS
+
+        from . import signals  # NOQA: F401
@@ -0,0 +1,37 @@
+from django.db import connection
+
+from .models import PostTombstone
+
+# "CHANGES SINCE" SYNC FOR A THREAD'S POSTS (GET .../POSTS/?SINCE=<TOKEN>).
+#
+# POSTS CARRY CHANGE_XID, THE TRANSACTION THAT LAST CHANGED WHAT READERS SEE,
+# AND DELETED POSTS LEAVE A TOMBSTONE; BOTH ARE WRITTEN BY DATABASE TRIGGERS
+# (FORUM/MIGRATIONS/0010_POST_CHANGES.PY), SO RAW-SQL WRITES COUNT TOO.
+#
+# A TOKEN IS THE XMIN OF A SNAPSHOT TAKEN BEFORE THE READ: ANY WRITE THE READ
+# COULD NOT SEE BELONGS TO A TRANSACTION AT OR ABOVE IT, SO ``CHANGE_XID >=
+# TOKEN`` NEVER MISSES A CHANGE THAT COMMITS LATE. IT MAY REPEAT A FEW THE
+# CLIENT ALREADY HAS; DELTAS ARE APPLIED IDEMPOTENTLY.
+
+
+def current_token():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def parse_token(raw):
+    try:
+        token = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return token if token >= 0 else None
+
+
+def deleted_since(thread_id, since):
+    return list(
+        PostTombstone.objects.filter(thread_id=thread_id, change_xid__gte=since)
+        .order_by("post_id")
+        .values_list("post_id", flat=True)
+        .distinct()
+    )
@@ -0,0 +1,58 @@
+import json
+
+from lucky_forums.pubsub import get_broker
+
+# PER-THREAD CHANNEL FOR THE THREAD STREAM (FORUM.VIEWS.THREAD_STREAM).
+# POSTVIEWSET PUBLISHES ONE COMPACT DELTA PER WRITE; EVERY READER OF THE THREAD
+# RECEIVES THE SAME MESSAGE, SO FAN-OUT COSTS NO QUERIES PER VIEWER. MY_VOTE IS
+# NEVER INCLUDED: CLIENTS KNOW THEIR OWN VOTE.
+
+# POSTGRES NOTIFY PAYLOADS MUST STAY UNDER 8000 BYTES; LARGER DELTAS GO OUT
+# WITHOUT BODY_HTML AND ``PARTIAL``, AND THE CLIENT FETCHES THE POST
+
+MAX_DELTA_BYTES = 7000
+
+
+def thread_channel(thread_id):
+    return f"thread:{thread_id}"
+
+
+def post_delta(post, op):
+    from .serializers import UserInlineSerializer
+
+    data = {"op": op, "id": post.id}
+    if op == "created":
+        data.update(
+            author=UserInlineSerializer(post.author).data,
+            body_html=post.get_body_html(),
+            created_at=int(post.created_at.timestamp()),
+            score=post.score,
+        )
+    elif op == "edited":
+        data.update(
+            body_html=post.get_body_html(),
+            last_edited_at=int(post.edited_at.timestamp()) if post.edited_at else None,
+            edit_count=post.edits.count(),
+        )
+    if len(json.dumps(data)) > MAX_DELTA_BYTES:
+        data.pop("body_html")
+        data["partial"] = True
+    return data
+
+
+def publish_post(post, op):
+    """OP: CREATED | EDITED."""
+
+    _publish(post.thread_id, post_delta(post, op))
+
+
+def publish_post_deleted(thread_id, post_id):
+    _publish(thread_id, {"op": "deleted", "id": post_id})
+
+
+def publish_score(thread_id, post_id, score):
+    _publish(thread_id, {"op": "scored", "id": post_id, "score": score})
+
+
+def _publish(thread_id, data):
+    get_broker().publish(thread_channel(thread_id), {"event": "post", "data": data})
@@ -0,0 +1,77 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from lucky_forums.utils import MAX_RENDER_CHARS, MarkdownRenderer
+
+
+def short_posts(n, rng):
+    words = ["hello", "**bold**", "*em*", "`code`", "@alice", "thanks!", "lol", "+1"]
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(3, 25))) for _ in range(n)
+    ]
+
+
+def long_posts(n, rng):
+    block = (
+        "## heading\n\n"
+        "some paragraph text with a [link](https://example.com) and @bob.\n\n"
+        "- item one\n- item two\n  - nested\n\n"
+        "> quoted reply\n\n"
+        "```\nprint('hello')\n```\n\n"
+        "1. first\n2. second\n\n"
+    )
+    return [block * rng.randint(20, 60) for _ in range(n)]
+
+
+def adversarial_posts(n, rng):
+    # SHAPES THAT ARE SLOW FOR REGEX-HEAVY MARKDOWN PARSERS OR BLOW UP OUTPUT
+    samples = [
+        ">" * 2000 + " deep quote",
+        "*" * 10000,
+        "[" * 5000 + "x" + "]" * 5000,
+        "_a" * 8000,
+        "<div>" * 3000,
+        "- " * 4000 + "x",
+        "@" + "a" * 20000,
+        "x" * (MAX_RENDER_CHARS + 1),
+    ]
+    return [samples[i % len(samples)] for i in range(n)]
+
+
+CORPORA = {"short": short_posts, "long": long_posts, "adversarial": adversarial_posts}
+
+
+class Command(BaseCommand):
+    help = "benchmark markdown rendering throughput over short/long/adversarial posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200, help="posts per corpus")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--corpus", choices=["all", *CORPORA], default="all")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        names = list(CORPORA) if options["corpus"] == "all" else [options["corpus"]]
+        renderer = MarkdownRenderer()
+
+        self.stdout.write(
+            f"{'corpus':<12} {'posts':>6} {'chars':>10} {'secs':>8} "
+            f"{'posts/s':>10} {'MB/s':>7} {'slowest':>8}"
+        )
+        for name in names:
+            texts = CORPORA[name](options["count"], rng)
+            slowest = 0.0
+            started = time.perf_counter()
+            for text in texts:
+                t0 = time.perf_counter()
+                renderer.render(text)
+                slowest = max(slowest, time.perf_counter() - t0)
+            elapsed = time.perf_counter() - started
+            chars = sum(len(t) for t in texts)
+            self.stdout.write(
+                f"{name:<12} {len(texts):>6} {chars:>10} {elapsed:>8.3f} "
+                f"{len(texts) / elapsed:>10.1f} {chars / elapsed / 1e6:>7.2f} "
+                f"{slowest:>8.3f}"
+            )
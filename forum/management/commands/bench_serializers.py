@@ -0,0 +1,135 @@
+import time
+import tracemalloc
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from forum.models import Post, Thread
+from forum.views import PostViewSet, ThreadViewSet
+from lucky_forums.utils import RENDER_VERSION
+from users.models import Notification
+from users.notifications_api import NOTIFICATION_ROWS, _notification_rows
+
+User = get_user_model()
+
+
+def _view(viewset, **kwargs):
+    view = viewset()
+    view.request = Request(APIRequestFactory().get("/"))
+    view.kwargs = kwargs
+    view.action = "list"
+    view.format_kwarg = None
+    return view
+
+
+def _seed(rows, authors):
+    tag = uuid.uuid4().hex[:8]
+    users = [User.objects.create(username=f"bench_{tag}_{i}") for i in range(authors)]
+    now = timezone.now()
+    Thread.objects.bulk_create(
+        Thread(
+            title=f"bench thread {i}",
+            slug=f"bench-{tag}-{i}",
+            author=users[i % authors],
+            last_post_author=users[(i + 1) % authors],
+            last_post_at=now,
+        )
+        for i in range(rows)
+    )
+    thread = Thread.objects.create(title="bench", author=users[0])
+    Post.objects.bulk_create(
+        Post(
+            thread=thread,
+            author=users[i % authors],
+            body=f"post {i}",
+            body_html=f"<p>post {i}</p>",
+            body_html_version=RENDER_VERSION,
+        )
+        for i in range(rows)
+    )
+    Notification.objects.bulk_create(
+        Notification(user=users[0], type="mention", payload={"actor": "x", "i": i})
+        for i in range(rows)
+    )
+    return users[0], thread
+
+
+def _cases(reader, thread, rows):
+    threads = _view(ThreadViewSet)
+    posts = _view(PostViewSet, thread_slug=thread.slug)
+    inbox = Notification.objects.filter(user=reader).order_by("-created_at", "-id")
+
+    def serialized(view):
+        return lambda: view.get_serializer(view.get_queryset()[:rows], many=True).data
+
+    def planned(view):
+        plan = view.get_row_plan()
+        return lambda: plan.build(plan.rows(view.get_queryset()[:rows]))
+
+    return {
+        "threads": (serialized(threads), planned(threads)),
+        "posts": (serialized(posts), planned(posts)),
+        "notifications": (
+            lambda: _notification_rows(inbox[:rows]),
+            lambda: NOTIFICATION_ROWS.build(NOTIFICATION_ROWS.rows(inbox[:rows])),
+        ),
+    }
+
+
+def _measure(run, repeat):
+    run()  # WARM UP (PLAN COMPILATION, CONNECTION)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(out), best, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "benchmark list serialization: drf serializers vs fast-path row plans "
+        "(seeds rows in a transaction that is rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="rows per list")
+        parser.add_argument("--authors", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--list",
+            choices=["all", "threads", "posts", "notifications"],
+            default="all",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        self.stdout.write(
+            f"{'list':<14} {'mode':<11} {'rows':>6} {'secs':>8} "
+            f"{'rows/s':>10} {'peak B/row':>11} {'speedup':>8}"
+        )
+        with transaction.atomic():
+            reader, thread = _seed(rows, max(1, options["authors"]))
+            cases = _cases(reader, thread, rows)
+            names = list(cases) if options["list"] == "all" else [options["list"]]
+            for name in names:
+                baseline = None
+                for mode, run in zip(("serializer", "row plan"), cases[name]):
+                    count, secs, peak = _measure(run, options["repeat"])
+                    baseline = baseline or secs
+                    self.stdout.write(
+                        f"{name:<14} {mode:<11} {count:>6} {secs:>8.3f} "
+                        f"{count / secs:>10.0f} {peak / max(count, 1):>11.0f} "
+                        f"{baseline / secs:>7.1f}x"
+                    )
+            transaction.set_rollback(True)
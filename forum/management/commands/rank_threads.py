@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from forum.ranking import recompute_hot_scores
+
+
+class Command(BaseCommand):
+    help = "recompute hot_score for threads with activity since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="rank every thread, not just active ones",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = recompute_hot_scores(
+            full=options["full"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"ranked {total} thread(s).")
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from forum import markers
+from forum.models import Post, Thread
+
+
+def reconcile_thread_counters(queryset):
+    """RECOMPUTE POSTS_COUNT / LAST_POST_* FROM FORUM_POST FOR THE GIVEN THREADS.
+
+    LAST_ACTIVITY_AT IS ONLY EVER MOVED FORWARD.
+    """
+
+    latest = Post.objects.filter(thread_id=OuterRef("pk")).order_by(
+        "-created_at", "-id"
+    )
+    count = (
+        Post.objects.filter(thread_id=OuterRef("pk"))
+        .order_by()
+        .values("thread_id")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    return queryset.update(
+        posts_count=Coalesce(Subquery(count, output_field=IntegerField()), Value(0)),
+        last_post_at=Subquery(latest.values("created_at")[:1]),
+        last_post_author_id=Subquery(latest.values("author_id")[:1]),
+        last_activity_at=Greatest(
+            F("last_activity_at"), Subquery(latest.values("created_at")[:1])
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = "reconcile denormalized thread counters (posts_count, last_post_*)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--slug", help="only reconcile this thread")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        qs = Thread.objects.order_by("id")
+        if options.get("slug"):
+            qs = qs.filter(slug=options["slug"])
+        batch = max(1, options["batch_size"])
+
+        # WALK IDS IN BOUNDED BATCHES SO A LARGE TABLE IS NEVER LOCKED AT ONCE
+
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch])
+            if not ids:
+                break
+            with transaction.atomic():
+                total += reconcile_thread_counters(Thread.objects.filter(id__in=ids))
+            last_id = ids[-1]
+        if total:
+            markers.touch(markers.THREADS)
+        self.stdout.write(f"reconciled {total} thread(s).")
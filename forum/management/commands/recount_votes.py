@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from forum import markers
+from forum.models import Post, PostRating
+
+
+def _tally(value):
+    votes = (
+        PostRating.objects.filter(post_id=OuterRef("pk"), value=value)
+        .order_by()
+        .values("post_id")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    return Coalesce(Subquery(votes, output_field=IntegerField()), Value(0))
+
+
+def reconcile_post_tallies(queryset):
+    """RECOMPUTE UPVOTES / DOWNVOTES / SCORE FROM FORUM_POSTRATING."""
+
+    return queryset.update(
+        upvotes=_tally(1), downvotes=_tally(-1), score=_tally(1) - _tally(-1)
+    )
+
+
+class Command(BaseCommand):
+    help = "reconcile stored post vote tallies (upvotes, downvotes, score)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--thread", help="only reconcile posts in this thread")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        qs = Post.objects.order_by("id")
+        if options.get("thread"):
+            qs = qs.filter(thread__slug=options["thread"])
+        batch = max(1, options["batch_size"])
+
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch])
+            if not ids:
+                break
+            with transaction.atomic():
+                posts = Post.objects.filter(id__in=ids)
+                total += reconcile_post_tallies(posts)
+                thread_ids = posts.values_list("thread_id", flat=True).distinct()
+                markers.touch(*map(markers.thread_posts, thread_ids))
+            last_id = ids[-1]
+        self.stdout.write(f"reconciled {total} post(s).")
@@ -0,0 +1,112 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from forum import markers
+from forum.models import Post
+from lucky_forums.utils import (
+    RENDER_VERSION,
+    render_markdown_many,
+    render_markdown_safe,
+)
+from users.mentions import link_mentions_many
+from users.models import ProfileComment
+
+MODELS = {"posts": Post, "comments": ProfileComment}
+
+# THE LIST EACH ROW IS SERVED IN, BY ITS CHANGE MARKER (FORUM.MARKERS)
+
+SCOPES = {
+    Post: ("thread_id", markers.thread_posts),
+    ProfileComment: ("profile_id", markers.profile_comments),
+}
+
+
+class Command(BaseCommand):
+    help = "re-render stored body_html for posts and profile comments in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model", choices=["all", *MODELS], default="all", help="what to render"
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="re-render every row, not only rows with a stale version stamp",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="render processes; 1 renders in-process",
+        )
+
+    def handle(self, *args, **options):
+        names = list(MODELS) if options["model"] == "all" else [options["model"]]
+        batch = max(1, options["batch_size"])
+        workers = max(1, options["workers"])
+
+        self.workers = workers
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for name in names:
+                total = self.rerender(MODELS[name], batch, pool, options["force"])
+                self.stdout.write(f"{name}: re-rendered {total} row(s).")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def rerender(self, model, batch, pool, force):
+        qs = model.objects.order_by("id")
+        if not force:
+            qs = qs.exclude(body_html_version=RENDER_VERSION)
+
+        # KEYSET WALK OVER ID; ONLY THE BODY TEXT CROSSES INTO THE WORKERS
+
+        total = 0
+        last_id = 0
+        while True:
+            rows = list(qs.filter(id__gt=last_id).values_list("id", "body")[:batch])
+            if not rows:
+                return total
+            bodies = [body for _, body in rows]
+            if pool is None:
+                rendered = render_markdown_many(bodies)
+            else:
+                chunk = max(1, len(bodies) // (self.workers * 4))
+                rendered = list(pool.map(render_markdown_safe, bodies, chunksize=chunk))
+
+            # WORKERS ONLY RENDER; MENTIONS ARE LINKED HERE, WITH ONE LOOKUP FOR
+            # THE WHOLE BATCH (FORKED WORKERS MUST NOT TOUCH THE INHERITED
+            # DATABASE CONNECTION)
+
+            rendered = link_mentions_many(rendered)
+
+            # SKIP ROWS EDITED WHILE RENDERING; THEIR SAVE ALREADY RE-RENDERED THEM.
+            # CACHED LISTS HOLDING A REWRITTEN ROW ARE RETIRED WITH THE WRITE
+
+            field, scope = SCOPES[model]
+            with transaction.atomic():
+                current = {
+                    pk: (body, owner)
+                    for pk, body, owner in model.objects.select_for_update()
+                    .filter(id__in=[pk for pk, _ in rows])
+                    .values_list("id", "body", field)
+                }
+                objs, owners = [], set()
+                for (pk, body), html in zip(rows, rendered):
+                    if pk in current and current[pk][0] == body:
+                        objs.append(
+                            model(
+                                id=pk, body_html=html, body_html_version=RENDER_VERSION
+                            )
+                        )
+                        owners.add(current[pk][1])
+                model.objects.bulk_update(objs, ["body_html", "body_html_version"])
+                if owners:
+                    markers.touch(*(scope(owner) for owner in owners))
+            total += len(objs)
+            last_id = rows[-1][0]
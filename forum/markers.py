@@ -0,0 +1,142 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ChangeMarker
+
+# SCOPES. LISTS EMBED THEIR AUTHORS; A CHANGE TO AN EMBEDDED USER FIELD TOUCHES
+# ONLY THE SCOPES THAT USER APPEARS IN (TOUCH_AUTHOR)
+
+THREADS = "threads"
+
+
+def user(user_id):
+    # THE PROFILE PAGE
+    return f"user:{user_id}"
+
+
+def thread_posts(thread_id):
+    return f"thread:{thread_id}:posts"
+
+
+def profile_comments(profile_id):
+    return f"profile:{profile_id}:comments"
+
+
+def touch_thread_posts_sql(source):
+    """
+    SQL FOR A DATA-MODIFYING CTE THAT TOUCHES THREAD_POSTS(THREAD_ID) FOR EACH
+    ROW OF THE CTE ``SOURCE``; EXPECTS A %(NOW)S PARAMETER.
+    """
+
+    table = ChangeMarker._meta.db_table
+    return f"""
+    INSERT INTO {table} (name, version, changed_at)
+    SELECT 'thread:' || {source}.thread_id || ':posts', 1, %(now)s FROM {source}
+    ON CONFLICT (name) DO UPDATE SET
+        version = {table}.version + 1,
+        changed_at = EXCLUDED.changed_at
+    """
+
+
+# ONE UPSERT PER SCOPE, IN THE WRITER'S TRANSACTION, SO A NEW VERSION BECOMES
+# VISIBLE EXACTLY WHEN THE DATA IT DESCRIBES DOES. SITE-WIDE SCOPES ARE THE
+# EXCEPTION: EVERY WRITER WOULD QUEUE ON THEIR ONE ROW LOCK UNTIL THE HOLDER
+# COMMITS, SO THEY ARE BUMPED RIGHT AFTER COMMIT IN A STATEMENT OF THEIR OWN.
+# A READER IN BETWEEN MAY STORE NEW DATA UNDER THE OLD VERSION, WHICH THE BUMP
+# THEN RETIRES; IT NEVER STORES OLD DATA UNDER THE NEW ONE
+
+AFTER_COMMIT = frozenset({THREADS})
+
+_TOUCH_SQL = f"""
+INSERT INTO {ChangeMarker._meta.db_table} (name, version, changed_at)
+VALUES (%s, 1, %s)
+ON CONFLICT (name) DO UPDATE SET
+    version = {ChangeMarker._meta.db_table}.version + 1,
+    changed_at = EXCLUDED.changed_at
+"""
+
+
+def _upsert(names):
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        # FIXED LOCK ORDER; CONCURRENT WRITERS NEVER DEADLOCK ON MARKERS
+        cursor.executemany(_TOUCH_SQL, [(name, now) for name in sorted(names)])
+
+
+def touch(*names):
+    """RECORD A WRITE TO EACH NAMED SCOPE."""
+
+    names = set(names)
+    late = names & AFTER_COMMIT
+    if names - late:
+        _upsert(names - late)
+    if late:
+        transaction.on_commit(lambda: _upsert(late))
+
+
+def _touch_author_sql():
+    from users.models import ProfileComment
+
+    from .models import Post, Thread
+
+    table = ChangeMarker._meta.db_table
+    return f"""
+    INSERT INTO {table} (name, version, changed_at)
+    SELECT name, 1, %(now)s FROM (
+        SELECT 'thread:' || thread_id || ':posts' AS name
+            FROM {Post._meta.db_table} WHERE author_id = %(user)s
+        UNION SELECT 'profile:' || profile_id || ':comments'
+            FROM {ProfileComment._meta.db_table} WHERE author_id = %(user)s
+        UNION SELECT %(threads)s WHERE EXISTS (
+            SELECT 1 FROM {Thread._meta.db_table}
+            WHERE author_id = %(user)s OR last_post_author_id = %(user)s
+        )
+    ) scopes
+    ORDER BY name
+    ON CONFLICT (name) DO UPDATE SET
+        version = {table}.version + 1,
+        changed_at = EXCLUDED.changed_at
+    """
+
+
+def touch_author(user_id):
+    """
+    RECORD A CHANGE TO FIELDS OF ``USER_ID`` THAT LISTS EMBED. THE PROFILE
+    PAGE IS TOUCHED NOW; THE LISTS THE USER APPEARS IN ARE TOUCHED AFTER
+    COMMIT IN ONE STATEMENT, LIKE THE FEED (A PROLIFIC AUTHOR SPANS MANY
+    THREAD MARKERS).
+    """
+
+    touch(user(user_id))
+
+    def run():
+        params = {"now": timezone.now(), "user": user_id, "threads": THREADS}
+        with connection.cursor() as cursor:
+            cursor.execute(_touch_author_sql(), params)
+
+    transaction.on_commit(run)
+
+
+def forget(*names):
+    ChangeMarker.objects.filter(name__in=names).delete()
+
+
+def read(*names):
+    """
+    RETURN ([(VERSION, CHANGED_AT UNIX), ...] IN ``NAMES`` ORDER, NEWEST
+    CHANGED_AT OR NONE). SCOPES NEVER TOUCHED READ AS (0, NONE). THE TIMESTAMP
+    KEEPS TOKENS UNIQUE IF THE TABLE IS EVER RESET AND VERSIONS START OVER.
+    """
+
+    rows = dict(
+        (name, (version, changed_at))
+        for name, version, changed_at in ChangeMarker.objects.filter(
+            name__in=names
+        ).values_list("name", "version", "changed_at")
+    )
+    tokens = [
+        (rows[name][0], rows[name][1].timestamp()) if name in rows else (0, None)
+        for name in names
+    ]
+    stamps = [rows[name][1] for name in names if name in rows]
+    return tokens, max(stamps) if stamps else None
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forum", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["thread", "created_at", "id"], name="forum_post_thread_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="thread",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="forum_thread_feed_idx"
+            ),
+        ),
+    ]
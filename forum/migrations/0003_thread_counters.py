@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.functions
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    Thread = apps.get_model("forum", "Thread")
+    Post = apps.get_model("forum", "Post")
+    latest = Post.objects.filter(thread_id=models.OuterRef("pk")).order_by(
+        "-created_at", "-id"
+    )
+    count = (
+        Post.objects.filter(thread_id=models.OuterRef("pk"))
+        .order_by()
+        .values("thread_id")
+        .annotate(c=models.Count("id"))
+        .values("c")
+    )
+    Thread.objects.update(
+        posts_count=models.functions.Coalesce(
+            models.Subquery(count, output_field=models.IntegerField()),
+            models.Value(0),
+        ),
+        last_post_at=models.Subquery(latest.values("created_at")[:1]),
+        last_post_author_id=models.Subquery(latest.values("author_id")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("forum", "0002_post_forum_post_thread_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thread",
+            name="last_post_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="thread",
+            name="last_post_author",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="thread",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
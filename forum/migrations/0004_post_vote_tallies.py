@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:37
+
+from django.db import migrations, models
+import django.db.models.functions
+
+
+def backfill_tallies(apps, schema_editor):
+    Post = apps.get_model("forum", "Post")
+    PostRating = apps.get_model("forum", "PostRating")
+
+    def tally(value):
+        votes = (
+            PostRating.objects.filter(post_id=models.OuterRef("pk"), value=value)
+            .order_by()
+            .values("post_id")
+            .annotate(c=models.Count("id"))
+            .values("c")
+        )
+        return django.db.models.functions.Coalesce(
+            models.Subquery(votes, output_field=models.IntegerField()),
+            models.Value(0),
+        )
+
+    Post.objects.update(
+        upvotes=tally(1), downvotes=tally(-1), score=tally(1) - tally(-1)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forum", "0003_thread_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="downvotes",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="score",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="upvotes",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# KEEP SEARCH_VECTOR CURRENT ON EVERY INSERT AND ON UPDATES THAT TOUCH THE
+# SOURCE TEXT; FULL-ROW ORM SAVES ALSO WRITE SEARCH_VECTOR, SO THEY RECOMPUTE
+
+TRIGGER_SQL = """
+CREATE TRIGGER {table}_search_vector_trg
+BEFORE INSERT OR UPDATE OF {column}, search_vector ON {table}
+FOR EACH ROW EXECUTE FUNCTION
+tsvector_update_trigger(search_vector, 'pg_catalog.english', {column});
+UPDATE {table} SET search_vector = to_tsvector('pg_catalog.english', {column});
+"""
+
+DROP_SQL = "DROP TRIGGER IF EXISTS {table}_search_vector_trg ON {table};"
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forum", "0005_rendered_body_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="thread",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="forum_post_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="thread",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="forum_thread_search_idx"
+            ),
+        ),
+        migrations.RunSQL(
+            TRIGGER_SQL.format(table="forum_thread", column="title"),
+            DROP_SQL.format(table="forum_thread"),
+        ),
+        migrations.RunSQL(
+            TRIGGER_SQL.format(table="forum_post", column="body"),
+            DROP_SQL.format(table="forum_post"),
+        ),
+    ]
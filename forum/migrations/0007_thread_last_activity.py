@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:46
+
+from django.db import migrations, models
+import django.db.models.functions
+import django.utils.timezone
+
+
+def backfill_last_activity(apps, schema_editor):
+    Thread = apps.get_model("forum", "Thread")
+    Thread.objects.update(
+        last_activity_at=django.db.models.functions.Greatest(
+            models.F("created_at"),
+            django.db.models.functions.Coalesce(
+                models.F("last_post_at"), models.F("created_at")
+            ),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forum", "0006_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thread",
+            name="last_activity_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="thread",
+            index=models.Index(
+                fields=["-last_activity_at", "-id"], name="forum_thread_active_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_last_activity, migrations.RunPython.noop),
+    ]
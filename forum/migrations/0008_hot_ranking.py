@@ -0,0 +1,59 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:49
+
+from django.db import migrations, models
+
+# SAME FORMULA AS FORUM.RANKING, WITH THE CONSTANTS FROZEN AT THIS MIGRATION
+
+BACKFILL_HOT_SCORE = """
+UPDATE forum_thread AS t SET hot_score =
+    SIGN(x.points)::float8 * LOG(GREATEST(ABS(x.points), 1)::float8)
+    + (EXTRACT(EPOCH FROM t.last_activity_at)::float8 - 1700000000) / 45000
+FROM (
+    SELECT t2.id, t2.posts_count + COALESCE(SUM(p.score), 0) AS points
+    FROM forum_thread AS t2
+    LEFT JOIN forum_post AS p ON p.thread_id = t2.id
+    GROUP BY t2.id
+) AS x
+WHERE t.id = x.id
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forum", "0007_thread_last_activity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("last_run_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="thread",
+            name="hot_score",
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="postrating",
+            index=models.Index(fields=["created_at"], name="forum_rating_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="thread",
+            index=models.Index(
+                fields=["-hot_score", "-id"], name="forum_thread_hot_idx"
+            ),
+        ),
+        migrations.RunSQL(BACKFILL_HOT_SCORE, migrations.RunSQL.noop),
+    ]
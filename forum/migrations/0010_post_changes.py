@@ -0,0 +1,93 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:16
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+# STAMP POSTS WITH THE WRITING TRANSACTION ON INSERT AND WHENEVER WHAT READERS
+# SEE CHANGES (ORM SAVES, FORUM.VOTING SQL, RECOUNTS AND RE-RENDERS ALIKE), AND
+# LEAVE A TOMBSTONE FOR EVERY DELETED POST; SEE FORUM.CHANGES
+
+TRIGGER_SQL = """
+CREATE FUNCTION forum_post_change_stamp() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT'
+       OR ROW(NEW.body, NEW.body_html, NEW.edited_at, NEW.score)
+          IS DISTINCT FROM ROW(OLD.body, OLD.body_html, OLD.edited_at, OLD.score)
+    THEN
+        NEW.change_xid := pg_current_xact_id()::text::bigint;
+    ELSE
+        NEW.change_xid := OLD.change_xid;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER forum_post_change_trg
+BEFORE INSERT OR UPDATE ON forum_post
+FOR EACH ROW EXECUTE FUNCTION forum_post_change_stamp();
+
+CREATE FUNCTION forum_post_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO forum_posttombstone (thread_id, post_id, change_xid, deleted_at)
+    VALUES (OLD.thread_id, OLD.id, pg_current_xact_id()::text::bigint, now());
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER forum_post_tombstone_trg
+AFTER DELETE ON forum_post
+FOR EACH ROW EXECUTE FUNCTION forum_post_tombstone();
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS forum_post_tombstone_trg ON forum_post;
+DROP FUNCTION IF EXISTS forum_post_tombstone();
+DROP TRIGGER IF EXISTS forum_post_change_trg ON forum_post;
+DROP FUNCTION IF EXISTS forum_post_change_stamp();
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forum", "0009_change_markers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PostTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("thread_id", models.BigIntegerField()),
+                ("post_id", models.BigIntegerField()),
+                ("change_xid", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="change_xid",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["thread", "change_xid"], name="forum_post_change_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="posttombstone",
+            index=models.Index(
+                fields=["thread_id", "change_xid"], name="forum_tombstone_change_idx"
+            ),
+        ),
+        migrations.RunSQL(TRIGGER_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:33
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("forum", "0010_post_changes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "-created_at"], name="forum_post_author_idx"
+            ),
+        ),
+    ]
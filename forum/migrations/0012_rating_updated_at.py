@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# EXISTING VOTES WERE LAST CAST OR FLIPPED AT CREATED_AT (FLIPS USED TO RESTAMP
+# IT); THE COLUMN IS FILLED FROM THERE BEFORE IT BECOMES NOT NULL
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("forum", "0011_post_author_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="postrating",
+            name="forum_rating_created_idx",
+        ),
+        migrations.AddField(
+            model_name="postrating",
+            name="updated_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunSQL(
+            "UPDATE forum_postrating SET updated_at = created_at",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="postrating",
+            name="updated_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="postrating",
+            index=models.Index(fields=["updated_at"], name="forum_rating_updated_idx"),
+        ),
+    ]
@@ -1,10 +1,26 @@
 import uuid
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.text import slugify
 
+from lucky_forums.utils import RenderedBodyMixin
+
+# HOT RANKING: SCORE = SIGN(P) * LOG10(MAX(|P|, 1)) + (T - HOT_EPOCH) / HOT_DECAY,
+# WHERE P IS ENGAGEMENT AND T THE LAST ACTIVITY. THE TIME TERM GROWS FOR NEW
+# ACTIVITY INSTEAD OF DECAYING OLD SCORES, SO A THREAD'S SCORE ONLY CHANGES
+# WHEN IT HAS ACTIVITY (SEE FORUM.RANKING)
+
+HOT_EPOCH = 1_700_000_000
+HOT_DECAY = 45_000
+
+
+def initial_hot_score(at):
+    return (at.timestamp() - HOT_EPOCH) / HOT_DECAY
+
 
 class Thread(models.Model):
     title = models.CharField(max_length=200)
@@ -15,8 +31,44 @@ class Thread(models.Model):
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # DENORMALIZED COUNTERS; MAINTAINED BY FORUM.SIGNALS, RECONCILED BY
+    # `MANAGE.PY RECOUNT_THREADS`
+
+    posts_count = models.PositiveIntegerField(default=0)
+    last_post_at = models.DateTimeField(null=True, blank=True)
+
+    # GREATEST(CREATED_AT, NEWEST POST); ONLY EVER MOVES FORWARD. BACKS THE
+    # ?ORDER=ACTIVE FEED
+
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    last_post_author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
+    # ?ORDER=HOT; RECOMPUTED FOR ACTIVE THREADS BY `MANAGE.PY RANK_THREADS`
+    # (SCHEDULED VIA CELERY BEAT)
+
+    hot_score = models.FloatField(default=0.0, editable=False)
+
+    # FULL-TEXT SEARCH; MAINTAINED BY A DATABASE TRIGGER (SEE FORUM.SEARCH)
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # KEYSET PAGINATION OVER (-CREATED_AT, -ID)
+            models.Index(fields=["-created_at", "-id"], name="forum_thread_feed_idx"),
+            models.Index(
+                fields=["-last_activity_at", "-id"], name="forum_thread_active_idx"
+            ),
+            models.Index(fields=["-hot_score", "-id"], name="forum_thread_hot_idx"),
+            GinIndex(fields=["search_vector"], name="forum_thread_search_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
@@ -32,24 +84,65 @@ class Thread(models.Model):
                     break
             else:
                 self.slug = f"thread-{uuid.uuid4().hex[:8]}"
+        if self._state.adding:
+            self.last_activity_at = self.created_at
+            self.hot_score = initial_hot_score(self.created_at)
         super().save(*args, **kwargs)
 
 
-class Post(models.Model):
+class Post(RenderedBodyMixin, models.Model):
     thread = models.ForeignKey(Thread, on_delete=models.CASCADE, related_name="posts")
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="posts"
     )
     body = models.TextField()
+    body_html = models.TextField(blank=True, default="", editable=False)
+    body_html_version = models.CharField(
+        max_length=32, blank=True, default="", editable=False
+    )
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     edited_at = models.DateTimeField(null=True, blank=True)
 
+    # VOTE TALLIES; ADJUSTED BY DELTA IN FORUM.VOTING (AND FORUM.SIGNALS FOR ORM
+    # WRITES), RECONCILED BY `MANAGE.PY RECOUNT_VOTES`
+
+    upvotes = models.PositiveIntegerField(default=0)
+    downvotes = models.PositiveIntegerField(default=0)
+    score = models.IntegerField(default=0)
+
+    # FULL-TEXT SEARCH; MAINTAINED BY A DATABASE TRIGGER (SEE FORUM.SEARCH)
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # ID OF THE LAST TRANSACTION THAT CHANGED THE VISIBLE ROW (BODY, SCORE,
+    # EDIT TIME); SET BY A DATABASE TRIGGER, SEE FORUM.CHANGES
+
+    change_xid = models.BigIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # KEYSET PAGINATION OVER (CREATED_AT, ID) WITHIN A THREAD
+            models.Index(
+                fields=["thread", "created_at", "id"], name="forum_post_thread_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="forum_post_search_idx"),
+            models.Index(fields=["thread", "change_xid"], name="forum_post_change_idx"),
+            # A USER'S NEWEST POST (RECENT ACTIVITY, SEE USERS.DIRECTORY)
+            models.Index(
+                fields=["author", "-created_at"], name="forum_post_author_idx"
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"post by {self.author} on {self.thread}"
 
+    def save(self, *args, **kwargs):
+        # KEEP THE INSERT AND THE THREAD COUNTER UPDATE (POST_SAVE) IN ONE TRANSACTION
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class PostEdit(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="edits")
@@ -66,6 +159,57 @@ class PostRating(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     value = models.SmallIntegerField(choices=VALUE_CHOICES)
     created_at = models.DateTimeField(default=timezone.now)
+    # LAST CAST OR FLIP (FORUM.VOTING); CREATED_AT NEVER MOVES
+    updated_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ("post", "user")
+        indexes = [
+            # VOTES CAST OR FLIPPED SINCE THE LAST RANKING RUN
+            models.Index(fields=["updated_at"], name="forum_rating_updated_idx"),
+        ]
+
+
+class PostTombstone(models.Model):
+    """
+    A DELETED POST, WRITTEN BY A DATABASE TRIGGER SO ``?SINCE=`` SYNC CAN
+    REPORT DELETIONS (FORUM.CHANGES). THREAD_ID IS A PLAIN COLUMN: ROWS OUTLIVE
+    THEIR POSTS AND ARE DROPPED WITH THE THREAD (FORUM.SIGNALS).
+    """
+
+    thread_id = models.BigIntegerField()
+    post_id = models.BigIntegerField()
+    change_xid = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["thread_id", "change_xid"], name="forum_tombstone_change_idx"
+            ),
+        ]
+
+
+class JobCheckpoint(models.Model):
+    """LAST SUCCESSFUL RUN OF AN INCREMENTAL BACKGROUND JOB."""
+
+    name = models.CharField(max_length=100, unique=True)
+    last_run_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class ChangeMarker(models.Model):
+    """
+    VERSION + TIMESTAMP OF THE LAST WRITE TO A NAMED SCOPE (THE THREAD FEED,
+    ONE THREAD'S POSTS, ...). BUMPED ON WRITE BY FORUM.MARKERS; READ BY
+    CONDITIONAL GET TO BUILD ETAG / LAST-MODIFIED WITHOUT SERIALIZING.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self) -> str:
+        return f"{self.name}@{self.version}"
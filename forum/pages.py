@@ -1,30 +1,20 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, render
 
+from users.viewer import get_viewer
+
 from .models import Thread
 
 
 def home(request):
-    try:
-        from django.utils import timezone as djtz
-
-        prof = request.user.profile if request.user.is_authenticated else None
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
-            return render(request, "banned.html", status=403)
-    except Exception:
-        pass
+    if get_viewer(request).is_banned:
+        return render(request, "banned.html", status=403)
     return render(request, "forum/thread_list.html")
 
 
 def thread_detail_page(request, slug):
-    try:
-        from django.utils import timezone as djtz
-
-        prof = request.user.profile if request.user.is_authenticated else None
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
-            return render(request, "banned.html", status=403)
-    except Exception:
-        pass
+    if get_viewer(request).is_banned:
+        return render(request, "banned.html", status=403)
     return render(request, "forum/thread_detail.html", {"slug": slug})
 
 
@@ -33,7 +23,8 @@ def thread_edit_page(request, slug):
     thread = get_object_or_404(Thread, slug=slug)
     # SECURITY FIX: ENSURE ONLY THE AUTHOR OR STAFF CAN ACCESS THE EDIT PAGE.
 
-    if not (request.user.is_staff or request.user.id == thread.author_id):
+    viewer = get_viewer(request)
+    if not (viewer.is_staff or viewer.id == thread.author_id):
         # RENDER THE CUSTOM 403 PAGE WITH A SPECIFIC MESSAGE
 
         return render(
@@ -43,14 +34,8 @@ def thread_edit_page(request, slug):
             status=403,
         )
 
-    try:
-        from django.utils import timezone as djtz
-
-        prof = request.user.profile if request.user.is_authenticated else None
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
-            return render(request, "banned.html", status=403)
-    except Exception:
-        pass
+    if get_viewer(request).is_banned:
+        return render(request, "banned.html", status=403)
     return render(request, "forum/thread_edit.html", {"slug": slug})
 
 
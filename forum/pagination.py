@@ -0,0 +1,29 @@
+from lucky_forums.pagination import KeysetPagination
+
+# ?ORDER= FEED MODES; EACH IS BACKED BY A COMPOSITE INDEX ON THREAD
+
+THREAD_ORDERINGS = {
+    "new": ("-created_at", "-id"),
+    "active": ("-last_activity_at", "-id"),
+    "hot": ("-hot_score", "-id"),
+}
+
+
+def thread_ordering(request):
+    order = request.query_params.get("order") if request else None
+    return THREAD_ORDERINGS.get(order, THREAD_ORDERINGS["new"])
+
+
+class ThreadPagination(KeysetPagination):
+    # NEWEST FIRST BY DEFAULT; MATCHES THREAD.META.ORDERING WITH ID AS TIE-BREAKER
+
+    ordering = THREAD_ORDERINGS["new"]
+
+    def get_ordering(self, request, queryset, view):
+        return thread_ordering(request)
+
+
+class PostPagination(KeysetPagination):
+    # OLDEST FIRST; MATCHES POST.META.ORDERING WITH ID AS TIE-BREAKER
+
+    ordering = ("created_at", "id")
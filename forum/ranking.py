@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import markers
+from .models import HOT_DECAY, HOT_EPOCH, JobCheckpoint, Post, PostRating, Thread
+
+CHECKPOINT = "forum.rank_threads"
+
+# RE-SCAN A LITTLE BEFORE THE LAST RUN: TIMESTAMPS ARE TAKEN BEFORE COMMIT, SO
+# A SLOW TRANSACTION CAN LAND ROWS THAT ARE OLDER THAN THE CHECKPOINT
+
+OVERLAP = timedelta(minutes=1)
+
+# ENGAGEMENT = REPLIES + NET VOTES ON THE THREAD'S POSTS; SEE FORUM.MODELS FOR
+# THE FORMULA. LAST_ACTIVITY_AT IS THE TIME TERM, SO REPLIES KEEP A THREAD UP.
+
+_RANK_SQL = f"""
+UPDATE {Thread._meta.db_table} AS t SET hot_score =
+    SIGN(x.points)::float8 * LOG(GREATEST(ABS(x.points), 1)::float8)
+    + (EXTRACT(EPOCH FROM t.last_activity_at)::float8 - %(epoch)s) / %(decay)s
+FROM (
+    SELECT t2.id, t2.posts_count + COALESCE(SUM(p.score), 0) AS points
+    FROM {Thread._meta.db_table} AS t2
+    LEFT JOIN {Post._meta.db_table} AS p ON p.thread_id = t2.id
+    WHERE t2.id = ANY(%(ids)s)
+    GROUP BY t2.id
+) AS x
+WHERE t.id = x.id
+"""
+
+
+def rank_threads(ids):
+    """RECOMPUTE HOT_SCORE FOR THE GIVEN THREAD IDS; RETURN ROWS UPDATED."""
+
+    ids = list(ids)
+    if not ids:
+        return 0
+    params = {"ids": ids, "epoch": HOT_EPOCH, "decay": HOT_DECAY}
+    with connection.cursor() as cursor:
+        cursor.execute(_RANK_SQL, params)
+        return cursor.rowcount
+
+
+def dirty_thread_ids(since):
+    """THREADS WITH A NEW POST OR A NEW/CHANGED VOTE AFTER ``SINCE``."""
+
+    ids = set(
+        Thread.objects.filter(last_activity_at__gt=since).values_list("id", flat=True)
+    )
+    ids.update(
+        PostRating.objects.filter(updated_at__gt=since)
+        .values_list("post__thread_id", flat=True)
+        .distinct()
+    )
+    return sorted(ids)
+
+
+def recompute_hot_scores(full=False, batch_size=500):
+    """
+    REFRESH THREAD.HOT_SCORE. INCREMENTAL BY DEFAULT: ONLY THREADS WITH
+    ACTIVITY SINCE THE PREVIOUS RUN ARE TOUCHED. A FULL RUN ALSO PICKS UP
+    RETRACTED VOTES AND DELETED POSTS, WHICH LEAVE NO TIMESTAMP BEHIND.
+    """
+
+    started = timezone.now()
+    checkpoint = JobCheckpoint.objects.filter(name=CHECKPOINT).first()
+    if full or checkpoint is None:
+        ids = Thread.objects.order_by("id").values_list("id", flat=True)
+    else:
+        ids = dirty_thread_ids(checkpoint.last_run_at - OVERLAP)
+    ids = list(ids)
+
+    total = 0
+    batch = max(1, batch_size)
+    for i in range(0, len(ids), batch):
+        with transaction.atomic():
+            total += rank_threads(ids[i : i + batch])
+
+    if total:
+        # ?ORDER=HOT MAY HAVE CHANGED
+        markers.touch(markers.THREADS)
+    JobCheckpoint.objects.update_or_create(
+        name=CHECKPOINT, defaults={"last_run_at": started}
+    )
+    return total
@@ -0,0 +1,74 @@
+import hashlib
+
+from django.conf import settings
+from rest_framework.response import Response
+
+from lucky_forums import caching
+
+from . import markers
+from .conditional import ConditionalListMixin
+
+# SHARED RESPONSE CACHE FOR READ ENDPOINTS. ENTRIES ARE KEYED ON THE CHANGE
+# MARKER VERSIONS THEY WERE BUILT FROM, SO A WRITE INVALIDATES BY BUMPING ONE
+# MARKER ROW (FORUM.SIGNALS, USERS.SIGNALS); OLD ENTRIES ARE NEVER LOOKED UP
+# AGAIN AND SIMPLY EXPIRE. ENTRIES HOLD PRE-RENDER DATA WITH VIEWER-SPECIFIC
+# FIELDS NEUTRAL; THOSE ARE OVERLAID PER REQUEST.
+
+
+def cache_key(scope, path, versions):
+    digest = hashlib.sha1(repr([path, versions]).encode("utf-8")).hexdigest()
+    return f"resp:{scope}:{digest}"
+
+
+def cached_data(scope, path, names, build):
+    """RETURN ``BUILD()`` FOR THE CURRENT VERSIONS OF ``NAMES``, CACHED."""
+
+    versions, _ = markers.read(*names)
+    return _get_or_build(cache_key(scope, path, versions), build)
+
+
+def _get_or_build(key, build):
+    data = caching.get(key)
+    if data is None:
+        data = build()
+        caching.set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+class CachedListMixin(ConditionalListMixin):
+    """
+    CONDITIONAL GET PLUS A SHARED CACHE OF THE SERIALIZED PAGE.
+
+    WHILE THE SHARED ENTRY IS BUILT ``SHARED_BUILD`` IS TRUE AND THE SERIALIZER
+    CONTEXT CARRIES ``SHARED``, SO VIEWER-SPECIFIC FIELDS COME OUT NEUTRAL;
+    ``PERSONALIZE`` FILLS THEM IN FOR THE CURRENT VIEWER.
+    """
+
+    shared_build = False
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["shared"] = self.shared_build
+        return context
+
+    def personalize(self, rows):
+        return rows
+
+    def versioned_list(self, request, versions, *args, **kwargs):
+        def build():
+            self.shared_build = True
+            try:
+                parent = super(CachedListMixin, self)
+                return parent.versioned_list(request, versions, *args, **kwargs).data
+            finally:
+                self.shared_build = False
+
+        key = cache_key(self.basename, request.build_absolute_uri(), versions)
+        data = _get_or_build(key, build)
+        rows = data["results"] if isinstance(data, dict) else data
+        personal = self.personalize(rows)
+        if isinstance(data, dict):
+            data = {**data, "results": personal}
+        else:
+            data = personal
+        return Response(data)
@@ -0,0 +1,139 @@
+from html import escape
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework import generics, status
+from rest_framework.response import Response
+
+from lucky_forums.pagination import KeysetPagination
+
+from .models import Post, Thread
+
+# SEARCH_VECTOR COLUMNS ARE FILLED BY DATABASE TRIGGERS WITH THIS CONFIG
+# (SEE FORUM/MIGRATIONS/0006_SEARCH_VECTOR.PY); QUERIES MUST USE THE SAME ONE
+
+SEARCH_CONFIG = "english"
+
+# HEADLINES ARE BUILT FROM RAW BODIES, SO MARK MATCHES WITH CONTROL CHARACTERS,
+# ESCAPE EVERYTHING, THEN SWAP THE MARKERS FOR <MARK> TAGS
+
+_MARK_START = "\x02"
+_MARK_STOP = "\x03"
+
+
+def _snippet(text):
+    html = escape(text or "")
+    return html.replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
+
+def _thread_row(t):
+    return {
+        "type": "thread",
+        "id": t.id,
+        "slug": t.slug,
+        "title": t.title,
+        "snippet": _snippet(t.snippet),
+        "rank": t.rank,
+        "created_at": int(t.created_at.timestamp()),
+    }
+
+
+def _post_row(p):
+    return {
+        "type": "post",
+        "id": p.id,
+        "thread": p.thread.slug,
+        "thread_title": p.thread.title,
+        "author": p.author.username,
+        "snippet": _snippet(p.snippet),
+        "rank": p.rank,
+        "created_at": int(p.created_at.timestamp()),
+    }
+
+
+def _comment_row(c):
+    return {
+        "type": "profile_comment",
+        "id": c.id,
+        "username": c.profile.user.username,
+        "author": c.author.username,
+        "snippet": _snippet(c.snippet),
+        "rank": c.rank,
+        "created_at": int(c.created_at.timestamp()),
+    }
+
+
+def _comments():
+    from users.models import ProfileComment
+
+    return ProfileComment.objects.select_related("profile__user", "author")
+
+
+# TYPE -> (BASE QUERYSET, SOURCE TEXT COLUMN, ROW BUILDER)
+
+SOURCES = {
+    "threads": (lambda: Thread.objects.all(), "title", _thread_row),
+    "posts": (
+        lambda: Post.objects.select_related("thread", "author"),
+        "body",
+        _post_row,
+    ),
+    "comments": (_comments, "body", _comment_row),
+}
+
+
+class SearchPagination(KeysetPagination):
+    # RANK IS CAST TO DOUBLE SO CURSOR VALUES ROUND-TRIP EXACTLY
+
+    ordering = ("-rank", "-id")
+    page_size = 20
+    max_page_size = 50
+
+    def is_requested(self, request):
+        # SEARCH RESULTS ARE ALWAYS BOUNDED
+        return True
+
+
+class SearchView(generics.GenericAPIView):
+    """
+    GET /API/SEARCH/?Q=<WEBSEARCH QUERY>&TYPE=POSTS|THREADS|COMMENTS
+
+    MATCHES GO THROUGH THE GIN INDEX ON SEARCH_VECTOR; RESULTS ARE RANKED,
+    KEYSET-PAGINATED ON (RANK, ID) AND CARRY AN ESCAPED, HIGHLIGHTED SNIPPET.
+    """
+
+    pagination_class = SearchPagination
+
+    def get(self, request):
+        q = (request.query_params.get("q") or "").strip()
+        if not q:
+            return Response(
+                {"detail": "q is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        kind = request.query_params.get("type") or "posts"
+        if kind not in SOURCES:
+            return Response(
+                {"detail": "type must be one of: " + ", ".join(SOURCES)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        base, column, build = SOURCES[kind]
+        query = SearchQuery(q, search_type="websearch", config=SEARCH_CONFIG)
+        qs = (
+            base()
+            .filter(search_vector=query)
+            .annotate(
+                rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+                snippet=SearchHeadline(
+                    column,
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=_MARK_START,
+                    stop_sel=_MARK_STOP,
+                    max_words=35,
+                    min_words=15,
+                ),
+            )
+        )
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response([build(row) for row in page])
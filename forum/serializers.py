@@ -1,7 +1,13 @@
+from functools import lru_cache
+
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from lucky_forums.fastrows import Compute, Const, Epoch, RowPlan
+from lucky_forums.utils import RENDER_VERSION, render_markdown_safe
+
 from .models import Post, PostRating, Thread
+from .sideload import SideloadAuthorsSerializerMixin
 
 
 class UserInlineSerializer(serializers.ModelSerializer):
@@ -55,11 +61,16 @@ class UserInlineSerializer(serializers.ModelSerializer):
         )
 
 
-class ThreadSerializer(serializers.ModelSerializer):
+class ThreadSerializer(SideloadAuthorsSerializerMixin, serializers.ModelSerializer):
     author = UserInlineSerializer(read_only=True)
-    posts_count = serializers.IntegerField(source="posts.count", read_only=True)
+    posts_count = serializers.IntegerField(read_only=True)
     created_at = serializers.SerializerMethodField()
     updated_at = serializers.SerializerMethodField()
+    last_post_at = serializers.SerializerMethodField()
+    last_activity_at = serializers.SerializerMethodField()
+    last_post_author = serializers.SlugRelatedField(
+        slug_field="username", read_only=True
+    )
 
     class Meta:
         model = Thread
@@ -71,6 +82,9 @@ class ThreadSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "posts_count",
+            "last_post_at",
+            "last_post_author",
+            "last_activity_at",
         ]
         read_only_fields = [
             "id",
@@ -79,6 +93,9 @@ class ThreadSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "posts_count",
+            "last_post_at",
+            "last_post_author",
+            "last_activity_at",
         ]
 
     def get_created_at(self, obj):
@@ -87,11 +104,18 @@ class ThreadSerializer(serializers.ModelSerializer):
     def get_updated_at(self, obj):
         return int(obj.updated_at.timestamp()) if obj.updated_at else None
 
+    def get_last_post_at(self, obj):
+        return int(obj.last_post_at.timestamp()) if obj.last_post_at else None
+
+    def get_last_activity_at(self, obj):
+        return int(obj.last_activity_at.timestamp())
+
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SideloadAuthorsSerializerMixin, serializers.ModelSerializer):
     author = UserInlineSerializer(read_only=True)
     thread = serializers.SlugRelatedField(slug_field="slug", read_only=True)
-    score = serializers.SerializerMethodField()
+    # STORED TALLY; SEE FORUM.VOTING
+    score = serializers.IntegerField(read_only=True)
     my_vote = serializers.SerializerMethodField()
     last_edited_at = serializers.SerializerMethodField()
     created_at = serializers.SerializerMethodField()
@@ -124,20 +148,27 @@ class PostSerializer(serializers.ModelSerializer):
             "body_html",
         ]
 
-    def get_score(self, obj):
-        # SUM OF VALUES; KEEP SIMPLE
-        return sum(
-            r.value for r in getattr(obj, "_prefetched_ratings", obj.ratings.all())
-        )
+    # VIEWER_VOTE / EDITS_TOTAL ARE ANNOTATED BY POSTVIEWSET.GET_QUERYSET;
+    # FALL BACK TO PER-ROW QUERIES OTHERWISE
 
     def get_my_vote(self, obj):
+        from users.viewer import get_viewer
+
         request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
+        if not request or self.context.get("shared"):
+            # SHARED CACHE ENTRY; FILLED IN PER VIEWER (SEE FORUM.RESPONSE_CACHE)
             return 0
-        vote = obj.ratings.filter(user=request.user).first()
+        viewer = get_viewer(request)
+        if not viewer.is_authenticated:
+            return 0
+        if hasattr(obj, "viewer_vote"):
+            return obj.viewer_vote
+        vote = obj.ratings.filter(user_id=viewer.id).first()
         return vote.value if vote else 0
 
     def get_edit_count(self, obj):
+        if hasattr(obj, "edits_total"):
+            return obj.edits_total
         return obj.edits.count()
 
     def get_last_edited_at(self, obj):
@@ -147,6 +178,105 @@ class PostSerializer(serializers.ModelSerializer):
         return int(obj.created_at.timestamp()) if obj.created_at else None
 
     def get_body_html(self, obj):
-        from lucky_forums.utils import render_markdown_safe
+        # PRE-RENDERED ON SAVE; SEE LUCKY_FORUMS.UTILS.RENDEREDBODYMIXIN
+        return obj.get_body_html()
+
+
+# FAST-PATH ROW PLANS FOR THE LIST ENDPOINTS (LUCKY_FORUMS.FASTROWS); EACH
+# MIRRORS THE SERIALIZER ABOVE FIELD FOR FIELD
+
+
+def _avatar_url(name):
+    from users.models import Profile
+
+    if not name:
+        return ""
+    storage = Profile._meta.get_field("avatar").storage
+    try:
+        # SIGNED URLS (S3 AND ALIKE, QUERYSTRING_AUTH) EXPIRE: SIGN EVERY TIME
+        if getattr(storage, "querystring_auth", False):
+            return storage.url(name)
+        return _stable_avatar_url(storage, name)
+    except Exception:
+        return ""
+
 
-        return render_markdown_safe(obj.body)
+@lru_cache(maxsize=1024)
+def _stable_avatar_url(storage, name):
+    return storage.url(name)
+
+
+def _body_html(body, body_html, version):
+    if version == RENDER_VERSION:
+        return body_html
+    return render_markdown_safe(body)
+
+
+def _inline_user_plan(prefix):
+    profile = prefix + "profile__"
+    return RowPlan(
+        [
+            ("id", prefix + "id"),
+            ("username", prefix + "username"),
+            ("avatar", Compute(_avatar_url, profile + "avatar")),
+            ("is_staff", prefix + "is_staff"),
+            ("is_superuser", prefix + "is_superuser"),
+            ("date_joined_unix", Epoch(prefix + "date_joined")),
+            ("silenced_until_unix", Epoch(profile + "silenced_until")),
+            ("banned_until_unix", Epoch(profile + "banned_until")),
+        ]
+    )
+
+
+def _with_author(fields, sideload):
+    # ?INCLUDE=AUTHORS: AUTHOR_ID LAST, AS SIDELOADAUTHORSSERIALIZERMIXIN DOES
+    if sideload:
+        return [f for f in fields if f[0] != "author"] + [("author_id", "author_id")]
+    return fields
+
+
+@lru_cache(maxsize=None)
+def thread_row_plan(sideload=False):
+    return RowPlan(
+        _with_author(
+            [
+                ("id", "id"),
+                ("title", "title"),
+                ("slug", "slug"),
+                ("author", _inline_user_plan("author__")),
+                ("created_at", Epoch("created_at")),
+                ("updated_at", Epoch("updated_at")),
+                ("posts_count", "posts_count"),
+                ("last_post_at", Epoch("last_post_at")),
+                ("last_post_author", "last_post_author__username"),
+                ("last_activity_at", Epoch("last_activity_at")),
+            ],
+            sideload,
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def post_row_plan(sideload=False, viewer_vote=False):
+    """``VIEWER_VOTE``: MY_VOTE FROM THE VIEWER_VOTE ANNOTATION, ELSE 0."""
+
+    return RowPlan(
+        _with_author(
+            [
+                ("id", "id"),
+                ("thread", "thread__slug"),
+                ("author", _inline_user_plan("author__")),
+                ("body", "body"),
+                (
+                    "body_html",
+                    Compute(_body_html, "body", "body_html", "body_html_version"),
+                ),
+                ("created_at", Epoch("created_at")),
+                ("last_edited_at", Epoch("edited_at")),
+                ("edit_count", "edits_total"),
+                ("score", "score"),
+                ("my_vote", "viewer_vote" if viewer_vote else Const(0)),
+            ],
+            sideload,
+        )
+    )
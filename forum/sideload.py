@@ -0,0 +1,54 @@
+from rest_framework import serializers
+
+# ?INCLUDE=AUTHORS: NORMALIZED LIST RESPONSES. ROWS CARRY ``AUTHOR_ID`` INSTEAD
+# OF AN EMBEDDED AUTHOR OBJECT AND THE DISTINCT AUTHORS COME ONCE, AS AN
+# ``AUTHORS`` MAP OF ID -> CARD READ FROM THE PER-USER CARD CACHE
+# (USERS.CARDS). A PLAIN LIST BECOMES {"RESULTS": [...], "AUTHORS": {...}}.
+
+
+def wants_authors(request):
+    raw = request.query_params.get("include", "") if request else ""
+    return "authors" in {part.strip() for part in raw.split(",")}
+
+
+class SideloadAuthorsSerializerMixin:
+    """SWAPS THE EMBEDDED ``AUTHOR`` FOR ``AUTHOR_ID`` WHEN SIDELOADING."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get("sideload_authors"):
+            fields.pop("author", None)
+            fields["author_id"] = serializers.IntegerField(read_only=True)
+        return fields
+
+
+class SideloadAuthorsMixin:
+    """LIST VIEWS: ADD THE ``AUTHORS`` MAP TO ?INCLUDE=AUTHORS RESPONSES."""
+
+    @property
+    def sideload_authors(self):
+        return self.action == "list" and wants_authors(self.request)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["sideload_authors"] = self.sideload_authors
+        return context
+
+    def authors_for(self, rows):
+        from users.cards import author_cards
+
+        cards = author_cards(row["author_id"] for row in rows)
+        return {str(uid): card for uid, card in cards.items()}
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if not self.sideload_authors or response.status_code != 200:
+            return response
+        data = response.data
+        rows = data["results"] if isinstance(data, dict) else data
+        authors = self.authors_for(rows)
+        if isinstance(data, dict):
+            response.data = {**data, "authors": authors}
+        else:
+            response.data = {"results": rows, "authors": authors}
+        return response
@@ -0,0 +1,128 @@
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import markers
+from .models import Post, PostRating, PostTombstone, Thread
+
+
+def _latest_post(thread_id):
+    # NEWEST REMAINING POST; SERVED BY FORUM_POST_THREAD_IDX
+
+    return Post.objects.filter(thread_id=thread_id).order_by("-created_at", "-id")
+
+
+@receiver(post_save, sender=Post)
+def bump_thread_counters(sender, instance, created, **kwargs):
+    if not created:
+        return
+    Thread.objects.filter(pk=instance.thread_id).update(
+        posts_count=F("posts_count") + 1,
+        last_post_at=Greatest(F("last_post_at"), instance.created_at),
+        last_activity_at=Greatest(F("last_activity_at"), instance.created_at),
+        last_post_author_id=Subquery(
+            _latest_post(OuterRef("pk")).values("author_id")[:1]
+        ),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def drop_thread_counters(sender, instance, origin=None, **kwargs):
+    # THE WHOLE THREAD IS GOING AWAY; NOTHING TO MAINTAIN
+
+    if isinstance(origin, Thread):
+        return
+    latest = _latest_post(OuterRef("pk"))
+    Thread.objects.filter(pk=instance.thread_id).update(
+        posts_count=Greatest(F("posts_count") - 1, 0),
+        last_post_at=Subquery(latest.values("created_at")[:1]),
+        last_post_author_id=Subquery(latest.values("author_id")[:1]),
+    )
+
+
+# VOTES NORMALLY GO THROUGH FORUM.VOTING (RAW SQL, NO SIGNALS); THESE KEEP THE
+# TALLIES RIGHT FOR PLAIN ORM INSERTS AND DELETES (FIXTURES, USER CASCADES)
+
+
+def _tally_delta(value, sign):
+    return {
+        "upvotes": F("upvotes") + (sign if value == 1 else 0),
+        "downvotes": F("downvotes") + (sign if value == -1 else 0),
+        "score": F("score") + sign * value,
+    }
+
+
+@receiver(post_save, sender=PostRating)
+def add_rating_to_tally(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            **_tally_delta(instance.value, 1)
+        )
+
+
+@receiver(post_delete, sender=PostRating)
+def remove_rating_from_tally(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (Post, Thread)):
+        return
+    Post.objects.filter(pk=instance.post_id).update(**_tally_delta(instance.value, -1))
+
+
+# CHANGE MARKERS FOR CONDITIONAL GET (SEE FORUM.CONDITIONAL). VOTES CAST
+# THROUGH FORUM.VOTING TOUCH THEIR THREAD THERE.
+
+
+@receiver(post_save, sender=Thread)
+def touch_thread_saved(sender, instance, **kwargs):
+    markers.touch(markers.THREADS)
+
+
+@receiver(post_delete, sender=Thread)
+def touch_thread_deleted(sender, instance, **kwargs):
+    markers.touch(markers.THREADS)
+    markers.forget(markers.thread_posts(instance.pk))
+
+
+@receiver(post_delete, sender=Thread)
+def drop_thread_tombstones(sender, instance, **kwargs):
+    # WRITTEN BY THE POST DELETE TRIGGER AS THE THREAD'S POSTS WENT; NOTHING
+    # CAN SYNC AGAINST A DELETED THREAD
+    PostTombstone.objects.filter(thread_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Post)
+def touch_post_saved(sender, instance, created, **kwargs):
+    names = [markers.thread_posts(instance.thread_id)]
+    if created:
+        # NEW POST MOVES THE THREAD'S COUNTERS IN THE FEED
+        names.append(markers.THREADS)
+    markers.touch(*names)
+
+
+@receiver(post_delete, sender=Post)
+def touch_post_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Thread):
+        return
+    markers.touch(markers.THREADS, markers.thread_posts(instance.thread_id))
+
+
+def _touch_rating(rating):
+    thread_id = (
+        Post.objects.filter(pk=rating.post_id)
+        .values_list("thread_id", flat=True)
+        .first()
+    )
+    if thread_id is not None:
+        markers.touch(markers.thread_posts(thread_id))
+
+
+@receiver(post_save, sender=PostRating)
+def touch_rating_saved(sender, instance, **kwargs):
+    _touch_rating(instance)
+
+
+@receiver(post_delete, sender=PostRating)
+def touch_rating_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (Post, Thread)):
+        return
+    _touch_rating(instance)
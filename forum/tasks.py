@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .ranking import recompute_hot_scores
+
+
+@shared_task
+def rank_threads(full=False):
+    return recompute_hot_scores(full=full)
@@ -0,0 +1,60 @@
+import pytest
+from django.contrib.auth import get_user_model
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, PostTombstone, Thread
+
+User = get_user_model()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_since_returns_only_changes_and_tombstones():
+    author = baker.make(User)
+    thread = baker.make(Thread, author=author)
+    edited, voted, deleted, untouched = (
+        Post.objects.create(thread=thread, author=author, body=f"post {i}")
+        for i in range(4)
+    )
+    base = f"/api/threads/{thread.slug}/posts/"
+    client = APIClient()
+    client.force_authenticate(author)
+
+    r = client.get(base)
+    assert len(r.json()) == 4
+    token = r["X-Changes-Token"]
+
+    client.patch(f"{base}{edited.id}/", {"body": "changed"}, format="json")
+    client.post(f"{base}{voted.id}/rate/", {"value": 1}, format="json")
+    client.delete(f"{base}{deleted.id}/")
+    created = client.post(base, {"body": "new"}, format="json").json()
+
+    data = client.get(base, {"since": token}).json()
+    posts = {p["id"]: p for p in data["posts"]}
+    assert set(posts) == {edited.id, voted.id, created["id"]}
+    assert posts[edited.id]["body"] == "changed"
+    assert posts[voted.id]["score"] == 1 and posts[voted.id]["my_vote"] == 1
+    assert data["deleted"] == [deleted.id]
+    assert untouched.id not in posts
+
+    # NOTHING CHANGED SINCE THE NEW TOKEN
+    again = client.get(base, {"since": data["token"]}).json()
+    assert again["posts"] == [] and again["deleted"] == []
+
+
+@pytest.mark.django_db
+def test_since_rejects_bad_tokens_and_unknown_threads():
+    thread = baker.make(Thread)
+    r = APIClient().get(f"/api/threads/{thread.slug}/posts/", {"since": "x"})
+    assert r.status_code == 400
+    assert APIClient().get("/api/threads/nope/posts/?since=1").status_code == 404
+
+
+@pytest.mark.django_db
+def test_thread_delete_drops_tombstones():
+    thread = baker.make(Thread)
+    post_id = baker.make(Post, thread=thread).id
+    Post.objects.filter(pk=post_id).delete()
+    assert PostTombstone.objects.filter(thread_id=thread.id, post_id=post_id).exists()
+    thread.delete()
+    assert not PostTombstone.objects.filter(thread_id=thread.id).exists()
@@ -0,0 +1,136 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum import markers
+from forum.models import Post, Thread
+from forum.voting import cast_post_vote
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_feed_answers_304_until_a_post_lands(django_capture_on_commit_callbacks):
+    thread = baker.make(Thread)
+    client = APIClient()
+    first = client.get("/api/threads/")
+    etag = first["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert "no-cache" in first["Cache-Control"]
+
+    with CaptureQueriesContext(connection) as ctx:
+        again = client.get("/api/threads/", HTTP_IF_NONE_MATCH=etag)
+    assert again.status_code == 304
+    assert again["ETag"] == etag
+    assert not any("forum_thread" in q["sql"] for q in ctx.captured_queries)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(Post, thread=thread, author=thread.author)
+    changed = client.get("/api/threads/", HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed["ETag"] != etag
+    assert changed.json()[0]["posts_count"] == 1
+
+
+@pytest.mark.django_db
+def test_feed_marker_is_bumped_after_commit(django_capture_on_commit_callbacks):
+    thread = baker.make(Thread)
+    (feed,), _ = markers.read(markers.THREADS)
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(Post, thread=thread, author=thread.author)
+        # ONLY THE THREAD'S OWN MARKER IS WRITTEN INSIDE THE TRANSACTION
+        (inside,), _ = markers.read(markers.THREADS)
+        (posts,), _ = markers.read(markers.thread_posts(thread.pk))
+        assert inside == feed and posts[0] == 1
+    (after,), _ = markers.read(markers.THREADS)
+    assert after[0] == feed[0] + 1
+
+
+@pytest.mark.django_db
+def test_feed_validators_depend_on_query_string():
+    baker.make(Thread)
+    client = APIClient()
+    etag = client.get("/api/threads/")["ETag"]
+    r = client.get("/api/threads/", {"order": "active"}, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+
+
+@pytest.mark.django_db
+def test_feed_if_modified_since(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(Thread)
+    client = APIClient()
+    last_modified = client.get("/api/threads/")["Last-Modified"]
+    r = client.get("/api/threads/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert r.status_code == 304
+
+
+@pytest.mark.django_db
+def test_posts_list_changes_with_votes_and_viewer():
+    thread = baker.make(Thread)
+    post = baker.make(Post, thread=thread)
+    url = f"/api/threads/{thread.slug}/posts/"
+    alice, bob = baker.make(User, _quantity=2)
+
+    client = APIClient()
+    client.force_authenticate(alice)
+    etag = client.get(url)["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    # ANOTHER VIEWER NEVER SHARES THE VALIDATOR (MY_VOTE DIFFERS)
+
+    other = APIClient()
+    other.force_authenticate(bob)
+    assert other.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    cast_post_vote(post.id, bob.id, 1)
+    r = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert r.json()[0]["score"] == 1
+
+
+@pytest.mark.django_db
+def test_only_embedded_author_changes_invalidate_lists(
+    django_capture_on_commit_callbacks,
+):
+    thread, other = baker.make(Thread, _quantity=2)
+    # REPLIER APPEARS ONLY IN THREAD'S POST LIST (A LATER POST TAKES OVER AS
+    # THE FEED'S LAST POSTER)
+    replier = baker.make(Post, thread=thread).author
+    baker.make(Post, thread=thread, author=thread.author)
+    urls = [
+        "/api/threads/",
+        f"/api/threads/{thread.slug}/posts/",
+        f"/api/threads/{other.slug}/posts/",
+    ]
+    client = APIClient()
+
+    def still_valid():
+        return [
+            client.get(url, HTTP_IF_NONE_MATCH=etags[url]).status_code == 304
+            for url in urls
+        ]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        etags = {url: client.get(url)["ETag"] for url in urls}
+
+        # A SIGN-UP AND A BIO EDIT EMBED NOTHING NEW
+
+        baker.make(User)
+        replier.profile.bio = "changed"
+        replier.profile.save()
+    assert still_valid() == [True, True, True]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        replier.username = "renamed"
+        replier.save()
+    assert still_valid() == [True, False, True]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        thread.author.profile.banned_until = timezone.now()
+        thread.author.profile.save()
+    assert still_valid() == [False, False, True]
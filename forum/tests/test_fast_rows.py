@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, PostEdit, PostRating, Thread
+from users.models import Notification, Profile
+
+User = get_user_model()
+
+
+@pytest.fixture
+def world():
+    now = timezone.now()
+    alice = baker.make(User, username="alice", is_staff=True)
+    bob = baker.make(User, username="bob")
+    Profile.objects.filter(user=alice).update(
+        avatar="avatars/a b.png", banned_until=now + timedelta(days=1)
+    )
+    Profile.objects.filter(user=bob).update(silenced_until=now + timedelta(hours=1))
+    empty = baker.make(Thread, author=bob, title="quiet")
+    thread = baker.make(Thread, author=alice, title="busy")
+    for i in range(4):
+        post = Post.objects.create(
+            thread=thread, author=alice if i % 2 else bob, body=f"**post** {i}"
+        )
+        for _ in range(i):
+            baker.make(PostEdit, post=post)
+        baker.make(PostRating, post=post, user=bob, value=1 if i % 2 else -1)
+    # A STALE RENDER IS RE-RENDERED ON READ BY BOTH PATHS
+    Post.objects.filter(pk=post.pk).update(body_html_version="old")
+    for i in range(3):
+        baker.make(
+            Notification,
+            user=bob,
+            type="mention",
+            payload={"actor": "alice", "n": i},
+            read_at=now if i == 1 else None,
+        )
+    return bob, empty, thread
+
+
+def _both(settings, client, url, params=None):
+    bodies = []
+    for fast in (False, True):
+        settings.FAST_LIST_ROWS = fast
+        cache.clear()
+        r = client.get(url, params)
+        assert r.status_code == 200
+        bodies.append(r.content)
+    return bodies
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("authenticated", [False, True])
+def test_fast_rows_match_serializers_byte_for_byte(world, settings, authenticated):
+    bob, empty, thread = world
+    client = APIClient()
+    if authenticated:
+        client.force_authenticate(user=bob)
+
+    posts = f"/api/threads/{thread.slug}/posts/"
+    cases = [
+        ("/api/threads/", None),
+        ("/api/threads/", {"order": "hot", "page_size": 1}),
+        ("/api/threads/", {"include": "authors"}),
+        (posts, None),
+        (posts, {"page_size": 3}),
+        (posts, {"include": "authors", "page_size": 2}),
+    ]
+    if authenticated:
+        cases += [
+            ("/api/notifications/", None),
+            ("/api/notifications/", {"page_size": 2}),
+        ]
+    for url, params in cases:
+        slow, fast = _both(settings, client, url, params)
+        assert slow == fast, (url, params)
+
+
+@pytest.mark.django_db
+def test_fast_rows_follow_cursors(world, settings):
+    _, _, thread = world
+    client = APIClient()
+    url = f"/api/threads/{thread.slug}/posts/?page_size=1"
+    seen = []
+    while url:
+        slow, fast = _both(settings, client, url)
+        assert slow == fast
+        page = client.get(url).json()
+        seen += [p["id"] for p in page["results"]]
+        url = page["next"]
+    assert len(seen) == 4
+
+
+def test_avatar_urls_are_cached_only_when_they_do_not_expire(monkeypatch):
+    from forum.serializers import _avatar_url
+
+    class Storage:
+        querystring_auth = False
+        signed = 0
+
+        def url(self, name):
+            self.signed += 1
+            return f"/media/{name}?n={self.signed}"
+
+    storage = Storage()
+    monkeypatch.setattr(Profile._meta.get_field("avatar"), "storage", storage)
+    assert _avatar_url("a.png") == _avatar_url("a.png") == "/media/a.png?n=1"
+
+    storage.querystring_auth = True
+    assert _avatar_url("a.png") == "/media/a.png?n=2"
+    assert _avatar_url("a.png") == "/media/a.png?n=3"
@@ -5,7 +5,11 @@ from rest_framework.test import APIClient
 User = get_user_model()
 
 
-@pytest.mark.django_db
+# REAL COMMITS: THE THREAD LIST'S MARKER MOVES AFTER THE CREATE COMMITS
+# (FORUM.MARKERS.AFTER_COMMIT)
+
+
+@pytest.mark.django_db(transaction=True)
 def test_threads_list_and_create():
     client = APIClient()
 
@@ -103,6 +107,7 @@ def test_thread_retrieve_and_posts_flow():
         format="json",
     )
     assert r.status_code == 200, r.content
+    assert r.json()["edit_count"] == 1 and r.json()["last_edited_at"]
     r = client.get(f"/api/threads/{slug}/posts/")
     p_after = r.json()[0]
     assert p_after["body"] == "edited"
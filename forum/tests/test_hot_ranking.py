@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import JobCheckpoint, Post, PostRating, Thread
+from forum.ranking import CHECKPOINT, dirty_thread_ids, recompute_hot_scores
+from forum.tasks import rank_threads
+from forum.voting import cast_post_vote, retract_post_vote
+
+User = get_user_model()
+
+
+def _hot_feed(**params):
+    r = APIClient().get("/api/threads/", {"order": "hot", **params})
+    assert r.status_code == 200
+    return r.json()
+
+
+@pytest.mark.django_db
+def test_engagement_outranks_a_quiet_thread_of_the_same_age():
+    now = timezone.now()
+    quiet = baker.make(Thread, created_at=now)
+    busy = baker.make(Thread, created_at=now)
+    post = baker.make(Post, thread=busy, created_at=now)
+    for voter in baker.make(User, _quantity=20):
+        cast_post_vote(post.id, voter.id, 1)
+
+    call_command("rank_threads", "--full")
+
+    assert [t["slug"] for t in _hot_feed()] == [busy.slug, quiet.slug]
+
+
+@pytest.mark.django_db
+def test_scores_decay_relative_to_newer_threads(django_capture_on_commit_callbacks):
+    old = baker.make(Thread, created_at=timezone.now() - timedelta(days=3))
+    post = baker.make(Post, thread=old, created_at=old.created_at)
+    for voter in baker.make(User, _quantity=5):
+        cast_post_vote(post.id, voter.id, 1)
+    fresh = baker.make(Thread)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        recompute_hot_scores(full=True)
+
+    assert [t["slug"] for t in _hot_feed()] == [fresh.slug, old.slug]
+
+
+@pytest.mark.django_db
+def test_incremental_run_only_touches_active_threads():
+    idle, voted, replied = baker.make(Thread, _quantity=3)
+    post = baker.make(Post, thread=voted)
+    recompute_hot_scores(full=True)
+    checkpoint = JobCheckpoint.objects.get(name=CHECKPOINT)
+
+    # PRETEND THE LAST RUN WAS AN HOUR AGO AND EVERYTHING EXISTING IS OLDER
+
+    hour_ago = timezone.now() - timedelta(hours=1)
+    Thread.objects.update(last_activity_at=hour_ago - timedelta(hours=1))
+    Post.objects.update(created_at=hour_ago - timedelta(hours=1))
+    checkpoint.last_run_at = hour_ago
+    checkpoint.save()
+    Thread.objects.update(hot_score=-1)
+
+    cast_post_vote(post.id, baker.make(User).id, 1)
+    baker.make(Post, thread=replied)
+
+    assert recompute_hot_scores() == 2
+    scores = dict(Thread.objects.values_list("id", "hot_score"))
+    assert scores[idle.id] == -1
+    assert scores[voted.id] != -1 and scores[replied.id] != -1
+    assert JobCheckpoint.objects.get(name=CHECKPOINT).last_run_at > hour_ago
+
+
+@pytest.mark.django_db
+def test_a_flipped_vote_is_new_activity_but_keeps_its_created_at():
+    thread = baker.make(Thread)
+    post = baker.make(Post, thread=thread)
+    voter = baker.make(User)
+    cast_post_vote(post.id, voter.id, 1)
+    cast_at = timezone.now() - timedelta(hours=2)
+    PostRating.objects.update(created_at=cast_at, updated_at=cast_at)
+    since = timezone.now() - timedelta(hours=1)
+    Thread.objects.update(last_activity_at=since - timedelta(hours=1))
+    assert dirty_thread_ids(since) == []
+
+    cast_post_vote(post.id, voter.id, -1)
+
+    assert dirty_thread_ids(since) == [thread.id]
+    rating = PostRating.objects.get()
+    assert rating.created_at == cast_at and rating.updated_at > since
+
+
+@pytest.mark.django_db
+def test_retracted_votes_are_picked_up_by_a_full_run():
+    thread = baker.make(Thread)
+    post = baker.make(Post, thread=thread)
+    voter = baker.make(User)
+    cast_post_vote(post.id, voter.id, 1)
+    recompute_hot_scores(full=True)
+    voted = Thread.objects.get(pk=thread.pk).hot_score
+
+    retract_post_vote(post.id, voter.id)
+    rank_threads.delay(full=True)
+
+    assert Thread.objects.get(pk=thread.pk).hot_score < voted
+
+
+@pytest.mark.django_db
+def test_hot_feed_paginates_with_keyset_cursor():
+    threads = baker.make(Thread, _quantity=5)
+    for i, t in enumerate(threads):
+        Thread.objects.filter(pk=t.pk).update(hot_score=float(i) + 0.5)
+
+    page = _hot_feed(page_size=3)
+    rest = APIClient().get(page["next"]).json()
+
+    expected = [t.slug for t in reversed(threads)]
+    assert [t["slug"] for t in page["results"] + rest["results"]] == expected
+    assert rest["next"] is None
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from lucky_forums.utils import (
+    MarkdownRenderer,
+    render_body_html,
+    render_markdown_many,
+    render_markdown_safe,
+)
+
+
+@pytest.mark.django_db
+def test_render_sanitizes_and_links_mentions():
+    get_user_model().objects.create_user(username="bob", password="x")
+    html = render_body_html("**hi** @bob <script>x</script>")
+    assert "<strong>hi</strong>" in html
+    assert '<a href="/u/bob/" class="text-decoration-none">@bob</a>' in html
+    assert "<script" not in html
+
+    # THE RENDERER ITSELF NEVER LOOKS USERS UP (IT RUNS IN WORKER PROCESSES)
+    with CaptureQueriesContext(connection) as ctx:
+        assert render_markdown_safe("@ghost @carol") == "<p>@ghost @carol</p>"
+    assert not ctx.captured_queries
+
+
+@pytest.mark.django_db
+def test_only_existing_users_outside_code_are_linked():
+    get_user_model().objects.create_user(username="bob", password="x")
+    html = render_body_html("@ghost, `@bob`, mail bob@example.com, hi @bob")
+    assert html.count('href="/u/') == 1
+    assert "<code>@bob</code>" in html and "bob@example.com" in html
+
+    # RESOLVED NAMES (AND MISSES) COME FROM THE CACHE NEXT TIME
+    with CaptureQueriesContext(connection) as ctx:
+        assert render_body_html("@ghost @bob") == (
+            '<p>@ghost <a href="/u/bob/" class="text-decoration-none">@bob</a></p>'
+        )
+    assert not ctx.captured_queries
+
+
+def test_engines_are_reused_without_leaking_state():
+    # REFERENCE DEFINITIONS MUST NOT SURVIVE INTO THE NEXT DOCUMENT
+
+    first, second = render_markdown_many(["[x]\n\n[x]: http://a.example", "[x]"])
+    assert 'href="http://a.example"' in first
+    assert second == "<p>[x]</p>"
+
+
+def test_engines_are_per_thread():
+    renderer = MarkdownRenderer()
+    seen = []
+
+    def work():
+        renderer.render("*a*")
+        seen.append(renderer._local.markdown)
+
+    threads = [threading.Thread(target=work) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert seen[0] is not seen[1]
+
+
+def test_oversized_input_falls_back_to_escaped_text():
+    renderer = MarkdownRenderer(max_chars=10)
+    assert renderer.render("**<b>**" * 5) == "<p>**&lt;b&gt;****&lt;</p>"
+
+
+def test_pathological_nesting_falls_back_to_escaped_text():
+    html = MarkdownRenderer().render("- " * 4000 + "x")
+    assert html.startswith("<p>- - ")
+
+
+def test_time_budget_falls_back_to_escaped_text():
+    renderer = MarkdownRenderer(time_budget=0.001)
+    html = renderer.render("> a *b* " * 4000)
+    assert html.startswith("<p>&gt; a *b*")
+
+    # THE RENDERER STAYS USABLE AFTER AN INTERRUPTED DOCUMENT
+
+    renderer.time_budget = 0
+    assert renderer.render("*ok*") == "<p><em>ok</em></p>"
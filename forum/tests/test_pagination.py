@@ -0,0 +1,154 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, Thread
+
+User = get_user_model()
+
+
+def _walk(client, url):
+    """FOLLOW NEXT LINKS UNTIL EXHAUSTED; RETURN ALL PAGES."""
+
+    pages = []
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200, r.content
+        pages.append(r.json())
+        url = pages[-1]["next"]
+    return pages
+
+
+@pytest.mark.django_db
+def test_unpaginated_list_is_unchanged(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(Thread, _quantity=3)
+    r = APIClient().get("/api/threads/")
+    assert r.status_code == 200
+    assert isinstance(r.json(), list) and len(r.json()) == 3
+
+
+@pytest.mark.django_db
+def test_thread_feed_keyset_pages_newest_first():
+    now = timezone.now()
+    user = baker.make(User)
+
+    # SHARED TIMESTAMPS FORCE THE ID TIE-BREAKER
+
+    for i in range(7):
+        Thread.objects.create(
+            title=f"t{i}", author=user, created_at=now - timedelta(minutes=i // 2)
+        )
+    client = APIClient()
+    pages = _walk(client, "/api/threads/?page_size=3")
+    assert [len(p["results"]) for p in pages] == [3, 3, 1]
+    assert pages[0]["previous"] is None
+
+    seen = [t["id"] for p in pages for t in p["results"]]
+    expected = list(
+        Thread.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+    )
+    assert seen == expected
+
+    # PREVIOUS FROM THE LAST PAGE RETURNS THE MIDDLE PAGE
+
+    r = client.get(pages[-1]["previous"])
+    assert [t["id"] for t in r.json()["results"]] == [
+        t["id"] for t in pages[1]["results"]
+    ]
+
+
+@pytest.mark.django_db
+def test_post_list_keyset_pages_oldest_first():
+    thread = baker.make(Thread)
+    now = timezone.now()
+    for i in range(5):
+        baker.make(Post, thread=thread, created_at=now + timedelta(seconds=i))
+    pages = _walk(APIClient(), f"/api/threads/{thread.slug}/posts/?page_size=2")
+    ids = [p["id"] for page in pages for p in page["results"]]
+    assert ids == list(
+        Post.objects.filter(thread=thread)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_page_size_is_bounded_and_no_offset_scan():
+    baker.make(Thread, _quantity=3)
+    client = APIClient()
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get("/api/threads/?page_size=100000")
+    assert r.status_code == 200
+    feed = [q["sql"] for q in ctx.captured_queries if 'FROM "forum_thread"' in q["sql"]]
+    assert feed and "LIMIT 101" in feed[0]
+    assert not any("OFFSET" in sql for sql in feed)
+
+
+@pytest.mark.django_db
+def test_cursor_page_seeks_into_the_index():
+    baker.make(Thread, _quantity=5)
+    client = APIClient()
+    cursor_url = client.get("/api/threads/?page_size=2").json()["next"]
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(cursor_url)
+    (sql,) = [
+        q["sql"] for q in ctx.captured_queries if 'FROM "forum_thread"' in q["sql"]
+    ]
+
+    # THE LEADING COLUMN GETS A RANGE (INDEX COND), NOT JUST A FILTER
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("EXPLAIN " + sql)
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+    assert "Index Cond" in plan and "created_at <=" in plan.split("Index Cond")[1]
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_404():
+    r = APIClient().get("/api/threads/?cursor=not-a-cursor")
+    assert r.status_code == 404
+
+
+@pytest.mark.django_db
+def test_active_feed_orders_by_last_activity(django_capture_on_commit_callbacks):
+    now = timezone.now()
+    user = baker.make(User)
+    old = Thread.objects.create(
+        title="old", author=user, created_at=now - timedelta(days=2)
+    )
+    new = Thread.objects.create(
+        title="new", author=user, created_at=now - timedelta(days=1)
+    )
+    quiet = Thread.objects.create(
+        title="quiet", author=user, created_at=now - timedelta(days=3)
+    )
+
+    # A FRESH REPLY BUMPS THE OLD THREAD TO THE TOP OF THE ACTIVE FEED ONLY
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.create(thread=old, author=user, body="bump", created_at=now)
+    client = APIClient()
+    active = [t["id"] for t in client.get("/api/threads/?order=active").json()]
+    assert active == [old.id, new.id, quiet.id]
+    newest = [t["id"] for t in client.get("/api/threads/").json()]
+    assert newest == [new.id, old.id, quiet.id]
+
+    pages = _walk(client, "/api/threads/?order=active&page_size=1")
+    assert [p["results"][0]["id"] for p in pages] == active
+
+
+@pytest.mark.django_db
+def test_active_feed_uses_index_range_scan():
+    baker.make(Thread, _quantity=3)
+    with CaptureQueriesContext(connection) as ctx:
+        APIClient().get("/api/threads/?order=active&page_size=2")
+    feed = [q["sql"] for q in ctx.captured_queries if 'FROM "forum_thread"' in q["sql"]]
+    assert 'ORDER BY "forum_thread"."last_activity_at" DESC' in feed[0]
+    assert "GROUP BY" not in feed[0] and "MAX(" not in feed[0]
@@ -0,0 +1,52 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, PostEdit, PostRating, Thread
+
+User = get_user_model()
+
+
+def _seed(thread, n, voter):
+    for _ in range(n):
+        post = baker.make(Post, thread=thread, author=baker.make(User))
+        baker.make(PostEdit, post=post)
+        baker.make(PostRating, post=post, user=voter, value=1)
+        baker.make(PostRating, post=post, value=-1)
+
+
+def _count(client, slug):
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get(f"/api/threads/{slug}/posts/")
+    assert r.status_code == 200
+    return len(ctx.captured_queries), r.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("authenticated", [False, True])
+def test_post_list_query_count_is_constant(authenticated):
+    voter = baker.make(User)
+    client = APIClient()
+    if authenticated:
+        client.force_authenticate(user=voter)
+
+    small = baker.make(Thread)
+    _seed(small, 2, voter)
+    large = baker.make(Thread)
+    _seed(large, 25, voter)
+
+    # WARM THE VIEWER'S CACHED MODERATION STATUS (USERS.MODERATION)
+    client.get("/api/threads/")
+
+    small_queries, _ = _count(client, small.slug)
+    large_queries, data = _count(client, large.slug)
+    assert small_queries == large_queries
+
+    assert len(data) == 25
+    for post in data:
+        assert post["score"] == 0
+        assert post["edit_count"] == 1
+        assert post["my_vote"] == (1 if authenticated else 0)
@@ -0,0 +1,116 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum import markers
+from forum.models import Post, Thread
+from lucky_forums import utils
+from lucky_forums.utils import RENDER_VERSION
+from users.models import ProfileComment
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_post_html_is_rendered_on_create_and_edit():
+    user = baker.make(User)
+    thread = baker.make(Thread, author=user)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    r = client.post(f"/api/threads/{thread.slug}/posts/", {"body": "**a**"})
+    post = Post.objects.get(pk=r.json()["id"])
+    assert post.body_html == "<p><strong>a</strong></p>"
+    assert post.body_html_version == RENDER_VERSION
+
+    client.patch(f"/api/threads/{thread.slug}/posts/{post.id}/", {"body": "*b*"})
+    post.refresh_from_db()
+    assert post.body_html == "<p><em>b</em></p>"
+
+
+@pytest.mark.django_db
+def test_profile_comment_html_is_rendered_on_edit():
+    owner = baker.make(User)
+    comment = baker.make(ProfileComment, profile=owner.profile, body="one")
+    comment.body = "**two**"
+    comment.save(update_fields=["body"])
+    comment.refresh_from_db()
+    assert comment.body_html == "<p><strong>two</strong></p>"
+
+
+@pytest.mark.django_db
+def test_reads_do_not_render(monkeypatch):
+    thread = baker.make(Thread)
+    baker.make(Post, thread=thread, body="**x**", _quantity=3)
+
+    def boom(text):
+        raise AssertionError("rendered on read")
+
+    monkeypatch.setattr(utils, "render_markdown_safe", boom)
+    r = APIClient().get(f"/api/threads/{thread.slug}/posts/")
+    assert r.status_code == 200
+    assert all(p["body_html"] == "<p><strong>x</strong></p>" for p in r.json())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_rerender_bodies_refreshes_stale_rows(workers):
+    posts = baker.make(Post, body="*p*", _quantity=5)
+    comment = baker.make(ProfileComment, profile=baker.make(User).profile, body="*c*")
+    Post.objects.update(body_html="old", body_html_version="0-stale")
+    ProfileComment.objects.update(body_html="old", body_html_version="0-stale")
+
+    # STALE ROWS STILL SERVE FRESH HTML
+
+    posts[0].refresh_from_db()
+    assert posts[0].get_body_html() == "<p><em>p</em></p>"
+
+    # CACHED LISTS HOLDING THE REWRITTEN ROWS ARE RETIRED
+
+    scopes = [markers.thread_posts(p.thread_id) for p in posts]
+    scopes.append(markers.profile_comments(comment.profile_id))
+    before, _ = markers.read(*scopes)
+
+    call_command("rerender_bodies", "--workers", workers, "--batch-size", "2")
+
+    after, _ = markers.read(*scopes)
+    assert all(new[0] > old[0] for old, new in zip(before, after))
+
+    assert set(Post.objects.values_list("body_html", "body_html_version")) == {
+        ("<p><em>p</em></p>", RENDER_VERSION)
+    }
+    comment.refresh_from_db()
+    assert comment.body_html == "<p><em>c</em></p>"
+
+    # UP-TO-DATE ROWS ARE SKIPPED UNLESS FORCED
+
+    with CaptureQueriesContext(connection) as ctx:
+        call_command("rerender_bodies", "--workers", "1")
+    assert not any("UPDATE" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_rerender_bodies_links_mentions_in_one_lookup():
+    bob = baker.make(User, username="bob")
+    baker.make(Post, body="hi @bob", _quantity=4)
+    Post.objects.update(body_html="old", body_html_version="0-stale")
+
+    # STALE ROWS SERVE A SAFE RENDER WITHOUT A USERNAME LOOKUP
+    post = Post.objects.first()
+    with CaptureQueriesContext(connection) as ctx:
+        assert post.get_body_html() == "<p>hi @bob</p>"
+    assert not ctx.captured_queries
+
+    cache.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        call_command("rerender_bodies", "--workers", "2", "--model", "posts")
+    assert sum("auth_user" in q["sql"] for q in ctx.captured_queries) == 1
+    link = f'<a href="/u/{bob.username}/" class="text-decoration-none">@bob</a>'
+    assert set(Post.objects.values_list("body_html", flat=True)) == {
+        f"<p>hi {link}</p>"
+    }
@@ -0,0 +1,86 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, Thread
+from forum.voting import cast_post_vote
+from users.models import ProfileComment, ProfileCommentRating
+
+User = get_user_model()
+
+
+def _client(user=None):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+@pytest.mark.django_db
+def test_feed_is_served_from_cache_until_a_write(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        thread = baker.make(Thread)
+    assert _client().get("/api/threads/").status_code == 200
+
+    with CaptureQueriesContext(connection) as ctx:
+        cached = _client().get("/api/threads/")
+    assert cached.status_code == 200
+    assert not any("forum_thread" in q["sql"] for q in ctx.captured_queries)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        baker.make(Post, thread=thread)
+    assert _client().get("/api/threads/").json()[0]["posts_count"] == 1
+
+
+@pytest.mark.django_db
+def test_shared_post_entry_never_carries_my_vote():
+    thread = baker.make(Thread)
+    post = baker.make(Post, thread=thread)
+    url = f"/api/threads/{thread.slug}/posts/"
+    alice, bob = baker.make(User, _quantity=2)
+    cast_post_vote(post.id, alice.id, 1)
+
+    # ALICE BUILDS THE SHARED ENTRY; BOB AND ANONYMOUS READ IT
+
+    assert _client(alice).get(url).json()[0]["my_vote"] == 1
+    assert _client(bob).get(url).json()[0]["my_vote"] == 0
+    assert _client().get(url).json()[0]["my_vote"] == 0
+    assert _client(alice).get(url).json()[0]["my_vote"] == 1
+
+    cast_post_vote(post.id, bob.id, -1)
+    row = _client(bob).get(url).json()[0]
+    assert row["my_vote"] == -1 and row["score"] == 0
+
+
+@pytest.mark.django_db
+def test_profile_is_cached_and_invalidated_by_profile_save():
+    user = baker.make(User, username="carol")
+    url = "/api/users/carol/profile/"
+    assert _client().get(url).json()["bio"] == ""
+
+    with CaptureQueriesContext(connection) as ctx:
+        _client().get(url)
+    assert not any("users_profile" in q["sql"] for q in ctx.captured_queries)
+
+    user.profile.bio = "hello"
+    user.profile.save()
+    assert _client().get(url).json()["bio"] == "hello"
+    assert _client().get("/api/users/nobody/profile/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_profile_comments_follow_ratings_and_personalize():
+    owner = baker.make(User, username="dave")
+    voter = baker.make(User)
+    comment = baker.make(ProfileComment, profile=owner.profile, body="hi")
+    url = "/api/users/dave/comments/"
+    assert _client(voter).get(url).json()[0]["score"] == 0
+
+    ProfileCommentRating.objects.create(comment=comment, user=voter, value=1)
+
+    assert _client(voter).get(url).json()[0]["my_vote"] == 1
+    row = _client().get(url).json()[0]
+    assert row["score"] == 1 and row["my_vote"] == 0
@@ -0,0 +1,74 @@
+import pytest
+from django.contrib.auth import get_user_model
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, Thread
+from users.models import ProfileComment
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_search_posts_ranked_with_escaped_highlights():
+    thread = baker.make(Thread, title="gardening")
+    best = baker.make(Post, thread=thread, body="tomatoes tomatoes tomatoes <b>")
+    baker.make(Post, thread=thread, body="I once grew tomatoes and beans")
+    baker.make(Post, thread=thread, body="nothing relevant here")
+
+    r = APIClient().get("/api/search/", {"q": "tomato"})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert len(results) == 2
+    assert results[0]["id"] == best.id
+    assert results[0]["thread"] == thread.slug
+    assert "<mark>tomatoes</mark>" in results[0]["snippet"]
+    assert "<b>" not in results[0]["snippet"]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_edits():
+    post = baker.make(Post, body="apples")
+    post.body = "oranges"
+    post.save()
+    client = APIClient()
+    assert client.get("/api/search/", {"q": "apples"}).json()["results"] == []
+    assert len(client.get("/api/search/", {"q": "oranges"}).json()["results"]) == 1
+
+
+@pytest.mark.django_db
+def test_search_threads_and_comments():
+    baker.make(Thread, title="Weekly photography contest")
+    owner = baker.make(User, username="owner")
+    baker.make(ProfileComment, profile=owner.profile, body="love your photography")
+    client = APIClient()
+
+    threads = client.get("/api/search/", {"q": "photography", "type": "threads"})
+    assert [r["type"] for r in threads.json()["results"]] == ["thread"]
+
+    comments = client.get("/api/search/", {"q": "photography", "type": "comments"})
+    rows = comments.json()["results"]
+    assert len(rows) == 1 and rows[0]["username"] == "owner"
+
+
+@pytest.mark.django_db
+def test_search_cursor_pagination_walks_all_matches():
+    thread = baker.make(Thread)
+    for i in range(5):
+        baker.make(Post, thread=thread, body="kiwi " * (i + 1))
+    client = APIClient()
+    ids = []
+    url = "/api/search/?q=kiwi&page_size=2"
+    while url:
+        data = client.get(url).json()
+        ids += [r["id"] for r in data["results"]]
+        url = data["next"]
+    assert sorted(ids) == sorted(Post.objects.values_list("id", flat=True))
+    assert len(ids) == 5
+
+
+@pytest.mark.django_db
+def test_search_validates_params():
+    client = APIClient()
+    assert client.get("/api/search/").status_code == 400
+    assert client.get("/api/search/", {"q": "x", "type": "nope"}).status_code == 400
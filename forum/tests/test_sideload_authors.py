@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, Thread
+from users.cards import author_cards
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_posts_reference_sideloaded_authors():
+    alice = baker.make(User, username="alice")
+    bob = baker.make(User, username="bob")
+    thread = baker.make(Thread, author=alice)
+    for i in range(6):
+        baker.make(Post, thread=thread, author=alice if i % 2 else bob)
+    client = APIClient()
+    url = f"/api/threads/{thread.slug}/posts/"
+
+    inline = client.get(url).json()
+    data = client.get(url, {"include": "authors"}).json()
+    assert [p["author_id"] for p in data["results"]] == [
+        p["author"]["id"] for p in inline
+    ]
+    assert all("author" not in p for p in data["results"])
+    assert data["authors"] == {str(p["author"]["id"]): p["author"] for p in inline[:2]}
+
+    # PAGINATED PAGES CARRY THE MAP NEXT TO THE LINKS
+    page = client.get(url, {"include": "authors", "page_size": 1}).json()
+    assert page["next"] and list(page["authors"]) == [str(bob.id)]
+
+    feed = client.get("/api/threads/", {"include": "authors"}).json()
+    assert feed["results"][0]["author_id"] == alice.id
+    assert feed["authors"][str(alice.id)]["username"] == "alice"
+
+
+@pytest.mark.django_db
+def test_cards_are_cached_and_dropped_on_moderation():
+    alice = baker.make(User, username="alice")
+    assert author_cards([alice.id])[alice.id]["banned_until_unix"] is None
+
+    with CaptureQueriesContext(connection) as ctx:
+        author_cards([alice.id])
+    assert len(ctx.captured_queries) == 0
+
+    profile = alice.profile
+    profile.banned_until = timezone.now() + timedelta(days=1)
+    profile.save(update_fields=["banned_until"])
+    card = author_cards([alice.id])[alice.id]
+    assert card["banned_until_unix"] == int(profile.banned_until.timestamp())
+
+    alice.is_staff = True
+    alice.save()
+    assert author_cards([alice.id])[alice.id]["is_staff"] is True
+
+    alice.delete()
+    assert author_cards([alice.id]) == {}
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, Thread
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_counters_follow_post_create_and_delete():
+    alice = baker.make(User, username="alice")
+    bob = baker.make(User, username="bob")
+    thread = baker.make(Thread, author=alice)
+    now = timezone.now()
+
+    first = Post.objects.create(thread=thread, author=alice, body="a", created_at=now)
+    second = Post.objects.create(
+        thread=thread, author=bob, body="b", created_at=now + timedelta(seconds=5)
+    )
+    thread.refresh_from_db()
+    assert thread.posts_count == 2
+    assert thread.last_post_at == second.created_at
+    assert thread.last_post_author_id == bob.id
+
+    # DELETING THE NEWEST POST FALLS BACK TO THE PREVIOUS ONE
+
+    second.delete()
+    thread.refresh_from_db()
+    assert thread.posts_count == 1
+    assert thread.last_post_at == first.created_at
+    assert thread.last_post_author_id == alice.id
+
+    first.delete()
+    thread.refresh_from_db()
+    assert thread.posts_count == 0
+    assert thread.last_post_at is None and thread.last_post_author_id is None
+
+
+@pytest.mark.django_db
+def test_recount_threads_reconciles_drift():
+    thread = baker.make(Thread)
+    baker.make(Post, thread=thread, _quantity=3)
+    Thread.objects.filter(pk=thread.pk).update(
+        posts_count=42, last_post_at=None, last_post_author=None
+    )
+
+    call_command("recount_threads")
+
+    thread.refresh_from_db()
+    latest = Post.objects.filter(thread=thread).order_by("-created_at", "-id")[0]
+    assert thread.posts_count == 3
+    assert thread.last_post_at == latest.created_at
+    assert thread.last_post_author_id == latest.author_id
+
+
+@pytest.mark.django_db
+def test_feed_issues_no_per_thread_queries(django_capture_on_commit_callbacks):
+    def feed_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            r = APIClient().get("/api/threads/")
+        assert r.status_code == 200
+        return ctx.captured_queries
+
+    with django_capture_on_commit_callbacks(execute=True):
+        thread = baker.make(Thread)
+        baker.make(Post, thread=thread)
+    baseline = len(feed_queries())
+
+    with django_capture_on_commit_callbacks(execute=True):
+        for t in baker.make(Thread, _quantity=5):
+            baker.make(Post, thread=t, _quantity=2)
+    queries = feed_queries()
+    assert len(queries) == baseline
+    assert not any("COUNT(" in q["sql"].upper() for q in queries)
+
+    data = APIClient().get("/api/threads/").json()
+    assert {t["posts_count"] for t in data} == {1, 2}
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum import live
+from forum.models import Post, Thread
+from lucky_forums.asgi import application
+
+User = get_user_model()
+
+
+def _event(chunk):
+    lines = dict(line.split(": ", 1) for line in chunk.decode().splitlines() if line)
+    return lines["event"], json.loads(lines["data"])
+
+
+async def _open(path):
+    # A GET THROUGH THE PROJECT'S ASGI APP: (START MESSAGE, BODY MESSAGES,
+    # DISCONNECT EVENT, APP TASK)
+    body, gone = asyncio.Queue(), asyncio.Event()
+    requested = []
+
+    async def receive():
+        if not requested:
+            requested.append(True)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await gone.wait()
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1),
+    }
+    task = asyncio.ensure_future(application(scope, receive, body.put))
+    start = await asyncio.wait_for(body.get(), 5)
+    return start, body, gone, task
+
+
+@pytest.mark.django_db
+def test_stream_for_unknown_thread_is_404():
+    assert APIClient().get("/api/threads/nope/stream/").status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_idle_streams_hold_no_thread(settings):
+    settings.PUBSUB_BACKEND = "local"
+    thread = baker.make(Thread)
+
+    async def scenario():
+        start, body, _, task = await _open("/api/threads/nope/stream/")
+        assert start["status"] == 404
+        assert json.loads((await body.get())["body"]) == {"detail": "Not found"}
+        await task
+
+        before = threading.active_count()
+        streams = []
+        for _ in range(20):
+            start, body, gone, task = await _open(f"/api/threads/{thread.slug}/stream/")
+            assert start["status"] == 200
+            first = await asyncio.wait_for(body.get(), 5)
+            assert first["body"].startswith(b"retry: ") and first["more_body"]
+            streams.append((gone, task))
+        # AT MOST ASGIREF'S ONE SHARED SYNC THREAD, NOT ONE PER STREAM
+        assert threading.active_count() <= before + 1
+
+        for gone, _ in streams:
+            gone.set()
+        await asyncio.wait_for(asyncio.gather(*(t for _, t in streams)), 5)
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.django_db
+def test_oversized_delta_drops_body():
+    post = baker.make(Post, body="word " * 3000)
+    delta = live.post_delta(post, "created")
+    assert delta["partial"] and "body_html" not in delta
+    assert delta["author"]["username"] == post.author.username
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_pushes_post_deltas(settings):
+    settings.PUBSUB_BACKEND = "local"
+    author = baker.make(User, username="author")
+    thread = baker.make(Thread, author=author)
+    base = f"/api/threads/{thread.slug}/posts/"
+
+    def client():
+        c = APIClient()
+        c.force_authenticate(author)
+        return c
+
+    def write(action):
+        try:
+            return action(client())
+        finally:
+            connection.close()
+
+    async def scenario():
+        r = await AsyncClient().get(f"/api/threads/{thread.slug}/stream/")
+        assert r.status_code == 200
+        chunks = r.streaming_content
+        try:
+            assert (await chunks.__anext__()).startswith(b"retry: ")
+
+            async def next_event():
+                return _event(await asyncio.wait_for(chunks.__anext__(), 5))
+
+            created = await sync_to_async(write)(
+                lambda c: c.post(base, {"body": "hello"}, format="json").json()
+            )
+            event, data = await next_event()
+            assert event == "post"
+            assert data["op"] == "created" and data["id"] == created["id"]
+            assert "hello" in data["body_html"] and "my_vote" not in data
+
+            url = f"{base}{created['id']}/"
+            await sync_to_async(write)(
+                lambda c: c.patch(url, {"body": "edited"}, format="json")
+            )
+            _, data = await next_event()
+            assert data["op"] == "edited" and data["edit_count"] == 1
+
+            await sync_to_async(write)(
+                lambda c: c.post(url + "rate/", {"value": 1}, format="json")
+            )
+            _, data = await next_event()
+            assert data == {"op": "scored", "id": created["id"], "score": 1}
+
+            await sync_to_async(write)(lambda c: c.delete(url))
+            _, data = await next_event()
+            assert data == {"op": "deleted", "id": created["id"]}
+        finally:
+            await chunks.aclose()
+
+    asyncio.run(scenario())
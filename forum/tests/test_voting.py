@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from forum.models import Post, PostRating
+from forum.voting import cast_post_vote, retract_post_vote
+
+User = get_user_model()
+
+
+def _tallies(post):
+    post.refresh_from_db()
+    return post.upvotes, post.downvotes, post.score
+
+
+@pytest.mark.django_db
+def test_cast_flip_repeat_and_retract():
+    post = baker.make(Post)
+    alice, bob = baker.make(User, _quantity=2)
+
+    assert cast_post_vote(post.id, alice.id, 1) == 1
+    assert cast_post_vote(post.id, bob.id, 1) == 2
+    assert _tallies(post) == (2, 0, 2)
+
+    # FLIP, THEN REPEAT THE SAME VOTE (NO-OP)
+
+    assert cast_post_vote(post.id, alice.id, -1) == 0
+    assert cast_post_vote(post.id, alice.id, -1) == 0
+    assert _tallies(post) == (1, 1, 0)
+
+    assert retract_post_vote(post.id, alice.id) == 1
+    assert retract_post_vote(post.id, alice.id) == 1
+    assert _tallies(post) == (1, 0, 1)
+    assert PostRating.objects.filter(post=post).count() == 1
+
+
+@pytest.mark.django_db
+def test_vote_is_a_single_statement():
+    post = baker.make(Post)
+    user = baker.make(User)
+    with CaptureQueriesContext(connection) as ctx:
+        cast_post_vote(post.id, user.id, 1)
+    statements = [
+        q for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"].upper()
+    ]
+    assert len(statements) == 1
+    assert "ON CONFLICT" in statements[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_orm_writes_and_recount_keep_tallies_consistent():
+    post = baker.make(Post)
+    baker.make(PostRating, post=post, value=1, _quantity=3)
+    rating = baker.make(PostRating, post=post, value=-1)
+    assert _tallies(post) == (3, 1, 2)
+
+    rating.delete()
+    assert _tallies(post) == (3, 0, 3)
+
+    Post.objects.filter(pk=post.pk).update(upvotes=9, downvotes=9, score=-4)
+    call_command("recount_votes")
+    assert _tallies(post) == (3, 0, 3)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_votes_do_not_race():
+    post = baker.make(Post)
+    voters = baker.make(User, _quantity=8)
+
+    def vote(user):
+        try:
+            # SAME USER TWICE: THE SECOND UPSERT MUST BE A NO-OP
+            cast_post_vote(post.id, user.id, 1)
+            cast_post_vote(post.id, user.id, 1)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(vote, voters + voters))
+
+    assert _tallies(post) == (8, 0, 8)
@@ -1,16 +1,35 @@
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import JsonResponse
 from django.utils import timezone
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Post, PostRating, Thread
+from lucky_forums.fastrows import FastListMixin
+from lucky_forums.pubsub import event_stream_view
+from users.viewer import get_viewer
+
+from . import changes, live, markers
+from .models import Post, PostEdit, PostRating, Thread
+from .pagination import PostPagination, ThreadPagination, thread_ordering
 from .permissions import IsAuthorOrReadOnly
-from .serializers import PostSerializer, ThreadSerializer
+from .response_cache import CachedListMixin
+from .serializers import (
+    PostSerializer,
+    ThreadSerializer,
+    post_row_plan,
+    thread_row_plan,
+)
+from .sideload import SideloadAuthorsMixin
 
 
 class ThreadViewSet(
+    SideloadAuthorsMixin,
+    CachedListMixin,
+    FastListMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -18,10 +37,31 @@ class ThreadViewSet(
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
-    queryset = Thread.objects.select_related("author").all()
+    queryset = Thread.objects.select_related(
+        "author", "author__profile", "last_post_author"
+    ).all()
     serializer_class = ThreadSerializer
+    pagination_class = ThreadPagination
     lookup_field = "slug"
 
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "list":
+            # ?ORDER=NEW (DEFAULT) | ACTIVE | HOT; SEE FORUM.PAGINATION
+            qs = qs.order_by(*thread_ordering(self.request))
+        if self.sideload_authors:
+            # AUTHORS COME FROM THE CARD CACHE
+            qs = qs.select_related(None).select_related("last_post_author")
+        return qs
+
+    def get_row_plan(self):
+        return thread_row_plan(self.sideload_authors)
+
+    def get_change_markers(self):
+        # THE FEED SHOWS THREAD ROWS, THEIR COUNTERS AND AUTHORS (AUTHOR
+        # CHANGES TOUCH IT THROUGH MARKERS.TOUCH_AUTHOR)
+        return [markers.THREADS]
+
     def get_permissions(self):
         from users.permissions import NotBanned
 
@@ -34,48 +74,31 @@ class ThreadViewSet(
     def list(self, request, *args, **kwargs):
         # BLOCK BANNED USERS FROM VIEWING
 
-        if request.user.is_authenticated:
-            from django.utils import timezone as djtz
-
-            prof = getattr(request.user, "profile", None)
-            if prof and prof.banned_until and prof.banned_until > djtz.now():
-                return Response(
-                    {"detail": "banned user"}, status=status.HTTP_403_FORBIDDEN
-                )
+        if get_viewer(request).is_banned:
+            return Response({"detail": "banned user"}, status=status.HTTP_403_FORBIDDEN)
         return super().list(request, *args, **kwargs)
 
     def retrieve(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            from django.utils import timezone as djtz
-
-            prof = getattr(request.user, "profile", None)
-            if prof and prof.banned_until and prof.banned_until > djtz.now():
-                return Response(
-                    {"detail": "banned user"}, status=status.HTTP_403_FORBIDDEN
-                )
+        if get_viewer(request).is_banned:
+            return Response({"detail": "banned user"}, status=status.HTTP_403_FORBIDDEN)
         return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         # MODERATION: PREVENT BANNED/SILENCED USERS FROM CREATING THREADS
 
-        from django.utils import timezone as djtz
-
-        from users.models import Profile
-
-        prof = Profile.objects.filter(user_id=self.request.user.id).first()
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
+        viewer = get_viewer(self.request)
+        if viewer.is_banned:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("banned user")
-        if prof and prof.silenced_until and prof.silenced_until > djtz.now():
+        if viewer.is_silenced:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("silenced user")
         serializer.save(author=self.request.user)
 
     def perform_destroy(self, instance):
-        user = self.request.user
-        if user.is_staff or user.is_superuser or instance.author_id == user.id:
+        if get_viewer(self.request).can_manage(instance.author_id):
             instance.delete()
         else:
             from rest_framework.exceptions import PermissionDenied
@@ -83,9 +106,8 @@ class ThreadViewSet(
             raise PermissionDenied("not allowed to delete this thread.")
 
     def perform_update(self, serializer):
-        user = self.request.user
         instance = self.get_object()
-        if not (user.is_staff or user.is_superuser or instance.author_id == user.id):
+        if not get_viewer(self.request).can_manage(instance.author_id):
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("not allowed to edit this thread.")
@@ -93,6 +115,9 @@ class ThreadViewSet(
 
 
 class PostViewSet(
+    SideloadAuthorsMixin,
+    CachedListMixin,
+    FastListMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -101,14 +126,71 @@ class PostViewSet(
     viewsets.GenericViewSet,
 ):
     serializer_class = PostSerializer
+    pagination_class = PostPagination
+    # MY_VOTE IS PER VIEWER
+    conditional_per_user = True
 
     def get_queryset(self):
-        return (
-            Post.objects.select_related("author", "thread")
+        # CONSTANT QUERY PLAN: EDIT COUNT AND THE VIEWER'S VOTE ARE CORRELATED
+        # SUBQUERIES, SCORE IS A STORED COLUMN, AUTHOR PROFILES ARE JOINED
+
+        ratings = PostRating.objects.filter(post=OuterRef("pk")).order_by()
+        edits = PostEdit.objects.filter(post=OuterRef("pk")).order_by()
+        # WITH ?INCLUDE=AUTHORS AUTHORS COME FROM THE CARD CACHE INSTEAD
+        related = ["thread"]
+        if not self.sideload_authors:
+            related += ["author", "author__profile"]
+        qs = (
+            Post.objects.select_related(*related)
             .filter(thread__slug=self.kwargs.get("thread_slug"))
-            .all()
+            .annotate(
+                edits_total=Coalesce(
+                    Subquery(
+                        edits.values("post").annotate(c=Count("id")).values("c"),
+                        output_field=IntegerField(),
+                    ),
+                    0,
+                ),
+            )
+        )
+        viewer = get_viewer(self.request)
+        if viewer.is_authenticated and not self.shared_build:
+            qs = qs.annotate(
+                viewer_vote=Coalesce(
+                    Subquery(ratings.filter(user_id=viewer.id).values("value")[:1]), 0
+                )
+            )
+        return qs
+
+    def get_row_plan(self):
+        # MY_VOTE COMES FROM THE ANNOTATION GET_QUERYSET ADDS FOR A SIGNED-IN
+        # VIEWER OUTSIDE THE SHARED BUILD; IT IS 0 OTHERWISE
+        viewer_vote = get_viewer(self.request).is_authenticated
+        return post_row_plan(
+            self.sideload_authors, viewer_vote and not self.shared_build
         )
 
+    def get_change_markers(self):
+        thread_id = (
+            Thread.objects.filter(slug=self.kwargs.get("thread_slug"))
+            .values_list("id", flat=True)
+            .first()
+        )
+        if thread_id is None:
+            return None
+        return [markers.thread_posts(thread_id)]
+
+    def personalize(self, rows):
+        viewer = get_viewer(self.request)
+        if not viewer.is_authenticated or not rows:
+            return rows
+        votes = dict(
+            PostRating.objects.filter(
+                user_id=viewer.id, post_id__in=[row["id"] for row in rows]
+            ).values_list("post_id", "value")
+        )
+        return [{**row, "my_vote": votes.get(row["id"], 0)} for row in rows]
+
     def get_permissions(self):
         from users.permissions import NotBanned
 
@@ -117,83 +199,95 @@ class PostViewSet(
         return [IsAuthenticated(), NotBanned()]
 
     def list(self, request, *args, **kwargs):
-        if request.user.is_authenticated:
-            from django.utils import timezone as djtz
+        if get_viewer(request).is_banned:
+            return Response({"detail": "banned user"}, status=status.HTTP_403_FORBIDDEN)
 
-            prof = getattr(request.user, "profile", None)
-            if prof and prof.banned_until and prof.banned_until > djtz.now():
-                return Response(
-                    {"detail": "banned user"}, status=status.HTTP_403_FORBIDDEN
-                )
-        return super().list(request, *args, **kwargs)
+        # TAKEN BEFORE ANYTHING IS READ; SEE FORUM.CHANGES
 
-    def perform_create(self, serializer):
-        # MODERATION: PREVENT BANNED/SILENCED USERS FROM POSTING
+        token = changes.current_token()
+        if "since" in request.query_params:
+            return self.changes_since(request, token)
+        response = super().list(request, *args, **kwargs)
+        response["X-Changes-Token"] = str(token)
+        return response
 
-        from django.utils import timezone as djtz
+    def changes_since(self, request, token):
+        """
+        ?SINCE=<TOKEN>: POSTS CREATED, EDITED OR RE-SCORED AND IDS OF POSTS
+        DELETED SINCE ``TOKEN``, PLUS THE TOKEN TO SEND NEXT TIME.
+        """
+
+        since = changes.parse_token(request.query_params.get("since"))
+        if since is None:
+            return Response(
+                {"detail": "since must be a change token"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        thread_id = (
+            Thread.objects.filter(slug=self.kwargs.get("thread_slug"))
+            .values_list("id", flat=True)
+            .first()
+        )
+        if thread_id is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        posts = self.get_queryset().filter(change_xid__gte=since).order_by("id")
+        data = {
+            "token": token,
+            "posts": self.get_serializer(posts, many=True).data,
+            "deleted": changes.deleted_since(thread_id, since),
+        }
+        if self.sideload_authors:
+            data["authors"] = self.authors_for(data["posts"])
+        return Response(data)
 
-        from users.models import Profile
+    def perform_create(self, serializer):
+        # MODERATION: PREVENT BANNED/SILENCED USERS FROM POSTING
 
-        prof = Profile.objects.filter(user_id=self.request.user.id).first()
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
+        viewer = get_viewer(self.request)
+        if viewer.is_banned:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("banned user")
-        if prof and prof.silenced_until and prof.silenced_until > djtz.now():
+        if viewer.is_silenced:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("silenced user")
         thread = Thread.objects.get(slug=self.kwargs.get("thread_slug"))
-        obj = serializer.save(author=self.request.user, thread=thread)
-        # NOTIFICATIONS: THREAD OWNER AND MENTIONS
+        self._save_post(serializer, thread)
 
-        try:
-            from users.notifications import notify_mentions, notify_thread_reply
+    def _save_post(self, serializer, thread):
+        from users.outbox import enqueue
 
-            notify_thread_reply(actor=self.request.user, thread=thread, post=obj)
-            notify_mentions(
-                actor=self.request.user,
-                text=obj.body,
-                context={"type": "post", "thread_slug": thread.slug, "post_id": obj.id},
-            )
-        except Exception:
-            pass
+        # NOTIFICATIONS (THREAD OWNER, MENTIONS) GO THROUGH THE OUTBOX: RECORDED
+        # WITH THE POST, SENT BY THE WORKER (USERS.OUTBOX)
+
+        with transaction.atomic():
+            obj = serializer.save(author=self.request.user, thread=thread)
+            enqueue("post_created", post_id=obj.id)
+            live.publish_post(obj, "created")
+        return obj
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        from django.utils import timezone as djtz
-
-        from users.models import Profile
-
-        prof = Profile.objects.filter(user_id=request.user.id).first()
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
+        viewer = get_viewer(request)
+        if viewer.is_banned:
             return Response({"detail": "banned user"}, status=status.HTTP_403_FORBIDDEN)
-        if prof and prof.silenced_until and prof.silenced_until > djtz.now():
+        if viewer.is_silenced:
             return Response(
                 {"detail": "silenced user"}, status=status.HTTP_403_FORBIDDEN
             )
         thread = Thread.objects.get(slug=self.kwargs.get("thread_slug"))
-        obj = serializer.save(author=request.user, thread=thread)
-        try:
-            from users.notifications import notify_mentions, notify_thread_reply
-
-            notify_thread_reply(actor=request.user, thread=thread, post=obj)
-            notify_mentions(
-                actor=request.user,
-                text=obj.body,
-                context={"type": "post", "thread_slug": thread.slug, "post_id": obj.id},
-            )
-        except Exception:
-            pass
+        obj = self._save_post(serializer, thread)
         data = self.get_serializer(obj).data
         headers = self.get_success_headers(data)
         return Response(data, status=status.HTTP_201_CREATED, headers=headers)
 
     def perform_destroy(self, instance):
-        user = self.request.user
-        if user.is_staff or user.is_superuser or instance.author_id == user.id:
+        if get_viewer(self.request).can_manage(instance.author_id):
+            thread_id, post_id = instance.thread_id, instance.id
             instance.delete()
+            live.publish_post_deleted(thread_id, post_id)
         else:
             from rest_framework.exceptions import PermissionDenied
 
@@ -202,35 +296,36 @@ class PostViewSet(
     def perform_update(self, serializer):
         # MODERATION: PREVENT SILENCED/BANNED USERS FROM EDITING
 
-        from django.utils import timezone as djtz
-
-        from users.models import Profile
-
-        prof = Profile.objects.filter(user_id=self.request.user.id).first()
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
+        viewer = get_viewer(self.request)
+        if viewer.is_banned:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("banned user")
-        if prof and prof.silenced_until and prof.silenced_until > djtz.now():
+        if viewer.is_silenced:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("silenced user")
-        user = self.request.user
         instance = self.get_object()
-        if not (user.is_staff or user.is_superuser or instance.author_id == user.id):
+        if not get_viewer(self.request).can_manage(instance.author_id):
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("not allowed to edit this post.")
-        from .models import PostEdit
-
-        PostEdit.objects.create(post=instance, editor=user, body=instance.body)
+        PostEdit.objects.create(
+            post=instance, editor=self.request.user, body=instance.body
+        )
         obj = serializer.save()
         obj.edited_at = timezone.now()
         obj.save(update_fields=["edited_at"])
+        live.publish_post(obj, "edited")
+
+        # THE INSTANCE'S EDITS_TOTAL WAS READ BEFORE THE NEW POSTEDIT; RESPOND
+        # WITH A FRESH ROW
+
+        serializer.instance = self.get_queryset().get(pk=obj.pk)
 
     @action(detail=True, methods=["get"], url_path="history")
     def history(self, request, thread_slug=None, pk=None):
-        if not (request.user.is_staff or request.user.is_superuser):
+        if not get_viewer(request).is_admin:
             from rest_framework.exceptions import PermissionDenied
 
             raise PermissionDenied("Admins only")
@@ -247,11 +342,13 @@ class PostViewSet(
 
     @action(detail=True, methods=["post", "delete"], url_path="rate")
     def rate(self, request, thread_slug=None, pk=None):
+        from .voting import cast_post_vote, retract_post_vote
+
         post = self.get_object()
         user = request.user
         if request.method.lower() == "delete":
-            PostRating.objects.filter(post=post, user=user).delete()
-            score = post.ratings.aggregate(score=Sum("value")).get("score") or 0
+            score = retract_post_vote(post.id, user.id)
+            live.publish_score(post.thread_id, post.id, score)
             return Response({"score": score, "my_vote": 0}, status=status.HTTP_200_OK)
         try:
             val = int(request.data.get("value", 0))
@@ -263,8 +360,29 @@ class PostViewSet(
             return Response(
                 {"detail": "value must be 1 or -1"}, status=status.HTTP_400_BAD_REQUEST
             )
-        PostRating.objects.update_or_create(
-            post=post, user=user, defaults={"value": val}
-        )
-        score = post.ratings.aggregate(score=Sum("value")).get("score") or 0
+        score = cast_post_vote(post.id, user.id, val)
+        live.publish_score(post.thread_id, post.id, score)
         return Response({"score": score, "my_vote": val})
+
+
+def _open_thread_stream(request, thread_slug):
+    """
+    GET /API/THREADS/{SLUG}/STREAM/: TEXT/EVENT-STREAM OF ``POST`` DELTAS
+    (OP: CREATED | EDITED | DELETED | SCORED) FOR READERS OF THE THREAD.
+    """
+
+    from users.live import stream_user
+
+    user, code = stream_user(request)
+    if code != 200:
+        detail = {401: "Authentication failed", 403: "banned user"}[code]
+        return JsonResponse({"detail": detail}, status=code)
+    thread_id = (
+        Thread.objects.filter(slug=thread_slug).values_list("id", flat=True).first()
+    )
+    if not thread_id:
+        return JsonResponse({"detail": "Not found"}, status=404)
+    return live.thread_channel(thread_id), None
+
+
+thread_stream = event_stream_view(_open_thread_stream)
@@ -0,0 +1,81 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import markers
+from .models import Post, PostRating
+
+# ONE STATEMENT PER VOTE: THE RATING UPSERT AND THE TALLY DELTA RUN TOGETHER.
+# ON CONFLICT ... DO UPDATE LOCKS THE EXISTING RATING ROW AND RE-CHECKS THE
+# WHERE CLAUSE AGAINST ITS LATEST VERSION, SO CONCURRENT VOTES BY THE SAME USER
+# NEVER DOUBLE-COUNT AND NEVER RAISE INTEGRITYERROR. VALUES ARE ONLY +1/-1, SO
+# AN UPDATED ROW ALWAYS MEANS THE VOTE FLIPPED. A FLIP STAMPS UPDATED_AT (NOT
+# CREATED_AT) SO THE HOT RANKING JOB SEES IT AS NEW ACTIVITY (SEE FORUM.RANKING).
+# THE SAME STATEMENT TOUCHES THE THREAD'S CHANGE MARKER (SEE FORUM.MARKERS).
+
+_CAST_SQL = f"""
+WITH vote AS (
+    INSERT INTO {PostRating._meta.db_table}
+        (post_id, user_id, value, created_at, updated_at)
+    VALUES (%(post)s, %(user)s, %(value)s, %(now)s, %(now)s)
+    ON CONFLICT (post_id, user_id) DO UPDATE
+    SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+    WHERE {PostRating._meta.db_table}.value <> EXCLUDED.value
+    RETURNING (xmax = 0) AS inserted
+), tally AS (
+UPDATE {Post._meta.db_table} AS p SET
+    upvotes = p.upvotes + CASE
+        WHEN %(value)s = 1 THEN 1 WHEN vote.inserted THEN 0 ELSE -1 END,
+    downvotes = p.downvotes + CASE
+        WHEN %(value)s = -1 THEN 1 WHEN vote.inserted THEN 0 ELSE -1 END,
+    score = p.score + CASE WHEN vote.inserted THEN %(value)s ELSE 2 * %(value)s END
+FROM vote
+WHERE p.id = %(post)s
+RETURNING p.score, p.thread_id
+), touched AS ({markers.touch_thread_posts_sql("tally")})
+SELECT score FROM tally
+"""
+
+_RETRACT_SQL = f"""
+WITH gone AS (
+    DELETE FROM {PostRating._meta.db_table}
+    WHERE post_id = %(post)s AND user_id = %(user)s
+    RETURNING value
+), tally AS (
+UPDATE {Post._meta.db_table} AS p SET
+    upvotes = p.upvotes - CASE WHEN gone.value = 1 THEN 1 ELSE 0 END,
+    downvotes = p.downvotes - CASE WHEN gone.value = -1 THEN 1 ELSE 0 END,
+    score = p.score - gone.value
+FROM gone
+WHERE p.id = %(post)s
+RETURNING p.score, p.thread_id
+), touched AS ({markers.touch_thread_posts_sql("tally")})
+SELECT score FROM tally
+"""
+
+
+def _run(sql, params, post_id):
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is not None:
+        return row[0]
+
+    # NO-OP (SAME VOTE AGAIN / NOTHING TO RETRACT): TALLY IS UNCHANGED
+
+    return Post.objects.filter(pk=post_id).values_list("score", flat=True).first()
+
+
+def cast_post_vote(post_id: int, user_id: int, value: int) -> int:
+    """SET THE USER'S VOTE (+1/-1) ON A POST; RETURN THE NEW SCORE."""
+
+    if value not in (-1, 1):
+        raise ValueError("value must be 1 or -1")
+    params = {"post": post_id, "user": user_id, "value": value, "now": timezone.now()}
+    return _run(_CAST_SQL, params, post_id)
+
+
+def retract_post_vote(post_id: int, user_id: int) -> int:
+    """REMOVE THE USER'S VOTE ON A POST, IF ANY; RETURN THE NEW SCORE."""
+
+    params = {"post": post_id, "user": user_id, "now": timezone.now()}
+    return _run(_RETRACT_SQL, params, post_id)
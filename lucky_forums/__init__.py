@@ -0,0 +1,5 @@
+# LOAD THE CELERY APP SO @SHARED_TASK BINDS TO IT
+
+from .celery import app as celery_app
+
+__all__ = ("celery_app",)
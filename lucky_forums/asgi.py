@@ -12,6 +12,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from lucky_forums.pubsub import StreamRouter
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lucky_forums.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# EVENT STREAMS ARE SERVED OUTSIDE DJANGO'S HANDLER (LUCKY_FORUMS.PUBSUB)
+
+application = StreamRouter(django_application)
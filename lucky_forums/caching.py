@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.db import transaction
+
+# PER-KEY ENTRIES IN THE DEFAULT CACHE (AUTHOR CARDS, MENTION NAMES, MODERATION
+# STATE, SHARED RESPONSES). A CACHE OUTAGE DEGRADES TO UNCACHED READS: LOOKUPS
+# MISS AND WRITES ARE SKIPPED, NEVER RAISED.
+
+
+def get(key):
+    try:
+        return cache.get(key)
+    except Exception:
+        return None
+
+
+def set(key, value, timeout):
+    try:
+        cache.set(key, value, timeout)
+    except Exception:
+        pass
+
+
+def read_through(ids, key, fetch, timeout):
+    """
+    {ID: VALUE} FOR ``IDS``: CACHED UNDER ``KEY(ID)``, THE REST FROM
+    ``FETCH(MISSING_IDS)`` (A DICT) AND STORED. IDS FETCH LEAVES OUT ARE
+    NEITHER RETURNED NOR CACHED.
+    """
+
+    keys = {i: key(i) for i in ids}
+    if not keys:
+        return {}
+    try:
+        cached = cache.get_many(list(keys.values()))
+    except Exception:
+        cached = {}
+    found = {i: cached[k] for i, k in keys.items() if k in cached}
+    missing = [i for i in keys if i not in found]
+    if missing:
+        fetched = fetch(missing)
+        try:
+            cache.set_many({keys[i]: v for i, v in fetched.items()}, timeout)
+        except Exception:
+            pass
+        found.update(fetched)
+    return found
+
+
+def forget(*keys):
+    """DROP ``KEYS`` NOW AND AGAIN AFTER THE CURRENT TRANSACTION COMMITS."""
+
+    keys = [k for k in keys if k]
+
+    def drop():
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            pass
+
+    # A READ RACING THE WRITE CAN RE-CACHE THE OLD VALUE BEFORE COMMIT; THE
+    # SECOND DROP CLEARS IT
+    drop()
+    transaction.on_commit(drop)
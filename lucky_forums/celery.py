@@ -0,0 +1,12 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "lucky_forums.settings")
+
+app = Celery("lucky_forums")
+
+# ALL CELERY SETTINGS LIVE IN DJANGO SETTINGS UNDER THE CELERY_ PREFIX
+
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
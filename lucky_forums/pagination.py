@@ -0,0 +1,187 @@
+import base64
+import json
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import DateTimeField, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    OPAQUE-CURSOR KEYSET PAGINATION.
+
+    PAGES ARE SLICED WITH A ``WHERE (KEY) > (CURSOR)`` FILTER OVER ``ORDERING``
+    INSTEAD OF ``OFFSET``, AND NO ``COUNT(*)`` IS ISSUED, SO A DEEP PAGE COSTS
+    THE SAME AS THE FIRST ONE. THE LAST ORDERING FIELD MUST BE UNIQUE.
+
+    PAGINATION IS OPT-IN: WITHOUT ``?CURSOR=`` OR ``?PAGE_SIZE=`` THE VIEW
+    KEEPS RETURNING A PLAIN LIST.
+    """
+
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, "keyset_ordering", None) or self.ordering)
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw in (None, ""):
+            return self.page_size
+        try:
+            size = int(raw)
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size_value = self.get_page_size(request)
+        self.fields = self.get_ordering(request, queryset, view)
+        self.model = queryset.model
+
+        position, reverse = self.decode_cursor(request)
+        order = [self._flip(f) for f in self.fields] if reverse else self.fields
+        qs = queryset.order_by(*order)
+        if position is not None:
+            qs = qs.filter(self._seek(position, reverse))
+
+        rows = list(qs[: self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[: self.page_size_value]
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # LINKS
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self._position(self.page[0]), reverse=True)
+
+    def _link(self, position, reverse):
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    # CURSOR ENCODING
+
+    def encode_cursor(self, position, reverse=False):
+        values = [v.isoformat() if isinstance(v, datetime) else v for v in position]
+        raw = json.dumps({"k": values, "r": 1 if reverse else 0}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            data = json.loads(raw)
+            values = data["k"]
+            reverse = bool(data.get("r"))
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError("cursor arity")
+            position = tuple(
+                self._parse_value(field, value)
+                for field, value in zip(self.fields, values)
+            )
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _parse_value(self, field, value):
+        name = field.lstrip("-")
+        try:
+            model_field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # NUMERIC ANNOTATION (E.G. A SEARCH RANK)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("bad annotation key")
+            return value
+        if isinstance(model_field, DateTimeField):
+            parsed = parse_datetime(value) if isinstance(value, str) else None
+            if parsed is None:
+                raise ValueError("bad datetime")
+            return parsed
+        if value is None:
+            raise ValueError("null key")
+        return model_field.to_python(value)
+
+    def _position(self, row):
+        return tuple(getattr(row, f.lstrip("-")) for f in self.fields)
+
+    # KEYSET FILTER
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def _seek(self, position, reverse):
+        # (A, B) AFTER (X, Y) == A > X OR (A = X AND B > Y), PER FIELD DIRECTION.
+        # THE REDUNDANT A >= X IS ANDED ON: AN OR ALONE GIVES THE PLANNER NO
+        # RANGE ON THE LEADING INDEX COLUMN, SO THE SCAN WOULD START AT THE TOP
+        # AND FILTER OUT EVERY EARLIER ROW
+
+        condition = Q()
+        equal = {}
+        bound = None
+        for field, value in zip(self.fields, position):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            lookup = "lt" if descending else "gt"
+            if bound is None:
+                bound = Q(**{f"{name}__{lookup}e": value})
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return bound & condition
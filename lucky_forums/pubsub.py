@@ -0,0 +1,347 @@
+import asyncio
+import io
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+
+log = logging.getLogger(__name__)
+
+
+class LocalBroker:
+    """
+    IN-PROCESS PUB/SUB. SUBSCRIBERS ARE ASYNCIO QUEUES (ONE PER STREAM, NO
+    THREAD PER CLIENT); PUBLISHERS MAY BE SYNC CODE IN ANY THREAD. MESSAGES ARE
+    DELIVERED WHEN THE PUBLISHING TRANSACTION COMMITS. ONLY REACHES STREAMS IN
+    THE SAME PROCESS, SO IT SUITS SINGLE-PROCESS SETUPS AND TESTS.
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, channel, message):
+        transaction.on_commit(lambda: self.deliver(channel, message))
+
+    def deliver(self, channel, message):
+        with self._lock:
+            targets = list(self._subscribers.get(channel, ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # LOOP ALREADY CLOSED; ITS SUBSCRIPTION IS ABOUT TO GO AWAY
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        entry = (asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers[channel].add(entry)
+        await self.started(entry[0])
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                subs = self._subscribers.get(channel)
+                if subs is not None:
+                    subs.discard(entry)
+                    if not subs:
+                        del self._subscribers[channel]
+
+    async def started(self, loop):
+        pass
+
+
+def _offer(queue, message):
+    # A STREAM THAT FALLS THIS FAR BEHIND DROPS MESSAGES RATHER THAN MEMORY
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+class PostgresBroker(LocalBroker):
+    """
+    CROSS-PROCESS PUB/SUB OVER POSTGRES LISTEN/NOTIFY. PUBLISH IS A PG_NOTIFY
+    IN THE CALLER'S TRANSACTION (POSTGRES DELIVERS IT ON COMMIT); EACH EVENT
+    LOOP KEEPS ONE LISTENING CONNECTION, WATCHED WITH ADD_READER, AND FANS
+    MESSAGES OUT TO ITS LOCAL SUBSCRIBERS.
+    """
+
+    pg_channel = "lucky_forums_events"
+
+    def __init__(self):
+        super().__init__()
+        self._listeners = {}
+
+    def publish(self, channel, message):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)",
+                [self.pg_channel, json.dumps([channel, message])],
+            )
+
+    async def started(self, loop):
+        if loop not in self._listeners:
+            self._listen(loop)
+
+    def _listen(self, loop):
+        import psycopg2
+        import psycopg2.extensions
+
+        db = settings.DATABASES["default"]
+        try:
+            conn = psycopg2.connect(
+                dbname=db["NAME"],
+                user=db["USER"],
+                password=db["PASSWORD"],
+                host=db["HOST"],
+                port=db["PORT"],
+            )
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.pg_channel}")
+        except psycopg2.Error:
+            log.warning("pubsub: LISTEN failed; retrying", exc_info=True)
+            loop.call_later(1.0, self._relisten, loop)
+            return
+        self._listeners[loop] = conn
+        loop.add_reader(conn.fileno(), self._on_readable, loop, conn)
+
+    def _relisten(self, loop):
+        if loop not in self._listeners and not loop.is_closed():
+            self._listen(loop)
+
+    def _on_readable(self, loop, conn):
+        import psycopg2
+
+        try:
+            conn.poll()
+        except psycopg2.Error:
+            log.warning("pubsub: listener connection lost; reconnecting")
+            loop.remove_reader(conn.fileno())
+            self._listeners.pop(loop, None)
+            conn.close()
+            loop.call_later(1.0, self._relisten, loop)
+            return
+        while conn.notifies:
+            note = conn.notifies.pop(0)
+            try:
+                channel, message = json.loads(note.payload)
+            except ValueError:
+                continue
+            self.deliver(channel, message)
+
+
+_BACKENDS = {"local": LocalBroker, "postgres": PostgresBroker}
+_brokers = {}
+
+
+def get_broker():
+    """THE PROCESS-WIDE BROKER FOR SETTINGS.PUBSUB_BACKEND."""
+
+    name = settings.PUBSUB_BACKEND
+    if name not in _brokers:
+        _brokers[name] = _BACKENDS[name]()
+    return _brokers[name]
+
+
+# SERVER-SENT EVENTS OVER A BROKER CHANNEL. A STREAM IS OPENED BY A SHORT SYNC
+# CALL (AUTH, LOOKUP) AND THEN WAITS ON ITS QUEUE. DJANGO'S ASGI HANDLER GIVES
+# EVERY REQUEST ITS OWN THREAD-SENSITIVE CONTEXT, WHOSE EXECUTOR THREAD WOULD
+# LIVE AS LONG AS THE STREAM, SO UNDER LUCKY_FORUMS.ASGI STREAMROUTER SERVES
+# STREAM PATHS ITSELF: THE OPENING CALL RUNS ON ASGIREF'S SHARED SYNC THREAD
+# AND AN IDLE CLIENT IS ONE SUSPENDED COROUTINE, WITH NO THREAD OR DATABASE
+# CONNECTION OF ITS OWN
+
+STREAM_HEARTBEAT = 15
+STREAM_LIFETIME = 300
+STREAM_RETRY_MS = 3000
+
+STREAM_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    # KEEP REVERSE PROXIES FROM BUFFERING THE STREAM
+    "X-Accel-Buffering": "no",
+}
+
+
+def released(func, *args, **kwargs):
+    """RUN FUNC, THEN CLOSE THIS THREAD'S CONNECTION SO STREAMS DO NOT PIN ONE."""
+
+    try:
+        return func(*args, **kwargs)
+    finally:
+        connection.close()
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _event_stream(channel, initial):
+    # SUBSCRIBE FIRST SO NOTHING PUBLISHED AFTER THE INITIAL STATE IS MISSED
+
+    async with get_broker().subscribe(channel) as queue:
+        head = f"retry: {STREAM_RETRY_MS}\n"
+        if initial is not None:
+            for message in await sync_to_async(released)(initial):
+                head += sse_event(message["event"], message["data"])
+        yield head
+
+        # STREAMS END AFTER STREAM_LIFETIME AND THE BROWSER RECONNECTS, SO
+        # CONNECTIONS FROM GONE CLIENTS DO NOT PILE UP
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + STREAM_LIFETIME
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                message = await asyncio.wait_for(
+                    queue.get(), min(STREAM_HEARTBEAT, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield sse_event(message["event"], message["data"])
+
+
+def event_stream_response(channel, initial=None):
+    """
+    TEXT/EVENT-STREAM RESPONSE RELAYING ``{"EVENT", "DATA"}`` MESSAGES
+    PUBLISHED ON ``CHANNEL``. ``INITIAL`` IS A SYNC CALLABLE RETURNING
+    MESSAGES TO SEND FIRST.
+    """
+
+    response = StreamingHttpResponse(_event_stream(channel, initial))
+    for name, value in STREAM_HEADERS.items():
+        response[name] = value
+    return response
+
+
+def event_stream_view(open_stream):
+    """
+    ASYNC VIEW FOR AN EVENT STREAM. ``OPEN_STREAM(REQUEST, **KWARGS)`` IS SYNC
+    AND RETURNS ``(CHANNEL, INITIAL)`` OR AN ERROR RESPONSE. UNDER
+    LUCKY_FORUMS.ASGI THE PATH IS SERVED BY STREAMROUTER INSTEAD; THE VIEW
+    COVERS OTHER HANDLERS (TEST CLIENTS, WSGI).
+    """
+
+    async def view(request, **kwargs):
+        opened = await sync_to_async(released)(open_stream, request, **kwargs)
+        if isinstance(opened, HttpResponse):
+            return opened
+        return event_stream_response(*opened)
+
+    view.open_stream = open_stream
+    view.__doc__ = open_stream.__doc__
+    return view
+
+
+def _open_request(scope, open_stream, kwargs):
+    # THE PARTS OF THE MIDDLEWARE STACK A STREAM NEEDS: SESSION AND USER
+
+    from importlib import import_module
+
+    from django.contrib.auth import get_user
+    from django.core.handlers.asgi import ASGIRequest
+
+    request = ASGIRequest(scope, io.BytesIO())
+    engine = import_module(settings.SESSION_ENGINE)
+    request.session = engine.SessionStore(
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    request.user = get_user(request)
+    return open_stream(request, **kwargs)
+
+
+class StreamRouter:
+    """
+    ASGI APP IN FRONT OF DJANGO'S: GET REQUESTS FOR AN EVENT_STREAM_VIEW ARE
+    SERVED HERE, OUTSIDE THE HANDLER'S PER-REQUEST THREAD; EVERYTHING ELSE
+    GOES TO ``APP``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        open_stream = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            from django.urls import Resolver404, resolve
+
+            try:
+                match = resolve(scope["path"])
+            except Resolver404:
+                match = None
+            open_stream = getattr(match and match.func, "open_stream", None)
+        if open_stream is None:
+            return await self.app(scope, receive, send)
+
+        opened = await sync_to_async(released)(
+            _open_request, scope, open_stream, match.kwargs
+        )
+        if isinstance(opened, HttpResponse):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": opened.status_code,
+                    "headers": _headers(opened.items()),
+                }
+            )
+            await send({"type": "http.response.body", "body": opened.content})
+            return
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": _headers(STREAM_HEADERS.items()),
+            }
+        )
+        await _relay(_event_stream(*opened), receive, send)
+
+
+def _headers(items):
+    return [(name.lower().encode(), value.encode()) for name, value in items]
+
+
+async def _relay(events, receive, send):
+    # A GONE CLIENT ENDS THE STREAM AT ONCE, NOT AT ITS NEXT HEARTBEAT
+
+    async def pump():
+        async for chunk in events:
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk.encode(),
+                    "more_body": True,
+                }
+            )
+        await send({"type": "http.response.body", "body": b""})
+
+    async def disconnected():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(disconnected())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await events.aclose()
+    for task in done:
+        if not task.cancelled():
+            task.result()
@@ -42,8 +42,10 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # 3RD PARTY
     "rest_framework",
+    "django_celery_beat",
     # LOCAL
     "forum",
     "users",
@@ -55,6 +57,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "users.middleware.ViewerMiddleware",
     "users.middleware.BanBlockMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -160,4 +163,107 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("users.permissions.NotBanned",),
+    # OPT-IN KEYSET PAGINATION (?PAGE_SIZE= / ?CURSOR=); PLAIN LISTS OTHERWISE
+    "DEFAULT_PAGINATION_CLASS": "lucky_forums.pagination.KeysetPagination",
+}
+
+# THREAD/POST/NOTIFICATION LISTS SERIALIZE VALUES_LIST ROWS THROUGH PLANS
+# (LUCKY_FORUMS.FASTROWS) INSTEAD OF MODEL INSTANCES; SAME OUTPUT
+
+FAST_LIST_ROWS = config("FAST_LIST_ROWS", cast=bool, default=True)
+
+# CACHE
+# REDIS WHEN REDIS_URL IS SET; PER-PROCESS MEMORY OTHERWISE. SHARED RESPONSE
+# ENTRIES ARE KEYED ON CHANGE MARKER VERSIONS (SEE FORUM.RESPONSE_CACHE), SO
+# THE TIMEOUT ONLY BOUNDS MEMORY, NOT STALENESS
+
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "lucky-forums",
+        }
+    }
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", cast=int, default=600)
+
+# WHETHER EVERY WORKER SEES THE SAME CACHE. STATE THAT MUST TAKE EFFECT AT ONCE
+# EVERYWHERE (BANS) IS ONLY CACHED WHEN IT IS
+
+SHARED_CACHE = config("SHARED_CACHE", cast=bool, default=bool(REDIS_URL))
+
+# LIVE UPDATES (LUCKY_FORUMS.PUBSUB): "POSTGRES" USES LISTEN/NOTIFY AND WORKS
+# ACROSS PROCESSES (WEB, OUTBOX WORKER); "LOCAL" IS IN-PROCESS ONLY
+
+PUBSUB_BACKEND = config("PUBSUB_BACKEND", default="postgres")
+
+# PER-KEY CACHES (LUCKY_FORUMS.CACHING), SECONDS. AN ENTRY IS DROPPED WHEN ITS
+# SOURCE ROW IS SAVED, BUT WITHOUT SHARED_CACHE ONLY IN THE SAVING WORKER;
+# OTHER WORKERS SEE THE CHANGE AFTER AT MOST THE TIMEOUT
+#   MODERATION: BAN/SILENCE STATE (USERS.MODERATION); PROFILE SAVES. NOT
+#     CACHED AT ALL WITHOUT SHARED_CACHE
+#   MENTION: USERNAME -> ID (USERS.MENTIONS); USERS CREATED, RENAMED, DELETED
+#   AUTHOR_CARD: ?INCLUDE=AUTHORS CARDS (USERS.CARDS); USER OR PROFILE SAVES
+
+MODERATION_CACHE_TIMEOUT = config("MODERATION_CACHE_TIMEOUT", cast=int, default=60)
+MENTION_CACHE_TIMEOUT = config("MENTION_CACHE_TIMEOUT", cast=int, default=300)
+AUTHOR_CARD_CACHE_TIMEOUT = config("AUTHOR_CARD_CACHE_TIMEOUT", cast=int, default=600)
+
+# USERNAME AUTOCOMPLETE (USERS.DIRECTORY): WITH A TTL (SECONDS) EACH PROCESS
+# ANSWERS FROM AN IN-MEMORY SORTED ARRAY REBUILT THAT OFTEN; 0 QUERIES THE
+# PREFIX INDEX EVERY TIME
+
+USERNAME_INDEX_TTL = config("USERNAME_INDEX_TTL", cast=int, default=0)
+
+# NOTIFICATIONS (USERS.NOTIFICATIONS): AN UNREAD ROW FOR THE SAME TYPE AND TARGET
+# TOUCHED WITHIN THE WINDOW (SECONDS) ABSORBS NEW ONES; READ ROWS OLDER THAN
+# THE RETENTION (DAYS) ARE PURGED DAILY
+
+NOTIFICATION_COALESCE_WINDOW = config(
+    "NOTIFICATION_COALESCE_WINDOW", cast=int, default=6 * 60 * 60
+)
+NOTIFICATION_RETENTION_DAYS = config(
+    "NOTIFICATION_RETENTION_DAYS", cast=int, default=90
+)
+
+# CELERY
+# WITHOUT A BROKER TASKS RUN EAGERLY IN-PROCESS; SCHEDULED JOBS ALSO HAVE
+# MANAGEMENT COMMANDS (E.G. `MANAGE.PY RANK_THREADS`, `DRAIN_OUTBOX --LOOP`)
+
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default="")
+CELERY_TASK_ALWAYS_EAGER = config(
+    "CELERY_TASK_ALWAYS_EAGER", cast=bool, default=not CELERY_BROKER_URL
+)
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "rank-active-threads": {
+        "task": "forum.tasks.rank_threads",
+        "schedule": 300.0,
+    },
+    "rank-all-threads": {
+        "task": "forum.tasks.rank_threads",
+        "schedule": 24 * 60 * 60.0,
+        "kwargs": {"full": True},
+    },
+    # SAFETY NET FOR LOST WAKE-UPS; EVENTS NORMALLY DRAIN RIGHT AFTER COMMIT
+    "drain-outbox": {
+        "task": "users.tasks.drain_outbox",
+        "schedule": 30.0,
+    },
+    "purge-outbox": {
+        "task": "users.tasks.purge_outbox",
+        "schedule": 24 * 60 * 60.0,
+    },
+    "purge-notifications": {
+        "task": "users.tasks.purge_notifications",
+        "schedule": 24 * 60 * 60.0,
+    },
 }
@@ -1,5 +1,12 @@
-import bleach
+import hashlib
+import json
+import signal
+import threading
+from html import escape
+from typing import Iterable, List
+
 import markdown as md
+from bleach.sanitizer import Cleaner
 
 ALLOWED_TAGS = [
     "p",
@@ -19,26 +26,166 @@ ALLOWED_TAGS = [
     "h3",
 ]
 ALLOWED_ATTRS = {"a": ["href", "title", "rel", "target"]}
+MARKDOWN_EXTENSIONS = ["extra", "sane_lists", "smarty"]
+
+# HARD LIMITS PER DOCUMENT; SEE MARKDOWNRENDERER
+
+MAX_RENDER_CHARS = 50_000
+RENDER_TIME_BUDGET = 0.5
+
+# BUMP WHEN THE RENDERING PIPELINE CHANGES. STORED BODY_HTML IS STAMPED WITH
+# RENDER_VERSION, WHICH ALSO CHANGES WITH THE ALLOWED TAGS/ATTRS POLICY; ROWS
+# WITH ANOTHER STAMP ARE RE-RENDERED BY `MANAGE.PY RERENDER_BODIES`.
+
+RENDERER_REVISION = 3
+RENDER_VERSION = "{}-{}".format(
+    RENDERER_REVISION,
+    hashlib.sha1(
+        json.dumps([ALLOWED_TAGS, ALLOWED_ATTRS], sort_keys=True).encode("utf-8")
+    ).hexdigest()[:8],
+)
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+class MarkdownRenderer:
+    """
+    REUSABLE MARKDOWN -> SANITIZED HTML PIPELINE.
+
+    MARKDOWN AND BLEACH CLEANER INSTANCES ARE BUILT ONCE PER THREAD AND RESET
+    BETWEEN DOCUMENTS. INPUT LONGER THAN ``MAX_CHARS``, OR A RENDER THAT RUNS
+    PAST ``TIME_BUDGET`` SECONDS OR RECURSES TOO DEEP, FALLS BACK TO ESCAPED
+    PLAIN TEXT SO ONE PATHOLOGICAL POST CANNOT STALL A WORKER. THE TIME GUARD
+    USES SIGALRM AND SO ONLY APPLIES ON THE MAIN THREAD (GUNICORN SYNC WORKERS,
+    MANAGEMENT COMMANDS); ELSEWHERE THE SIZE GUARD IS THE LIMIT.
+    """
+
+    def __init__(
+        self,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRS,
+        extensions=MARKDOWN_EXTENSIONS,
+        max_chars=MAX_RENDER_CHARS,
+        time_budget=RENDER_TIME_BUDGET,
+    ):
+        self.tags = list(tags)
+        self.attributes = dict(attributes)
+        self.extensions = list(extensions)
+        self.max_chars = max_chars
+        self.time_budget = time_budget
+        self._local = threading.local()
+
+    def _engines(self):
+        local = self._local
+        if not hasattr(local, "markdown"):
+            local.markdown = md.Markdown(extensions=self.extensions)
+            local.cleaner = Cleaner(
+                tags=self.tags, attributes=self.attributes, strip=True
+            )
+        return local.markdown, local.cleaner
+
+    def _convert(self, text):
+        converter, cleaner = self._engines()
+        try:
+            html = converter.convert(text)
+        finally:
+            converter.reset()
+        return cleaner.clean(html)
+
+    def _guarded(self, text):
+        use_alarm = (
+            self.time_budget
+            and hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        )
+        if not use_alarm:
+            return self._convert(text)
+
+        def on_alarm(signum, frame):
+            raise RenderTimeout()
+
+        previous = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, self.time_budget)
+        try:
+            return self._convert(text)
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+    def render(self, text: str) -> str:
+        if not text:
+            return ""
+        if len(text) > self.max_chars:
+            return plain_text_html(text[: self.max_chars])
+        try:
+            html = self._guarded(text)
+        except (RenderTimeout, RecursionError):
+            # DEEP NESTING BLOWS THE STACK; THE INTERRUPTED MARKDOWN INSTANCE
+            # MAY HOLD PARTIAL STATE
+            self._local.__dict__.clear()
+            return plain_text_html(text)
+        return html
+
+    def render_many(self, texts: Iterable[str]) -> List[str]:
+        return [self.render(t) for t in texts]
+
+
+def plain_text_html(text: str) -> str:
+    return "<p>{}</p>".format(escape(text).replace("\n", "<br>"))
+
+
+default_renderer = MarkdownRenderer()
 
 
 def render_markdown_safe(text: str) -> str:
-    if not text:
-        return ""
-    html = md.markdown(text, extensions=["extra", "sane_lists", "smarty"])
+    return default_renderer.render(text)
+
+
+def render_markdown_many(texts: Iterable[str]) -> List[str]:
+    return default_renderer.render_many(texts)
+
+
+def render_body_html(text: str) -> str:
+    """
+    STORED BODY_HTML: THE SANITIZED RENDER PLUS LINKS FOR @MENTIONS OF EXISTING
+    USERS. THE RENDERER ITSELF STAYS PURE (NO CACHE OR DATABASE), SO IT CAN RUN
+    IN WORKER PROCESSES; SEE USERS.MENTIONS.LINK_MENTIONS_MANY FOR BATCHES.
+    """
+
+    from users.mentions import link_mentions
+
+    return link_mentions(render_markdown_safe(text))
 
-    # GENERATE HTML
 
-    cleaned = bleach.clean(
-        html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRS, strip=True
-    )
+class RenderedBodyMixin:
+    """
+    KEEPS ``BODY_HTML`` / ``BODY_HTML_VERSION`` IN SYNC WITH ``BODY``.
 
-    # LINKIFY @MENTIONS TO PROFILE PAGES (SIMPLE REGEX)
+    THE MODEL DECLARES THE TWO FIELDS; RENDERING HAPPENS ON SAVE WHENEVER THE
+    BODY IS WRITTEN, SO READS NEVER RUN MARKDOWN/BLEACH.
+    """
 
-    import re
+    def render_body(self):
+        self.body_html = render_body_html(self.body)
+        self.body_html_version = RENDER_VERSION
 
-    def repl(m):
-        uname = m.group(1)
-        return f'<a href="/u/{uname}/" class="text-decoration-none">@{uname}</a>'
+    def get_body_html(self):
+        # STALE OR MISSING ROWS STILL RENDER SAFELY UNTIL RE-RENDERED, WITHOUT
+        # MENTION LINKS: A PER-ROW USERNAME LOOKUP HAS NO PLACE ON THE READ PATH
+        if self.body_html_version == RENDER_VERSION:
+            return self.body_html
+        return render_markdown_safe(self.body)
 
-    cleaned = re.sub(r"@([A-Za-z0-9_]{1,30})", repl, cleaned)
-    return cleaned
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "body" in update_fields:
+            self.render_body()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields,
+                    "body_html",
+                    "body_html_version",
+                }
+        super().save(*args, **kwargs)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from lucky_forums import caching
+
+# AUTHOR CARDS: THE USERINLINESERIALIZER OBJECT (ID, USERNAME, AVATAR URL, JOIN
+# DATE, STAFF FLAGS, MODERATION TIMESTAMPS) CACHED PER USER. LISTS THAT
+# SIDELOAD AUTHORS (?INCLUDE=AUTHORS, SEE FORUM.SIDELOAD) SHIP EACH CARD ONCE.
+# USERS.SIGNALS DROPS A CARD WHEN ITS USER OR PROFILE IS SAVED OR DELETED.
+
+
+def _key(user_id):
+    return f"author_card:{user_id}"
+
+
+def build_cards(users):
+    from forum.serializers import UserInlineSerializer
+
+    return {u.pk: dict(UserInlineSerializer(u).data) for u in users}
+
+
+def author_cards(user_ids):
+    """{USER_ID: CARD} FOR THOSE OF ``USER_IDS`` THAT EXIST."""
+
+    def fetch(ids):
+        users = get_user_model().objects.select_related("profile").filter(pk__in=ids)
+        return build_cards(users)
+
+    ids = sorted({uid for uid in user_ids if uid is not None})
+    return caching.read_through(ids, _key, fetch, settings.AUTHOR_CARD_CACHE_TIMEOUT)
+
+
+def forget_author_card(user_id):
+    caching.forget(_key(user_id))
@@ -0,0 +1,169 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+
+# USERNAME PREFIX LOOKUPS FOR @MENTION AUTOCOMPLETE (GET /API/USERS/?PREFIX=).
+# MATCHES ARE CASE-INSENSITIVE AND RANKED BY LAST ACTIVITY: THE NEWER OF THE
+# LAST LOGIN, SIGN-UP AND NEWEST POST (FORUM_POST_AUTHOR_IDX). USERS_PROFILE IS
+# NOT READ.
+#
+# THE QUERY GOES THROUGH THE LOWER(USERNAME) COLLATE "C" INDEX
+# (USERS/MIGRATIONS/0008) AND RANKS ONLY THE FIRST CANDIDATES MATCHES IN NAME
+# ORDER: A PREFIX MATCHED BY MORE USERS THAN THAT (ONE OR TWO LETTERS ON A BIG
+# SITE) MAY MISS A MORE ACTIVE USER FURTHER DOWN THE ALPHABET. EACH KEYSTROKE
+# NARROWS THE PREFIX UNTIL THE RANKING IS EXACT.
+#
+# WITH USERNAME_INDEX_TTL > 0 EACH PROCESS KEEPS EVERY ACTIVE USER IN MEMORY,
+# IN NAME ORDER AND IN ACTIVITY ORDER, AND ALWAYS RANKS EXACTLY: A SPARSE
+# PREFIX RANKS ITS RUN OF THE NAME ORDER, A DENSE ONE (AT LEAST ONE USER IN
+# CANDIDATES) WALKS THE ACTIVITY ORDER UNTIL IT HAS ENOUGH. IT IS REBUILT AFTER THE TTL; SIGN-UPS, RENAMES AND DELETIONS IN THIS PROCESS
+# ARE PATCHED IN AFTER COMMIT (USERS.SIGNALS)
+
+CANDIDATES = 200
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+
+_ACTIVITY = "GREATEST(u.last_login, u.date_joined, p.created_at)"
+
+_PREFIX_SQL = f"""
+    SELECT u.id, u.username, {_ACTIVITY} AS active_at
+    FROM (
+        SELECT id, username, last_login, date_joined
+        FROM auth_user
+        WHERE lower(username) COLLATE "C" LIKE %s AND is_active
+        ORDER BY lower(username) COLLATE "C"
+        LIMIT %s
+    ) u
+    LEFT JOIN LATERAL (
+        SELECT created_at FROM forum_post
+        WHERE author_id = u.id
+        ORDER BY created_at DESC
+        LIMIT 1
+    ) p ON true
+    ORDER BY active_at DESC, lower(u.username) COLLATE "C", u.id
+    LIMIT %s
+"""
+
+_ALL_SQL = f"""
+    SELECT u.id, u.username, {_ACTIVITY} AS active_at
+    FROM auth_user u
+    LEFT JOIN (
+        SELECT author_id, max(created_at) AS created_at
+        FROM forum_post GROUP BY author_id
+    ) p ON p.author_id = u.id
+    WHERE u.is_active
+"""
+
+
+def _like_prefix(prefix):
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def _row(user_id, username):
+    return {"id": user_id, "username": username}
+
+
+def _rank_key(row):
+    # (LOWER(USERNAME), ID, USERNAME, ACTIVE_AT) -> NEWEST ACTIVITY FIRST, THEN NAME
+    return (-(row[3] or 0), row[0], row[1])
+
+
+class UsernameIndex:
+    """
+    PER-PROCESS SORTED ARRAYS OF (LOWER(USERNAME), ID, USERNAME, ACTIVE_AT):
+    ONE IN NAME ORDER, ONE IN RANK ORDER.
+
+    A PREFIX IS A CONTIGUOUS RUN OF THE NAME ORDER, FOUND WITH TWO BISECTIONS.
+    THE ARRAYS ARE REPLACED AS A WHOLE, SO READERS NEVER TAKE THE LOCK.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = ([], [])
+        self._built_at = None
+
+    def invalidate(self):
+        self._built_at = None
+
+    def _fresh(self, ttl):
+        built = self._built_at
+        return built is not None and time.monotonic() - built < ttl
+
+    def _build(self):
+        with connection.cursor() as cur:
+            cur.execute(_ALL_SQL)
+            rows = [
+                (name.lower(), uid, name, at.timestamp() if at else None)
+                for uid, name, at in cur.fetchall()
+            ]
+        rows.sort()
+        return rows, sorted(rows, key=_rank_key)
+
+    def patch(self, user_id, old=None, new=None, active_at=None):
+        """
+        AFTER COMMIT, MOVE ONE USER FROM ``OLD`` TO ``NEW`` (USERNAMES; NONE
+        FOR A SIGN-UP OR A DELETION) INSTEAD OF REBUILDING THE WHOLE INDEX. A
+        RENAME KEEPS THE STORED ACTIVITY.
+        """
+
+        transaction.on_commit(lambda: self._patch(user_id, old, new, active_at))
+
+    def _patch(self, user_id, old, new, active_at):
+        # A REBUILD RACING THE COMMIT MAY ALREADY HOLD THE NEW STATE, SO BOTH
+        # NAMES ARE DROPPED FIRST
+        with self._lock:
+            if self._built_at is None:
+                return
+            names, ranked = (list(a) for a in self._data)
+            for name in {old, new} - {None}:
+                key = (name.lower(), user_id)
+                i = bisect_left(names, key)
+                if i < len(names) and names[i][:2] == key:
+                    entry = names.pop(i)
+                    del ranked[bisect_left(ranked, _rank_key(entry), key=_rank_key)]
+                    if active_at is None:
+                        active_at = entry[3]
+            if new is not None:
+                entry = (new.lower(), user_id, new, active_at)
+                insort(names, entry)
+                insort(ranked, entry, key=_rank_key)
+            self._data = (names, ranked)
+
+    def lookup(self, prefix, limit, ttl):
+        if not self._fresh(ttl):
+            with self._lock:
+                if not self._fresh(ttl):
+                    self._data = self._build()
+                    self._built_at = time.monotonic()
+        names, ranked = self._data
+        start = bisect_left(names, (prefix,))
+        stop = bisect_left(names, (prefix + "\uffff",), start)
+        if (stop - start) * CANDIDATES < len(names):
+            matches = heapq.nsmallest(limit, names[start:stop], key=_rank_key)
+        else:
+            # AT LEAST ONE USER IN CANDIDATES MATCHES, SO A WALK IN RANK ORDER
+            # MEETS LIMIT MATCHES AFTER ABOUT LIMIT * CANDIDATES ENTRIES
+            matches = (r for r in ranked if r[0].startswith(prefix))
+        return [_row(r[1], r[2]) for r in islice(matches, limit)]
+
+
+username_index = UsernameIndex()
+
+
+def search_usernames(prefix, limit=DEFAULT_LIMIT):
+    """UP TO ``LIMIT`` ACTIVE USERS WHOSE NAME STARTS WITH ``PREFIX``."""
+
+    prefix = prefix.lower()
+    limit = max(1, min(limit, MAX_LIMIT))
+    ttl = settings.USERNAME_INDEX_TTL
+    if ttl > 0:
+        return username_index.lookup(prefix, limit, ttl)
+    with connection.cursor() as cur:
+        cur.execute(_PREFIX_SQL, [_like_prefix(prefix), CANDIDATES, limit])
+        return [_row(uid, name) for uid, name, _ in cur.fetchall()]
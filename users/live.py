@@ -0,0 +1,72 @@
+from lucky_forums.pubsub import get_broker
+
+from .unread import unread_counts
+
+# PER-USER CHANNEL FOR THE NOTIFICATION STREAM (USERS.NOTIFICATIONS_API)
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def notification_event(n, unread):
+    return {
+        "event": "notification",
+        "data": {
+            "id": n.id,
+            "type": n.type,
+            "payload": n.payload,
+            "count": n.count,
+            "created_at": int(n.created_at.timestamp()),
+            "read_at": None,
+            "unread": unread,
+        },
+    }
+
+
+def publish_notifications(notifications):
+    """PUSH FRESHLY INSERTED NOTIFICATIONS (WITH THE NEW UNREAD COUNT)."""
+
+    if not notifications:
+        return
+    counts = unread_counts({n.user_id for n in notifications})
+    broker = get_broker()
+    for n in notifications:
+        broker.publish(
+            user_channel(n.user_id), notification_event(n, counts[n.user_id])
+        )
+
+
+def unread_events(user_id):
+    return [{"event": "unread", "data": {"unread": unread_counts([user_id])[user_id]}}]
+
+
+def publish_unread(user_id):
+    get_broker().publish(user_channel(user_id), *unread_events(user_id))
+
+
+def stream_user(request):
+    """
+    (USER, STATUS) FOR AN EVENT STREAM REQUEST. EVENTSOURCE CANNOT SEND
+    HEADERS, SO BESIDES THE SESSION A JWT ACCESS TOKEN IS ACCEPTED AS
+    ``?TOKEN=``. STATUS IS 401 FOR A BAD TOKEN AND 403 FOR A BANNED USER;
+    ANONYMOUS USERS PASS WITH 200.
+    """
+
+    from .moderation import moderation_status
+
+    user = request.user
+    token = request.GET.get("token")
+    if not user.is_authenticated and token:
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+        auth = JWTAuthentication()
+        try:
+            user = auth.get_user(auth.get_validated_token(token))
+        except (AuthenticationFailed, InvalidToken, TokenError):
+            return user, 401
+    if user.is_authenticated and moderation_status(user).is_banned:
+        return user, 403
+    return user, 200
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import drain_all, purge_processed
+
+
+class Command(BaseCommand):
+    help = "process pending outbox events (notifications); --loop to keep running."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="poll until stopped")
+        parser.add_argument(
+            "--interval", type=float, default=1.0, help="idle poll interval (s)"
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--purge", action="store_true", help="also delete old processed events"
+        )
+
+    def handle(self, *args, **options):
+        batch = max(1, options["batch_size"])
+        if options["purge"]:
+            self.stdout.write(f"purged {purge_processed()} event(s).")
+        if not options["loop"]:
+            self.stdout.write(f"processed {drain_all(batch)} event(s).")
+            return
+        try:
+            while True:
+                if not drain_all(batch):
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users.notifications import purge_read
+
+
+class Command(BaseCommand):
+    help = "delete read notifications older than the retention period, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, help="default: settings.NOTIFICATION_RETENTION_DAYS"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_read(options.get("days"), max(1, options["batch_size"]))
+        self.stdout.write(f"purged {deleted} notification(s).")
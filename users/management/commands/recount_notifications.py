@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.unread import reconcile
+
+
+class Command(BaseCommand):
+    help = "reconcile per-user unread notification counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="only reconcile this user")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        qs = get_user_model().objects.order_by("id")
+        if options.get("username"):
+            qs = qs.filter(username=options["username"])
+        batch = max(1, options["batch_size"])
+
+        # WALK IDS IN BOUNDED BATCHES SO A LARGE TABLE IS NEVER LOCKED AT ONCE
+
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch])
+            if not ids:
+                break
+            with transaction.atomic():
+                total += reconcile(ids)
+            last_id = ids[-1]
+        self.stdout.write(f"reconciled {total} counter(s).")
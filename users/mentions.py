@@ -0,0 +1,114 @@
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from lucky_forums import caching
+
+# @MENTIONS ARE FOUND IN RENDERED (SANITIZED) HTML, SO MARKDOWN HAS ALREADY
+# DECIDED WHAT IS CODE: TEXT INSIDE <CODE>, <PRE> AND EXISTING LINKS IS SKIPPED,
+# AS ARE ADDRESSES LIKE BOB@EXAMPLE.COM. CANDIDATES RESOLVE THROUGH A CACHED
+# USERNAME -> ID INDEX (MISSES CACHED TOO), DROPPED BY USERS.SIGNALS WHEN A USER
+# IS CREATED, RENAMED OR DELETED, SO MOST BODIES NEED NO MENTION QUERY AT ALL.
+
+MENTION_RE = re.compile(r"(?<![\w@/])@([A-Za-z0-9_]{1,30})(?!\w)")
+
+_LINK = '<a href="/u/{0}/" class="text-decoration-none">@{0}</a>'
+_LINKED_RE = re.compile(
+    r'<a href="/u/([A-Za-z0-9_]{1,30})/" class="text-decoration-none">@\1</a>'
+)
+
+_TAG_RE = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9]*)[^>]*>")
+_SKIP_TAGS = {"a", "code", "pre"}
+
+
+def _runs(html):
+    # (CHUNK, LINKABLE) PIECES OF HTML; TAGS AND SKIPPED ELEMENTS ARE NOT LINKABLE
+
+    depth = 0
+    pos = 0
+    for m in _TAG_RE.finditer(html):
+        if m.start() > pos:
+            yield html[pos : m.start()], depth == 0
+        yield m.group(0), False
+        if m.group(2).lower() in _SKIP_TAGS and not m.group(0).endswith("/>"):
+            depth = max(depth - 1, 0) if m.group(1) else depth + 1
+        pos = m.end()
+    if pos < len(html):
+        yield html[pos:], depth == 0
+
+
+def _names(runs):
+    names = set()
+    for chunk, linkable in runs:
+        if linkable and "@" in chunk:
+            names.update(MENTION_RE.findall(chunk))
+    return names
+
+
+def candidates(html):
+    """
+    USERNAMES MENTIONED IN ``HTML``: ALREADY LINKED BY LINK_MENTIONS (STORED
+    BODY_HTML), OR A PLAIN @NAME OUTSIDE CODE AND LINKS.
+    """
+
+    html = html or ""
+    return _names(_runs(html)) | set(_LINKED_RE.findall(html))
+
+
+def link_mentions(html):
+    """LINK @NAME TO THE PROFILE PAGE FOR USERS THAT EXIST."""
+
+    return link_mentions_many([html])[0]
+
+
+def link_mentions_many(htmls):
+    """LINK_MENTIONS OVER A BATCH, RESOLVING ALL NAMES WITH ONE LOOKUP."""
+
+    docs = [list(_runs(html or "")) for html in htmls]
+    found = [_names(runs) for runs in docs]
+    known = resolve(set().union(*found))
+
+    def link(m):
+        name = m.group(1)
+        if name not in known:
+            return m.group(0)
+        return _LINK.format(name)
+
+    return [
+        (
+            "".join(
+                MENTION_RE.sub(link, chunk) if linkable else chunk
+                for chunk, linkable in runs
+            )
+            if names
+            else html
+        )
+        for html, runs, names in zip(htmls, docs, found)
+    ]
+
+
+def _key(username):
+    return f"mention:{username}"
+
+
+def resolve(usernames):
+    """{USERNAME: USER_ID} FOR THOSE OF ``USERNAMES`` THAT EXIST."""
+
+    def fetch(names):
+        rows = dict(
+            get_user_model()
+            .objects.filter(username__in=names)
+            .values_list("username", "id")
+        )
+        # 0 MARKS A NAME THAT DOES NOT EXIST
+        return {n: rows.get(n, 0) for n in names}
+
+    found = caching.read_through(
+        sorted(set(usernames)), _key, fetch, settings.MENTION_CACHE_TIMEOUT
+    )
+    return {n: uid for n, uid in found.items() if uid}
+
+
+def forget_usernames(*usernames):
+    caching.forget(*[_key(n) for n in usernames if n])
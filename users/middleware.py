@@ -1,6 +1,18 @@
 from django.http import JsonResponse
 from django.shortcuts import render
-from django.utils import timezone
+
+from .viewer import get_viewer
+
+
+class ViewerMiddleware:
+    """ATTACH REQUEST.VIEWER (USERS.VIEWER) FOR THE SESSION USER."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        get_viewer(request)
+        return self.get_response(request)
 
 
 class BanBlockMiddleware:
@@ -9,19 +21,17 @@ class BanBlockMiddleware:
 
     def __call__(self, request):
         path = request.path or ""
-        if (request.user.is_authenticated) and hasattr(request.user, "profile"):
-            prof = request.user.profile
-            if prof.banned_until and prof.banned_until > timezone.now():
-                # ALLOW SOME PATHS
-
-                allowed = (
-                    path.startswith("/static/")
-                    or path.startswith("/media/")
-                    or path.startswith("/auth/")
-                    or path == "/banned/"
-                )
-                if not allowed:
-                    if path.startswith("/api/"):
-                        return JsonResponse({"detail": "Banned user"}, status=403)
-                    return render(request, "banned.html", status=403)
+        if request.viewer.is_banned:
+            # ALLOW SOME PATHS
+
+            allowed = (
+                path.startswith("/static/")
+                or path.startswith("/media/")
+                or path.startswith("/auth/")
+                or path == "/banned/"
+            )
+            if not allowed:
+                if path.startswith("/api/"):
+                    return JsonResponse({"detail": "Banned user"}, status=403)
+                return render(request, "banned.html", status=403)
         return self.get_response(request)
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-17 20:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# SEE FORUM/MIGRATIONS/0006_SEARCH_VECTOR.PY
+
+TRIGGER_SQL = """
+CREATE TRIGGER users_profilecomment_search_vector_trg
+BEFORE INSERT OR UPDATE OF body, search_vector ON users_profilecomment
+FOR EACH ROW EXECUTE FUNCTION
+tsvector_update_trigger(search_vector, 'pg_catalog.english', body);
+UPDATE users_profilecomment SET search_vector = to_tsvector('pg_catalog.english', body);
+"""
+
+DROP_SQL = (
+    "DROP TRIGGER IF EXISTS users_profilecomment_search_vector_trg"
+    " ON users_profilecomment;"
+)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_rendered_body_html"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profilecomment",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="profilecomment",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="users_comment_search_idx"
+            ),
+        ),
+        migrations.RunSQL(TRIGGER_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,145 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:18
+
+import json
+
+import django.db.models.fields.json
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models, transaction
+
+# TEXT -> JSONB WITHOUT A TABLE REWRITE UNDER LOCK: ADD A NULLABLE JSONB
+# COLUMN, COPY ROWS OVER IN SHORT BATCHES (EACH ITS OWN TRANSACTION), THEN
+# SWAP THE COLUMNS AND BUILD THE INDEXES CONCURRENTLY. THE SWAP IS ONE
+# TRANSACTION UNDER A TABLE LOCK THAT FIRST COPIES ROWS INSERTED SINCE THE
+# BATCHED COPY, SO NO PAYLOAD IS LEFT NULL (AND LATER DEFAULTED TO {})
+
+BATCH_SIZE = 1000
+
+
+def _decode(raw):
+    try:
+        value = json.loads(raw or "{}")
+    except ValueError:
+        return {"text": raw}
+    return value if isinstance(value, dict) else {"value": value}
+
+
+def copy_payloads(apps, schema_editor):
+    Notification = apps.get_model("users", "Notification")
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Notification.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "payload")[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+            for n in batch:
+                n.payload_jsonb = _decode(n.payload)
+            Notification.objects.bulk_update(batch, ["payload_jsonb"])
+        last_id = batch[-1].id
+
+
+def copy_payloads_back(apps, schema_editor):
+    Notification = apps.get_model("users", "Notification")
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Notification.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "payload_jsonb")[:BATCH_SIZE]
+            )
+            if not batch:
+                return
+            for n in batch:
+                n.payload = json.dumps(n.payload_jsonb or {})
+            Notification.objects.bulk_update(batch, ["payload"])
+        last_id = batch[-1].id
+
+
+def swap_columns(apps, schema_editor):
+    # THE MIGRATION IS NON-ATOMIC (CONCURRENT INDEXES), SO THE SWAP OPENS ITS
+    # OWN TRANSACTION; THE LOCK HOLDS OFF WRITERS UNTIL THE RENAME COMMITS
+
+    Notification = apps.get_model("users", "Notification")
+    with transaction.atomic(using=schema_editor.connection.alias):
+        schema_editor.execute("LOCK TABLE users_notification IN ACCESS EXCLUSIVE MODE")
+        late = list(
+            Notification.objects.filter(payload_jsonb__isnull=True).only(
+                "id", "payload"
+            )
+        )
+        for n in late:
+            n.payload_jsonb = _decode(n.payload)
+        Notification.objects.bulk_update(late, ["payload_jsonb"], batch_size=BATCH_SIZE)
+        for sql in [
+            "ALTER TABLE users_notification DROP COLUMN payload",
+            "ALTER TABLE users_notification RENAME COLUMN payload_jsonb TO payload",
+            "ALTER TABLE users_notification ALTER COLUMN payload SET NOT NULL",
+        ]:
+            schema_editor.execute(sql)
+
+
+def unswap_columns(apps, schema_editor):
+    with transaction.atomic(using=schema_editor.connection.alias):
+        for sql in [
+            "ALTER TABLE users_notification ALTER COLUMN payload DROP NOT NULL",
+            "ALTER TABLE users_notification RENAME COLUMN payload TO payload_jsonb",
+            "ALTER TABLE users_notification ADD COLUMN payload text NOT NULL DEFAULT ''",
+            "ALTER TABLE users_notification ALTER COLUMN payload DROP DEFAULT",
+        ]:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("users", "0004_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="payload_jsonb",
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(copy_payloads, copy_payloads_back, atomic=False),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(swap_columns, unswap_columns),
+            ],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name="notification",
+                    name="payload",
+                ),
+                migrations.RenameField(
+                    model_name="notification",
+                    old_name="payload_jsonb",
+                    new_name="payload",
+                ),
+                migrations.AlterField(
+                    model_name="notification",
+                    name="payload",
+                    field=models.JSONField(default=dict),
+                ),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                django.db.models.fields.json.KeyTransform("thread_slug", "payload"),
+                name="users_notif_thread_slug_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="notification",
+            index=models.Index(
+                django.db.models.fields.json.KeyTransform("actor", "payload"),
+                name="users_notif_actor_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0006_unread_counter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="count",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="group_key",
+            field=models.CharField(blank=True, default="", max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(
+                    ("read_at__isnull", True),
+                    models.Q(("group_key", ""), _negated=True),
+                ),
+                fields=["user", "group_key", "-created_at"],
+                name="users_notif_group_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("read_at__isnull", False)),
+                fields=["created_at"],
+                name="users_notif_read_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:34
+
+from django.db import migrations
+
+# AUTH_USER BELONGS TO DJANGO.CONTRIB.AUTH, SO THE PREFIX INDEX USED BY
+# USERS.DIRECTORY IS PLAIN SQL. UNDER THE "C" COLLATION THE B-TREE SERVES BOTH
+# LIKE 'ABC%' AND THE NAME ORDER, SO A PREFIX SCAN STOPS AT ITS LIMIT (A
+# TEXT_PATTERN_OPS INDEX MATCHES TOO BUT SORTS EVERY MATCH)
+
+CREATE_SQL = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS users_username_prefix_idx
+    ON auth_user ((lower(username) COLLATE "C"))
+"""
+
+DROP_SQL = "DROP INDEX CONCURRENTLY IF EXISTS users_username_prefix_idx"
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("users", "0007_notification_coalescing"),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 21:35
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("users", "0008_username_prefix_index"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="profilecomment",
+            index=models.Index(
+                fields=["profile", "created_at", "id"], name="users_comment_profile_idx"
+            ),
+        ),
+    ]
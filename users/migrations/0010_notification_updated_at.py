@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-17 22:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# EXISTING ROWS START THEIR COALESCE WINDOW AT CREATED_AT (WHICH FOLDS USED TO
+# MOVE); THE COLUMN IS ADDED NULLABLE, FILLED AND ONLY THEN MADE NOT NULL, SO
+# NO ROW IS STAMPED WITH THE MIGRATION TIME
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0009_comment_profile_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="notification",
+            name="users_notif_group_idx",
+        ),
+        migrations.AddField(
+            model_name="notification",
+            name="updated_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunSQL(
+            "UPDATE users_notification SET updated_at = created_at",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="notification",
+            name="updated_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(
+                    ("read_at__isnull", True),
+                    models.Q(("group_key", ""), _negated=True),
+                ),
+                fields=["user", "group_key", "-updated_at"],
+                name="users_notif_fold_idx",
+            ),
+        ),
+    ]
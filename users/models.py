@@ -1,7 +1,12 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.fields.json import KeyTransform
 from django.utils import timezone
 
+from lucky_forums.utils import RenderedBodyMixin
+
 
 class Profile(models.Model):
     user = models.OneToOneField(
@@ -20,7 +25,7 @@ class Profile(models.Model):
         return f"profile({self.user.username})"
 
 
-class ProfileComment(models.Model):
+class ProfileComment(RenderedBodyMixin, models.Model):
     profile = models.ForeignKey(
         Profile, on_delete=models.CASCADE, related_name="comments"
     )
@@ -30,11 +35,27 @@ class ProfileComment(models.Model):
         related_name="profile_comments",
     )
     body = models.TextField()
+    body_html = models.TextField(blank=True, default="", editable=False)
+    body_html_version = models.CharField(
+        max_length=32, blank=True, default="", editable=False
+    )
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     edited_at = models.DateTimeField(null=True, blank=True)
 
+    # FULL-TEXT SEARCH; MAINTAINED BY A DATABASE TRIGGER (SEE FORUM.SEARCH)
+
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="users_comment_search_idx"),
+            # KEYSET PAGINATION OVER (CREATED_AT, ID) WITHIN A PROFILE
+            models.Index(
+                fields=["profile", "created_at", "id"],
+                name="users_comment_profile_idx",
+            ),
+        ]
 
 
 class ProfileCommentEdit(models.Model):
@@ -72,8 +93,96 @@ class Notification(models.Model):
     )
     type = models.CharField(max_length=32, choices=TYPE_CHOICES)
 
-    # JSON STRING TO KEEP SIMPLE
+    # JSONB; THE KEYS QUERIED IN SQL (THREAD_SLUG, ACTOR) HAVE EXPRESSION INDEXES
 
-    payload = models.TextField()
+    payload = models.JSONField(default=dict)
     created_at = models.DateTimeField(default=timezone.now)
     read_at = models.DateTimeField(null=True, blank=True)
+
+    # COALESCING (USERS.NOTIFICATIONS): "<TYPE>:<TARGET>" FOR FOLDABLE TYPES, HOW
+    # MANY EVENTS THIS ROW STANDS FOR AND WHEN THE LATEST WAS FOLDED IN (THE
+    # WINDOW RUNS FROM HERE; CREATED_AT NEVER MOVES)
+
+    group_key = models.CharField(max_length=255, blank=True, default="")
+    count = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # THE KEYSET-PAGINATED INBOX, ALL AND UNREAD-ONLY
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="users_notif_inbox_idx",
+            ),
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                condition=models.Q(read_at__isnull=True),
+                name="users_notif_unread_idx",
+            ),
+            # THE UNREAD ROW TO FOLD INTO
+            models.Index(
+                fields=["user", "group_key", "-updated_at"],
+                condition=models.Q(read_at__isnull=True) & ~models.Q(group_key=""),
+                name="users_notif_fold_idx",
+            ),
+            # RETENTION PURGE OF OLD READ ROWS
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(read_at__isnull=False),
+                name="users_notif_read_idx",
+            ),
+            # MATCH ``PAYLOAD__THREAD_SLUG=`` / ``PAYLOAD__ACTOR=`` LOOKUPS
+            models.Index(
+                KeyTransform("thread_slug", "payload"),
+                name="users_notif_thread_slug_idx",
+            ),
+            models.Index(
+                KeyTransform("actor", "payload"), name="users_notif_actor_idx"
+            ),
+        ]
+
+
+class UnreadCounter(models.Model):
+    """
+    UNREAD NOTIFICATIONS PER USER, SO THE BADGE IS ONE PRIMARY-KEY READ.
+    MAINTAINED BY USERS.UNREAD, RECONCILED BY `MANAGE.PY RECOUNT_NOTIFICATIONS`.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="+",
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+
+class OutboxEvent(models.Model):
+    """
+    A SIDE EFFECT RECORDED IN THE SAME TRANSACTION AS THE WRITE THAT CAUSED
+    IT AND CARRIED OUT LATER BY THE OUTBOX WORKER (SEE USERS.OUTBOX).
+    """
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    # RETRIES: FAILED EVENTS ARE PUSHED BACK TO AVAILABLE_AT WITH BACKOFF
+
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # PENDING EVENTS ONLY; PROCESSED ROWS NEVER ENTER THE INDEX
+            models.Index(
+                fields=["available_at", "id"],
+                name="users_outbox_pending_idx",
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind}#{self.pk}"
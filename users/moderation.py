@@ -0,0 +1,71 @@
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from lucky_forums import caching
+
+
+class ModerationStatus(NamedTuple):
+    banned_until: Optional[object] = None
+    silenced_until: Optional[object] = None
+
+    @property
+    def is_banned(self):
+        return bool(self.banned_until and self.banned_until > timezone.now())
+
+    @property
+    def is_silenced(self):
+        return bool(self.silenced_until and self.silenced_until > timezone.now())
+
+
+NOT_MODERATED = ModerationStatus()
+
+
+def _key(user_id):
+    return f"moderation:{user_id}"
+
+
+def cached_moderation_status(user_id):
+    """THE CACHED STATUS FOR ``USER_ID``, OR NONE ON A MISS."""
+
+    # A PER-PROCESS CACHE WOULD KEEP SERVING A LIFTED (OR MISS A NEW) BAN IN
+    # EVERY WORKER BUT THE ONE THAT SAVED IT
+    if not settings.SHARED_CACHE:
+        return None
+    cached = caching.get(_key(user_id))
+    return ModerationStatus(*cached) if cached is not None else None
+
+
+def remember_moderation_status(user_id, profile):
+    """CACHE AND RETURN THE STATUS CARRIED BY ``PROFILE`` (NONE: NO PROFILE)."""
+
+    if profile is None:
+        status = NOT_MODERATED
+    else:
+        status = ModerationStatus(profile.banned_until, profile.silenced_until)
+    if settings.SHARED_CACHE:
+        caching.set(_key(user_id), tuple(status), settings.MODERATION_CACHE_TIMEOUT)
+    return status
+
+
+def moderation_status(user):
+    """
+    BAN/SILENCE STATE FOR ``USER``, READ THROUGH THE CACHE. INVALIDATED BY
+    USERS.SIGNALS WHEN A PROFILE IS SAVED. FOR THE REQUESTING USER USE
+    USERS.VIEWER.GET_VIEWER INSTEAD.
+    """
+
+    from .models import Profile
+
+    if not getattr(user, "is_authenticated", False):
+        return NOT_MODERATED
+    status = cached_moderation_status(user.pk)
+    if status is None:
+        profile = Profile.objects.filter(user_id=user.pk).first()
+        status = remember_moderation_status(user.pk, profile)
+    return status
+
+
+def forget_moderation_status(user_id):
+    caching.forget(_key(user_id))
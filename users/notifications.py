@@ -1,61 +1,165 @@
-import json
-import re
-from typing import Dict, Iterable
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+from typing import Dict, List
 
-from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
 from django.utils import timezone
 
-from .models import Profile
+from .mentions import candidates, resolve
+from .models import Notification, Profile
 
-User = get_user_model()
+# BUILDERS RETURN UNSAVED NOTIFICATIONS; THE OUTBOX WORKER (USERS.OUTBOX)
+# BULK-INSERTS THEM
 
-MENTION_RE = re.compile(r"@([A-Za-z0-9_]{1,30})")
 
+def _notification(user_id: int, type_: str, payload: Dict):
+    return Notification(user_id=user_id, type=type_, payload=payload)
 
-def _create_notification(user_id: int, type_: str, payload: Dict):
-    from .models import Notification
 
-    Notification.objects.create(
-        user_id=user_id, type=type_, payload=json.dumps(payload)
-    )
-
-
-def notify_thread_reply(actor, thread, post):
+def thread_reply_notifications(actor, thread, post) -> List[Notification]:
     if thread.author_id and thread.author_id != actor.id:
-        _create_notification(
-            user_id=thread.author_id,
-            type_="thread_reply",
-            payload={
-                "thread_slug": thread.slug,
-                "post_id": post.id,
-                "actor": actor.username,
-            },
-        )
+        return [
+            _notification(
+                user_id=thread.author_id,
+                type_="thread_reply",
+                payload={
+                    "thread_slug": thread.slug,
+                    "post_id": post.id,
+                    "actor": actor.username,
+                },
+            )
+        ]
+    return []
 
 
-def notify_profile_comment(actor, profile: Profile, comment):
+def profile_comment_notifications(actor, profile: Profile, comment):
     if profile.user_id and profile.user_id != actor.id:
-        _create_notification(
-            user_id=profile.user_id,
-            type_="profile_comment",
-            payload={
-                "username": profile.user.username,
-                "comment_id": comment.id,
-                "actor": actor.username,
-            },
-        )
+        return [
+            _notification(
+                user_id=profile.user_id,
+                type_="profile_comment",
+                payload={
+                    "username": profile.user.username,
+                    "comment_id": comment.id,
+                    "actor": actor.username,
+                },
+            )
+        ]
+    return []
+
 
+def mention_notifications(actor, html: str, context: Dict):
+    """
+    ONE NOTIFICATION PER EXISTING USER @MENTIONED IN THE RENDERED ``HTML``
+    (SEE USERS.MENTIONS: CODE AND E-MAIL ADDRESSES DO NOT COUNT).
+    """
 
-def notify_mentions(actor, text: str, context: Dict):
-    usernames = set(MENTION_RE.findall(text or ""))
-    if not usernames:
-        return
-    found = User.objects.filter(username__in=list(usernames)).values_list(
-        "id", "username"
-    )
-    for uid, uname in found:
+    found = resolve(candidates(html))
+    notifications = []
+    for uname, uid in sorted(found.items()):
         if uid == actor.id:
             continue
         payload = {"actor": actor.username, "mention": uname}
         payload.update(context)
-        _create_notification(user_id=uid, type_="mention", payload=payload)
+        notifications.append(
+            _notification(user_id=uid, type_="mention", payload=payload)
+        )
+    return notifications
+
+
+# COALESCING: A NEW NOTIFICATION WHOSE TYPE HAS A TARGET KEY FOLDS INTO THE
+# USER'S UNREAD ROW WITH THE SAME TYPE AND TARGET IF THAT ROW WAS TOUCHED
+# (UPDATED_AT) WITHIN SETTINGS.NOTIFICATION_COALESCE_WINDOW: COUNT GOES UP, THE
+# PAYLOAD POINTS AT THE LATEST EVENT AND KEEPS THE LATEST ACTORS. CREATED_AT
+# STAYS PUT, SO THE ROW KEEPS ITS PLACE IN THE INBOX AND ITS RETENTION AGE.
+# MENTIONS STAY SEPARATE
+
+COALESCE_TARGETS = {"thread_reply": "thread_slug", "profile_comment": "username"}
+MAX_ACTORS = 3
+
+
+def group_key(n):
+    target = n.payload.get(COALESCE_TARGETS.get(n.type, ""))
+    return f"{n.type}:{target}" if target else ""
+
+
+def _fold(into, n):
+    # NEWEST FIRST; N MAY ITSELF BE A FOLD OF SEVERAL EVENTS
+    actors = n.payload.get("actors") or [n.payload.get("actor")]
+    actors += into.payload.get("actors") or [into.payload.get("actor")]
+    into.payload = {
+        **into.payload,
+        **n.payload,
+        "actors": list(dict.fromkeys(a for a in actors if a))[:MAX_ACTORS],
+    }
+    into.count += n.count
+    into.updated_at = max(into.updated_at, n.updated_at)
+
+
+def coalesce(notifications):
+    """
+    SPLIT UNSAVED NOTIFICATIONS INTO (ROWS TO INSERT, EXISTING ROWS UPDATED IN
+    MEMORY). EXISTING ROWS ARE LOCKED; CALL INSIDE THE WRITING TRANSACTION.
+    """
+
+    fresh, pending = [], {}
+    for n in notifications:
+        n.group_key = group_key(n)
+        if not n.group_key:
+            fresh.append(n)
+            continue
+        key = (n.user_id, n.group_key)
+        if key in pending:
+            _fold(pending[key], n)
+        else:
+            n.payload = {**n.payload, "actors": [n.payload.get("actor")]}
+            pending[key] = n
+    if not pending:
+        return fresh, []
+
+    cutoff = timezone.now() - timedelta(seconds=settings.NOTIFICATION_COALESCE_WINDOW)
+    match = reduce(or_, (Q(user_id=u, group_key=k) for u, k in pending))
+    existing = {
+        (row.user_id, row.group_key): row
+        for row in Notification.objects.select_for_update()
+        .filter(match, read_at__isnull=True, updated_at__gte=cutoff)
+        .order_by("updated_at")
+    }
+    folded = []
+    for key, n in pending.items():
+        row = existing.get(key)
+        if row is None:
+            fresh.append(n)
+        else:
+            _fold(row, n)
+            folded.append(row)
+    return fresh, folded
+
+
+# RETENTION: READ NOTIFICATIONS OLDER THAN SETTINGS.NOTIFICATION_RETENTION_DAYS
+# GO AWAY IN BOUNDED BATCHES, EACH ITS OWN SHORT STATEMENT. UNREAD ROWS ARE
+# KEPT (AND COUNTED), SO THE UNREAD COUNTERS ARE UNAFFECTED
+
+_PURGE_SQL = """
+DELETE FROM users_notification WHERE id IN (
+    SELECT id FROM users_notification
+    WHERE read_at IS NOT NULL AND created_at < %s
+    LIMIT %s
+)
+"""
+
+
+def purge_read(days=None, batch_size=1000):
+    days = settings.NOTIFICATION_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    total = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(_PURGE_SQL, [cutoff, batch_size])
+            deleted = cursor.rowcount
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -1,42 +1,149 @@
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.utils import timezone
-from rest_framework import permissions, status
+from django.http import JsonResponse
+from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from lucky_forums.fastrows import Epoch, RowPlan
+from lucky_forums.pagination import KeysetPagination
+from lucky_forums.pubsub import event_stream_view
+
+from .live import publish_unread, stream_user, unread_events, user_channel
 from .models import Notification
+from .unread import mark_read, unread_counts
+
+
+class NotificationPagination(KeysetPagination):
+    # NEWEST FIRST; SERVED BY USERS_NOTIF_INBOX_IDX / USERS_NOTIF_UNREAD_IDX
+
+    ordering = ("-created_at", "-id")
+    page_size = 50
+
+
+def _notification_row(n):
+    return {
+        "id": n.id,
+        "type": n.type,
+        "payload": n.payload,
+        "count": n.count,
+        "created_at": int(n.created_at.timestamp()),
+        "read_at": int(n.read_at.timestamp()) if n.read_at else None,
+    }
+
 
+# _NOTIFICATION_ROW OVER VALUES_LIST ROWS (LUCKY_FORUMS.FASTROWS)
+
+NOTIFICATION_ROWS = RowPlan(
+    [
+        ("id", "id"),
+        ("type", "type"),
+        ("payload", "payload"),
+        ("count", "count"),
+        ("created_at", Epoch("created_at")),
+        ("read_at", Epoch("read_at")),
+    ]
+)
+
+
+def _notification_rows(notifications):
+    return [_notification_row(n) for n in notifications]
+
+
+class NotificationListView(generics.GenericAPIView):
+    """
+    GET /API/NOTIFICATIONS/?UNREAD=1. WITH ``PAGE_SIZE``/``CURSOR`` THE INBOX IS
+    KEYSET-PAGINATED; OTHERWISE THE NEWEST 50 COME BACK AS A PLAIN LIST.
+    """
 
-class NotificationListView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationPagination
 
     def get(self, request):
         unread = request.query_params.get("unread")
-        qs = Notification.objects.filter(user=request.user).order_by("-created_at")
+        qs = Notification.objects.filter(user=request.user).order_by(
+            "-created_at", "-id"
+        )
         if unread in ("1", "true", "True"):
             qs = qs.filter(read_at__isnull=True)
-        data = [
-            {
-                "id": n.id,
-                "type": n.type,
-                "payload": n.payload,
-                "created_at": int(n.created_at.timestamp()),
-                "read_at": int(n.read_at.timestamp()) if n.read_at else None,
-            }
-            for n in qs[:50]
-        ]
-        return Response(data)
+        build = _notification_rows
+        if settings.FAST_LIST_ROWS:
+            qs = NOTIFICATION_ROWS.rows(qs, ["created_at"])
+            build = NOTIFICATION_ROWS.build
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            return self.get_paginated_response(build(page))
+        return Response(build(qs[:50]))
+
+
+class NotificationUnreadCountView(APIView):
+    """GET /API/NOTIFICATIONS/UNREAD_COUNT/: ONE COUNTER ROW, NO SCAN."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread": unread_counts([request.user.id])[request.user.id]})
 
 
 class NotificationReadView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        try:
-            n = Notification.objects.get(pk=pk, user=request.user)
-        except Notification.DoesNotExist:
+        if not Notification.objects.filter(pk=pk, user=request.user).exists():
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
-        if not n.read_at:
-            n.read_at = timezone.now()
-            n.save(update_fields=["read_at"])
+        if mark_read(request.user.id, [pk]):
+            publish_unread(request.user.id)
         return Response({"ok": True})
+
+
+class NotificationBulkReadView(APIView):
+    """
+    POST /API/NOTIFICATIONS/READ/ {"IDS": [...]} OR {"ALL": TRUE}: ONE UPDATE;
+    ANSWERS WITH HOW MANY WERE MARKED AND THE REMAINING UNREAD COUNT.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    max_ids = 500
+
+    def post(self, request):
+        ids = request.data.get("ids")
+        if request.data.get("all") in (True, "1", "true"):
+            ids = None
+        elif not isinstance(ids, list) or not ids or len(ids) > self.max_ids:
+            return Response(
+                {"detail": f"send all=true or 1..{self.max_ids} ids"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        else:
+            try:
+                ids = [int(i) for i in ids]
+            except (TypeError, ValueError):
+                return Response(
+                    {"detail": "ids must be integers"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        updated = mark_read(request.user.id, ids)
+        if updated:
+            publish_unread(request.user.id)
+        unread = unread_counts([request.user.id])[request.user.id]
+        return Response({"updated": updated, "unread": unread})
+
+
+def _open_notification_stream(request):
+    """
+    GET /API/NOTIFICATIONS/STREAM/: TEXT/EVENT-STREAM OF ``UNREAD`` (COUNT) AND
+    ``NOTIFICATION`` EVENTS FOR THE CURRENT USER.
+    """
+
+    user, code = stream_user(request)
+    if code == 200 and not user.is_authenticated:
+        code = 401
+    if code != 200:
+        detail = "Authentication required" if code == 401 else "Banned user"
+        return JsonResponse({"detail": detail}, status=code)
+    return user_channel(user.id), partial(unread_events, user.id)
+
+
+notification_stream = event_stream_view(_open_notification_stream)
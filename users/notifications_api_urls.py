@@ -1,8 +1,21 @@
 from django.urls import path
 
-from .notifications_api import NotificationListView, NotificationReadView
+from .notifications_api import (
+    NotificationBulkReadView,
+    NotificationListView,
+    NotificationReadView,
+    NotificationUnreadCountView,
+    notification_stream,
+)
 
 urlpatterns = [
     path("", NotificationListView.as_view(), name="notifications_list"),
+    path(
+        "unread_count/",
+        NotificationUnreadCountView.as_view(),
+        name="notifications_unread_count",
+    ),
+    path("read/", NotificationBulkReadView.as_view(), name="notifications_read_bulk"),
+    path("stream/", notification_stream, name="notifications_stream"),
     path("<int:pk>/read/", NotificationReadView.as_view(), name="notifications_read"),
 ]
@@ -0,0 +1,203 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .live import publish_notifications
+from .models import Notification, OutboxEvent, ProfileComment
+from .notifications import (
+    coalesce,
+    mention_notifications,
+    profile_comment_notifications,
+    thread_reply_notifications,
+)
+from .unread import count_new
+
+log = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 8
+RETENTION = timedelta(days=7)
+
+
+def enqueue(kind, **payload):
+    """
+    RECORD A SIDE EFFECT IN THE CALLER'S TRANSACTION. IT IS CARRIED OUT BY
+    THE WORKER ONLY IF THAT TRANSACTION COMMITS.
+    """
+
+    event = OutboxEvent.objects.create(kind=kind, payload=payload)
+    transaction.on_commit(_kick)
+    return event
+
+
+def _kick():
+    # WITH A BROKER, WAKE A CELERY WORKER NOW; WITHOUT ONE, EVENTS WAIT FOR
+    # `MANAGE.PY DRAIN_OUTBOX --LOOP`. THE BEAT SCHEDULE CATCHES LOST KICKS
+
+    if not settings.CELERY_BROKER_URL:
+        return
+    from .tasks import drain_outbox
+
+    try:
+        drain_outbox.delay()
+    except Exception:
+        log.warning("outbox: could not queue drain task", exc_info=True)
+
+
+# HANDLERS: PAYLOAD -> UNSAVED NOTIFICATIONS. A ROW DELETED BEFORE ITS EVENT
+# IS PROCESSED PRODUCES NOTHING
+
+
+def _post_created(payload):
+    from forum.models import Post
+
+    post = (
+        Post.objects.select_related("thread", "author")
+        .filter(pk=payload["post_id"])
+        .first()
+    )
+    if post is None:
+        return []
+    context = {"type": "post", "thread_slug": post.thread.slug, "post_id": post.id}
+    return [
+        *thread_reply_notifications(post.author, post.thread, post),
+        *mention_notifications(post.author, post.get_body_html(), context),
+    ]
+
+
+def _profile_comment_created(payload):
+    comment = (
+        ProfileComment.objects.select_related("author", "profile__user")
+        .filter(pk=payload["comment_id"])
+        .first()
+    )
+    if comment is None:
+        return []
+    context = {
+        "type": "profile_comment",
+        "username": comment.profile.user.username,
+        "comment_id": comment.id,
+    }
+    return [
+        *profile_comment_notifications(comment.author, comment.profile, comment),
+        *mention_notifications(comment.author, comment.get_body_html(), context),
+    ]
+
+
+HANDLERS = {
+    "post_created": _post_created,
+    "profile_comment_created": _profile_comment_created,
+}
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(2**attempts, 3600))
+
+
+def _due(queryset, now):
+    return (
+        queryset.select_for_update(skip_locked=True)
+        .filter(processed_at__isnull=True, available_at__lte=now)
+        .order_by("available_at", "id")
+    )
+
+
+def _failed(event, exc, now):
+    event.attempts += 1
+    event.last_error = f"{type(exc).__name__}: {exc}"
+    if event.attempts >= MAX_ATTEMPTS:
+        event.processed_at = now
+    else:
+        event.available_at = now + _backoff(event.attempts)
+    log.warning("outbox: %s failed (attempt %s)", event, event.attempts)
+
+
+def _process(events, now):
+    notifications = []
+    for event in events:
+        try:
+            handler = HANDLERS[event.kind]
+            with transaction.atomic():
+                built = handler(event.payload)
+        except Exception as exc:
+            _failed(event, exc, now)
+            continue
+        notifications.extend(built)
+        event.processed_at = now
+    fresh, folded = coalesce(notifications)
+    Notification.objects.bulk_create(fresh)
+    Notification.objects.bulk_update(folded, ["payload", "count", "updated_at"])
+    count_new(fresh)
+    publish_notifications([*fresh, *folded])
+    OutboxEvent.objects.bulk_update(
+        events, ["attempts", "last_error", "available_at", "processed_at"]
+    )
+
+
+def _drain_one(event_id, now):
+    # ALONE IN ITS TRANSACTION; IF EVEN THAT FAILS THE ATTEMPT IS RECORDED IN
+    # ANOTHER ONE, SO A BAD EVENT BACKS OFF AND IS EVENTUALLY GIVEN UP
+    events = OutboxEvent.objects.filter(pk=event_id)
+    try:
+        with transaction.atomic():
+            _process(list(_due(events, now)), now)
+    except Exception as exc:
+        with transaction.atomic():
+            for event in _due(events, now):
+                _failed(event, exc, now)
+                event.save(
+                    update_fields=[
+                        "attempts",
+                        "last_error",
+                        "available_at",
+                        "processed_at",
+                    ]
+                )
+
+
+def drain(batch_size=100):
+    """
+    PROCESS ONE BATCH OF DUE EVENTS; RETURN HOW MANY WERE CLAIMED.
+
+    ROWS ARE CLAIMED WITH SKIP LOCKED, SO SEVERAL WORKERS CAN DRAIN AT ONCE.
+    NOTIFICATIONS FOR THE WHOLE BATCH ARE COALESCED AND BULK-WRITTEN IN THE
+    SAME TRANSACTION THAT MARKS THE EVENTS PROCESSED, SO EACH EVENT TAKES
+    EFFECT EXACTLY ONCE; LIVE STREAMS ARE TOLD ON COMMIT (USERS.LIVE). A
+    FAILING EVENT IS RETRIED WITH BACKOFF AND GIVEN UP (KEEPING LAST_ERROR)
+    AFTER MAX_ATTEMPTS. IF THE BATCH WRITE ITSELF FAILS, NOTHING OF IT IS
+    KEPT AND ITS EVENTS ARE DRAINED AGAIN ONE BY ONE, SO THE EVENT AT FAULT
+    COUNTS ITS ATTEMPTS WHILE THE REST GO THROUGH.
+    """
+
+    now = timezone.now()
+    claimed = []
+    try:
+        with transaction.atomic():
+            claimed = list(_due(OutboxEvent.objects, now)[:batch_size])
+            _process(claimed, now)
+    except Exception:
+        if not claimed:
+            raise
+        log.warning("outbox: batch failed; draining one by one", exc_info=True)
+        for event in claimed:
+            _drain_one(event.pk, now)
+    return len(claimed)
+
+
+def drain_all(batch_size=100):
+    """DRAIN UNTIL NO DUE EVENTS ARE LEFT; RETURN HOW MANY WERE CLAIMED."""
+
+    total = 0
+    while True:
+        claimed = drain(batch_size)
+        total += claimed
+        if claimed < batch_size:
+            return total
+
+
+def purge_processed(older_than=RETENTION):
+    cutoff = timezone.now() - older_than
+    deleted, _ = OutboxEvent.objects.filter(processed_at__lt=cutoff).delete()
+    return deleted
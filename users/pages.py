@@ -11,10 +11,9 @@ def user_profile_page(request, username):
     # IF TARGET USER DOESN'T EXIST, SHOW 404-LIKE PAGE
 
     from django.contrib.auth import get_user_model
-    from django.utils import timezone as djtz
 
     User = get_user_model()
-    target = User.objects.filter(username=username).first()
+    target = User.objects.select_related("profile").filter(username=username).first()
     if not target:
         return render(
             request,
@@ -25,14 +24,14 @@ def user_profile_page(request, username):
 
     # IF TARGET USER IS BANNED, SHOW BANNED PAGE
 
+    from .moderation import ModerationStatus
+    from .viewer import get_viewer
+
     tprof = getattr(target, "profile", None)
-    if tprof and tprof.banned_until and tprof.banned_until > djtz.now():
+    if tprof and ModerationStatus(tprof.banned_until).is_banned:
         # ADMINS CAN VIEW BANNED USER PAGES
 
-        if not (
-            request.user.is_authenticated
-            and (request.user.is_staff or request.user.is_superuser)
-        ):
+        if not get_viewer(request).is_admin:
             return render(
                 request, "user_banned.html", {"username": username}, status=403
             )
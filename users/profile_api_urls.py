@@ -8,8 +8,10 @@ from .profile_views import (
     ProfileCommentsView,
     UserProfileDetailView,
 )
+from .views import UserDirectoryView
 
 urlpatterns = [
+    path("", UserDirectoryView.as_view(), name="user_directory"),
     path("me/profile/", MyProfileView.as_view(), name="my_profile"),
     path(
         "<str:username>/profile/", UserProfileDetailView.as_view(), name="user_profile"
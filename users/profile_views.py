@@ -1,27 +1,38 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
-from rest_framework import permissions, status
+from rest_framework import generics, permissions, status
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Profile, ProfileComment, ProfileCommentRating
+from lucky_forums.pagination import KeysetPagination
+
+from .models import Profile, ProfileComment, ProfileCommentEdit, ProfileCommentRating
 from .serializers import ProfileCommentSerializer, ProfileSerializer, UserSerializer
+from .viewer import get_viewer
 
 User = get_user_model()
 
+# TARGET PROFILES COME WITH THE USER ROW; THE VIEWER'S OWN PROFILE IS READ (AT
+# MOST ONCE) THROUGH USERS.VIEWER
+
+_users_with_profile = User.objects.select_related("profile")
+_comments = ProfileComment.objects.select_related("author__profile")
+
 
 class MyProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def get(self, request):
-        profile = request.user.profile
+        profile = get_viewer(request).profile
         return Response(ProfileSerializer(profile, context={"request": request}).data)
 
     def patch(self, request):
-        profile = request.user.profile
+        profile = get_viewer(request).profile
         serializer = ProfileSerializer(
             profile, data=request.data, partial=True, context={"request": request}
         )
@@ -34,21 +45,102 @@ class UserProfileDetailView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, username):
-        user = get_object_or_404(User, username=username)
-        return Response(
-            ProfileSerializer(user.profile, context={"request": request}).data
+        from forum import markers
+        from forum.response_cache import cached_data
+
+        user_id = (
+            User.objects.filter(username=username).values_list("id", flat=True).first()
         )
+        if user_id is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        def build():
+            user = get_object_or_404(_users_with_profile, pk=user_id)
+            return ProfileSerializer(user.profile, context={"request": request}).data
+
+        names = [markers.user(user_id)]
+        data = cached_data("profile", request.build_absolute_uri(), names, build)
+        return Response(data)
+
+
+class ProfileCommentPagination(KeysetPagination):
+    # OLDEST FIRST; MATCHES PROFILECOMMENT.META.ORDERING WITH ID AS TIE-BREAKER
+
+    ordering = ("created_at", "id")
+    page_size = 50
+
+
+def _comment_page(profile_id):
+    # CONSTANT QUERY PLAN: SCORE AND EDIT COUNT ARE CORRELATED SUBQUERIES,
+    # AUTHOR PROFILES ARE JOINED; THE VIEWER'S VOTES ARE ONE BATCHED LOOKUP
+
+    ratings = ProfileCommentRating.objects.filter(comment=OuterRef("pk")).order_by()
+    edits = ProfileCommentEdit.objects.filter(comment=OuterRef("pk")).order_by()
+    return _comments.filter(profile_id=profile_id).annotate(
+        score_total=Coalesce(
+            Subquery(
+                ratings.values("comment").annotate(s=Sum("value")).values("s"),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+        edits_total=Coalesce(
+            Subquery(
+                edits.values("comment").annotate(c=Count("id")).values("c"),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+    )
+
 
+class ProfileCommentsView(generics.GenericAPIView):
+    """
+    GET /API/USERS/<USERNAME>/COMMENTS/: OLDEST FIRST. WITH ``PAGE_SIZE`` /
+    ``CURSOR`` THE LIST IS KEYSET-PAGINATED; OTHERWISE IT IS A PLAIN LIST.
+    """
+
+    pagination_class = ProfileCommentPagination
 
-class ProfileCommentsView(APIView):
     def get(self, request, username):
-        user = get_object_or_404(User, username=username)
-        comments = user.profile.comments.select_related("author").all()
-        return Response(
-            ProfileCommentSerializer(
-                comments, many=True, context={"request": request}
-            ).data
+        from forum import markers
+        from forum.response_cache import cached_data
+
+        profile_id = (
+            User.objects.filter(username=username)
+            .values_list("profile__id", flat=True)
+            .first()
+        )
+        if profile_id is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        def build():
+            qs = _comment_page(profile_id)
+            context = {"request": request, "shared": True}
+            page = self.paginate_queryset(qs)
+            if page is None:
+                return ProfileCommentSerializer(qs, many=True, context=context).data
+            rows = ProfileCommentSerializer(page, many=True, context=context).data
+            return self.get_paginated_response(rows).data
+
+        names = [markers.profile_comments(profile_id)]
+        data = cached_data("comments", request.build_absolute_uri(), names, build)
+        if isinstance(data, dict):
+            return Response({**data, "results": self.personalize(data["results"])})
+        return Response(self.personalize(data))
+
+    def personalize(self, rows):
+        # MY_VOTE IS KEPT OUT OF THE SHARED ENTRY
+
+        viewer = get_viewer(self.request)
+        if not viewer.is_authenticated or not rows:
+            return rows
+        votes = dict(
+            ProfileCommentRating.objects.filter(
+                user_id=viewer.id, comment_id__in=[row["id"] for row in rows]
+            ).values_list("comment_id", "value")
         )
+        return [{**row, "my_vote": votes.get(row["id"], 0)} for row in rows]
 
     def post(self, request, username):
         if not request.user.is_authenticated:
@@ -59,45 +151,30 @@ class ProfileCommentsView(APIView):
 
         # MODERATION
 
-        from django.utils import timezone as djtz
-
-        from .models import Profile
-
-        prof = Profile.objects.filter(user_id=request.user.id).first()
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
+        viewer = get_viewer(request)
+        if viewer.is_banned:
             return Response({"detail": "Banned user"}, status=status.HTTP_403_FORBIDDEN)
-        if prof and prof.silenced_until and prof.silenced_until > djtz.now():
+        if viewer.is_silenced:
             return Response(
                 {"detail": "Silenced user"}, status=status.HTTP_403_FORBIDDEN
             )
-        user = get_object_or_404(User, username=username)
+        user = get_object_or_404(_users_with_profile, username=username)
         serializer = ProfileCommentSerializer(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
-        comment = ProfileComment.objects.create(
-            profile=user.profile,
-            author=request.user,
-            body=serializer.validated_data["body"],
-        )
 
-        # NOTIFICATIONS
+        # NOTIFICATIONS ARE RECORDED WITH THE COMMENT AND SENT BY THE OUTBOX WORKER
 
-        try:
-            from .notifications import notify_mentions, notify_profile_comment
-
-            notify_profile_comment(request.user, user.profile, comment)
-            notify_mentions(
-                actor=request.user,
-                text=comment.body,
-                context={
-                    "type": "profile_comment",
-                    "username": user.username,
-                    "comment_id": comment.id,
-                },
+        from .outbox import enqueue
+
+        with transaction.atomic():
+            comment = ProfileComment.objects.create(
+                profile=user.profile,
+                author=request.user,
+                body=serializer.validated_data["body"],
             )
-        except Exception:
-            pass
+            enqueue("profile_comment_created", comment_id=comment.id)
         return Response(
             ProfileCommentSerializer(comment, context={"request": request}).data,
             status=status.HTTP_201_CREATED,
@@ -106,48 +183,31 @@ class ProfileCommentsView(APIView):
 
 class ProfileCommentDetailView(APIView):
     def delete(self, request, username, pk):
-        user = get_object_or_404(User, username=username)
-        comment = get_object_or_404(ProfileComment, pk=pk, profile=user.profile)
-        if request.user.is_authenticated and (
-            request.user.is_staff
-            or request.user.is_superuser
-            or comment.author_id == request.user.id
-            or user.id == request.user.id
-        ):
+        user = get_object_or_404(_users_with_profile, username=username)
+        comment = get_object_or_404(_comments, pk=pk, profile=user.profile)
+        viewer = get_viewer(request)
+        if viewer.can_manage(comment.author_id) or viewer.can_manage(user.id):
             comment.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response({"detail": "Not permitted"}, status=status.HTTP_403_FORBIDDEN)
 
     def patch(self, request, username, pk):
-        user = get_object_or_404(User, username=username)
-        comment = get_object_or_404(ProfileComment, pk=pk, profile=user.profile)
+        user = get_object_or_404(_users_with_profile, username=username)
+        comment = get_object_or_404(_comments, pk=pk, profile=user.profile)
 
         # MODERATION
 
-        from django.utils import timezone as djtz
-
-        from .models import Profile
-
-        prof = Profile.objects.filter(user_id=request.user.id).first()
-        if prof and prof.banned_until and prof.banned_until > djtz.now():
+        viewer = get_viewer(request)
+        if viewer.is_banned:
             return Response({"detail": "Banned user"}, status=status.HTTP_403_FORBIDDEN)
-        if prof and prof.silenced_until and prof.silenced_until > djtz.now():
+        if viewer.is_silenced:
             return Response(
                 {"detail": "Silenced user"}, status=status.HTTP_403_FORBIDDEN
             )
-        if not (
-            request.user.is_authenticated
-            and (
-                request.user.is_staff
-                or request.user.is_superuser
-                or comment.author_id == request.user.id
-            )
-        ):
+        if not viewer.can_manage(comment.author_id):
             return Response(
                 {"detail": "Not permitted"}, status=status.HTTP_403_FORBIDDEN
             )
-        from .models import ProfileCommentEdit
-
         ProfileCommentEdit.objects.create(
             comment=comment, editor=request.user, body=comment.body
         )
@@ -163,10 +223,10 @@ class ProfileCommentDetailView(APIView):
 
 class ProfileCommentHistoryView(APIView):
     def get(self, request, username, pk):
-        if not (request.user.is_staff or request.user.is_superuser):
+        if not get_viewer(request).is_admin:
             return Response({"detail": "Admins only"}, status=status.HTTP_403_FORBIDDEN)
-        user = get_object_or_404(User, username=username)
-        comment = get_object_or_404(ProfileComment, pk=pk, profile=user.profile)
+        user = get_object_or_404(_users_with_profile, username=username)
+        comment = get_object_or_404(_comments, pk=pk, profile=user.profile)
         data = [
             {
                 "body": e.body,
@@ -182,8 +242,8 @@ class ProfileCommentRateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, username, pk):
-        user = get_object_or_404(User, username=username)
-        comment = get_object_or_404(ProfileComment, pk=pk, profile=user.profile)
+        user = get_object_or_404(_users_with_profile, username=username)
+        comment = get_object_or_404(_comments, pk=pk, profile=user.profile)
         try:
             val = int(request.data.get("value", 0))
         except (TypeError, ValueError):
@@ -201,8 +261,8 @@ class ProfileCommentRateView(APIView):
         return Response({"score": score, "my_vote": val})
 
     def delete(self, request, username, pk):
-        user = get_object_or_404(User, username=username)
-        comment = get_object_or_404(ProfileComment, pk=pk, profile=user.profile)
+        user = get_object_or_404(_users_with_profile, username=username)
+        comment = get_object_or_404(_comments, pk=pk, profile=user.profile)
         ProfileCommentRating.objects.filter(comment=comment, user=request.user).delete()
         score = comment.ratings.aggregate(score=Sum("value")).get("score") or 0
         return Response({"score": score, "my_vote": 0})
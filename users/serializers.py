@@ -134,19 +134,32 @@ class ProfileCommentSerializer(serializers.ModelSerializer):
             "body_html",
         ]
 
+    # SCORE_TOTAL / EDITS_TOTAL ARE ANNOTATED BY PROFILECOMMENTSVIEW; FALL BACK
+    # TO PER-ROW QUERIES OTHERWISE
+
     def get_score(self, obj):
+        if hasattr(obj, "score_total"):
+            return obj.score_total
         return sum(
             r.value for r in getattr(obj, "_prefetched_ratings", obj.ratings.all())
         )
 
     def get_my_vote(self, obj):
+        from .viewer import get_viewer
+
         request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
+        if not request or self.context.get("shared"):
+            # SHARED CACHE ENTRY; FILLED IN PER VIEWER (SEE FORUM.RESPONSE_CACHE)
             return 0
-        v = obj.ratings.filter(user=request.user).first()
+        viewer = get_viewer(request)
+        if not viewer.is_authenticated:
+            return 0
+        v = obj.ratings.filter(user_id=viewer.id).first()
         return v.value if v else 0
 
     def get_edit_count(self, obj):
+        if hasattr(obj, "edits_total"):
+            return obj.edits_total
         return obj.edits.count()
 
     def get_last_edited_at(self, obj):
@@ -156,6 +169,5 @@ class ProfileCommentSerializer(serializers.ModelSerializer):
         return int(obj.created_at.timestamp()) if obj.created_at else None
 
     def get_body_html(self, obj):
-        from lucky_forums.utils import render_markdown_safe
-
-        return render_markdown_safe(obj.body)
+        # PRE-RENDERED ON SAVE; SEE LUCKY_FORUMS.UTILS.RENDEREDBODYMIXIN
+        return obj.get_body_html()
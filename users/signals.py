@@ -1,8 +1,9 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Profile
+from .models import Notification, Profile, ProfileComment, ProfileCommentRating
 
 User = get_user_model()
 
@@ -11,3 +12,194 @@ User = get_user_model()
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.get_or_create(user=instance)
+
+
+# FIELDS THAT LISTS EMBED (THREAD AND POST AUTHORS, PROFILE COMMENT AUTHORS);
+# THEIR STORED VALUES ARE READ BEFORE A SAVE SO THE RECEIVERS BELOW ACT ONLY ON
+# A REAL CHANGE
+
+_EMBEDDED_USER_FIELDS = (
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "is_staff",
+    "is_superuser",
+    "date_joined",
+)
+_EMBEDDED_PROFILE_FIELDS = ("avatar", "silenced_until", "banned_until")
+
+
+def _stored(instance, fields, update_fields):
+    if update_fields is not None:
+        fields = [f for f in fields if f in update_fields]
+    if instance.pk is None or not fields:
+        return {}
+    row = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    return row or {}
+
+
+def _changed(instance):
+    # COMPARED AS STORED (AN EMPTY AVATAR IS NONE IN MEMORY, "" IN THE ROW)
+    changed = []
+    for name, value in getattr(instance, "_stored", {}).items():
+        prep = instance._meta.get_field(name).get_prep_value
+        if prep(getattr(instance, name)) != prep(value):
+            changed.append(name)
+    return changed
+
+
+@receiver(pre_save, sender=User)
+def remember_stored_user(sender, instance, update_fields=None, **kwargs):
+    instance._stored = _stored(instance, _EMBEDDED_USER_FIELDS, update_fields)
+
+
+@receiver(pre_save, sender=Profile)
+def remember_stored_profile(sender, instance, update_fields=None, **kwargs):
+    instance._stored = _stored(instance, _EMBEDDED_PROFILE_FIELDS, update_fields)
+
+
+# USERNAME -> ID INDEX FOR @MENTIONS (USERS.MENTIONS) AND THE IN-MEMORY
+# AUTOCOMPLETE ARRAY (USERS.DIRECTORY): DROP THE OLD AND NEW NAMES WHEN A USER IS
+# CREATED, RENAMED OR DELETED, AND PATCH THE USER INTO THE ARRAY
+
+
+@receiver(post_save, sender=User)
+def drop_cached_mention_names(sender, instance, created, **kwargs):
+    old = getattr(instance, "_stored", {}).get("username")
+    if created or (old and old != instance.username):
+        from .directory import username_index
+        from .mentions import forget_usernames
+
+        forget_usernames(instance.username, old)
+        if not instance.is_active:
+            username_index.patch(instance.pk, old=old)
+        elif created:
+            active_at = max(filter(None, [instance.last_login, instance.date_joined]))
+            username_index.patch(
+                instance.pk, new=instance.username, active_at=active_at.timestamp()
+            )
+        else:
+            username_index.patch(instance.pk, old=old, new=instance.username)
+
+
+@receiver(post_delete, sender=User)
+def drop_deleted_mention_name(sender, instance, **kwargs):
+    from .directory import username_index
+    from .mentions import forget_usernames
+
+    forget_usernames(instance.username)
+    username_index.patch(instance.pk, old=instance.username)
+
+
+# CHANGE MARKERS (FORUM.MARKERS): AN EMBEDDED FIELD TOUCHES THE PROFILE PAGE AND
+# THE LISTS THAT USER APPEARS IN; ANY OTHER PROFILE EDIT (BIO, DEVICE) ONLY THE
+# PROFILE PAGE. A NEW USER APPEARS NOWHERE YET AND LOGINS ONLY WRITE LAST_LOGIN,
+# SO NEITHER TOUCHES ANYTHING.
+
+
+@receiver(post_save, sender=User)
+def touch_user_markers(sender, instance, **kwargs):
+    if _changed(instance):
+        from forum import markers
+
+        markers.touch_author(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def touch_profile_markers(sender, instance, created, **kwargs):
+    if created:
+        return
+    from forum import markers
+
+    if _changed(instance):
+        markers.touch_author(instance.user_id)
+    else:
+        markers.touch(markers.user(instance.user_id))
+
+
+@receiver(post_save, sender=Profile)
+def drop_cached_moderation_status(sender, instance, **kwargs):
+    from .moderation import forget_moderation_status
+
+    forget_moderation_status(instance.user_id)
+
+
+# AUTHOR CARDS (USERS.CARDS) CARRY USER, AVATAR AND MODERATION FIELDS
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_user_author_card(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    from .cards import forget_author_card
+
+    forget_author_card(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+def drop_profile_author_card(sender, instance, **kwargs):
+    from .cards import forget_author_card
+
+    forget_author_card(instance.user_id)
+
+
+@receiver(post_save, sender=ProfileComment)
+@receiver(post_delete, sender=ProfileComment)
+def touch_profile_comments(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Profile):
+        return
+    from forum import markers
+
+    markers.touch(markers.profile_comments(instance.profile_id))
+
+
+@receiver(post_save, sender=ProfileCommentRating)
+@receiver(post_delete, sender=ProfileCommentRating)
+def touch_profile_comment_ratings(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, (Profile, ProfileComment)):
+        return
+    from forum import markers
+
+    profile_id = (
+        ProfileComment.objects.filter(pk=instance.comment_id)
+        .values_list("profile_id", flat=True)
+        .first()
+    )
+    if profile_id is not None:
+        markers.touch(markers.profile_comments(profile_id))
+
+
+# NOTIFICATIONS THAT POINT INTO A DELETED THREAD ARE DEAD LINKS; FOUND THROUGH
+# THE PAYLOAD THREAD_SLUG INDEX
+
+
+@receiver(post_delete, sender="forum.Thread")
+def drop_thread_notifications(sender, instance, **kwargs):
+    Notification.objects.filter(payload__thread_slug=instance.slug).delete()
+
+
+# UNREAD COUNTERS FOR PLAIN ORM INSERTS AND DELETES; BULK PATHS ADJUST IN
+# USERS.UNREAD
+
+
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, **kwargs):
+    if created and instance.read_at is None:
+        from .unread import adjust
+
+        adjust({instance.user_id: 1})
+
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_notification(sender, instance, origin=None, **kwargs):
+    # THE COUNTER GOES AWAY WITH ITS USER (ONE, OR A QUERYSET OF THEM AS IN
+    # THE ADMIN'S BULK DELETE)
+    if isinstance(origin, QuerySet):
+        origin = origin.model
+    if origin is User or isinstance(origin, User) or instance.read_at is not None:
+        return
+    from .unread import adjust
+
+    adjust({instance.user_id: -1})
@@ -0,0 +1,19 @@
+from celery import shared_task
+
+from .notifications import purge_read
+from .outbox import drain_all, purge_processed
+
+
+@shared_task
+def drain_outbox():
+    return drain_all()
+
+
+@shared_task
+def purge_outbox():
+    return purge_processed()
+
+
+@shared_task
+def purge_notifications():
+    return purge_read()
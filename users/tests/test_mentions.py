@@ -0,0 +1,36 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from users.mentions import candidates, resolve
+
+User = get_user_model()
+
+
+def test_candidates_skip_code_links_and_addresses():
+    html = (
+        "<p>hey @alice and @bob_2, mail carol@example.com</p>"
+        "<pre><code>@dave</code></pre>"
+        '<p><a href="http://x.example">@erin</a> '
+        '<a href="/u/frank/" class="text-decoration-none">@frank</a></p>'
+    )
+    assert candidates(html) == {"alice", "bob_2", "frank"}
+
+
+@pytest.mark.django_db
+def test_resolver_is_kept_current_by_user_signals():
+    assert resolve(["newbie"]) == {}
+    user = baker.make(User, username="newbie")
+    assert resolve(["newbie"]) == {"newbie": user.id}
+
+    user.username = "renamed"
+    user.save()
+    with CaptureQueriesContext(connection) as ctx:
+        resolved = resolve(["newbie", "renamed"])
+    assert resolved == {"renamed": user.id}
+    assert len(ctx.captured_queries) == 1
+
+    user.delete()
+    assert resolve(["renamed"]) == {}
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Thread
+from users.models import Profile
+
+User = get_user_model()
+
+
+def _profile_queries(ctx):
+    return [q for q in ctx.captured_queries if "users_profile" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_write_path_reads_moderation_state_once_then_from_cache(settings):
+    settings.SHARED_CACHE = True
+    user = baker.make(User)
+    thread = baker.make(Thread)
+    client = APIClient()
+    client.force_authenticate(user)
+    url = f"/api/threads/{thread.slug}/posts/"
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.post(url, {"body": "first"}, format="json")
+    assert r.status_code == 201
+    assert len(_profile_queries(ctx)) == 1
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.post(url, {"body": "second"}, format="json")
+    assert r.status_code == 201
+    assert _profile_queries(ctx) == []
+
+
+@pytest.mark.django_db
+def test_per_process_cache_never_holds_moderation_state(settings):
+    settings.SHARED_CACHE = False
+    user = baker.make(User)
+    client = APIClient()
+    client.force_authenticate(user)
+    assert client.get("/api/threads/").status_code == 200
+
+    # A BAN SAVED BY ANOTHER WORKER: NO SIGNAL RUNS IN THIS PROCESS
+
+    until = timezone.now() + timedelta(hours=1)
+    Profile.objects.filter(user=user).update(banned_until=until)
+    assert client.get("/api/threads/").status_code == 403
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("shared", [True, False])
+def test_moderation_patch_takes_effect_immediately(settings, shared):
+    settings.SHARED_CACHE = shared
+    admin = baker.make(User, is_staff=True, is_superuser=True)
+    user = baker.make(User, username="mallory")
+    client = APIClient()
+    client.force_authenticate(user)
+
+    # CACHE "NOT BANNED"
+
+    assert (
+        client.post("/api/threads/", {"title": "ok"}, format="json").status_code == 201
+    )
+
+    staff = APIClient()
+    staff.force_authenticate(admin)
+    until = int(timezone.now().timestamp()) + 3600
+    r = staff.patch(
+        "/api/users/mallory/moderation/", {"banned_until": until}, format="json"
+    )
+    assert r.status_code == 200
+
+    assert (
+        client.post("/api/threads/", {"title": "no"}, format="json").status_code == 403
+    )
+    assert client.get("/api/threads/").status_code == 403
+
+    staff.patch("/api/users/mallory/moderation/", {"banned_until": 0}, format="json")
+    assert client.get("/api/threads/").status_code == 200
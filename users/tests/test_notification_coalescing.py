@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Thread
+from users.models import Notification
+from users.outbox import drain_all
+
+User = get_user_model()
+
+
+def _reply(thread, author, body="reply"):
+    client = APIClient()
+    client.force_authenticate(author)
+    r = client.post(f"/api/threads/{thread.slug}/posts/", {"body": body}, format="json")
+    assert r.status_code == 201
+    return r.json()
+
+
+@pytest.mark.django_db
+def test_replies_fold_into_one_unread_row():
+    owner = baker.make(User, username="owner")
+    thread = baker.make(Thread, author=owner)
+    repliers = [baker.make(User, username=f"r{i}") for i in range(5)]
+    for user in repliers[:3]:
+        _reply(thread, user)
+    drain_all()
+    first = Notification.objects.get(user=owner)
+    for user in repliers[3:]:
+        last = _reply(thread, user)
+    drain_all()
+
+    (row,) = Notification.objects.filter(user=owner)
+    assert row.count == 5
+    assert row.payload["post_id"] == last["id"]
+    assert row.payload["actors"] == ["r4", "r3", "r2"]
+    # THE ROW KEEPS ITS INBOX POSITION; ONLY THE FOLD TIME MOVES
+    assert row.created_at == first.created_at
+    assert row.updated_at > first.updated_at
+
+    # ONCE READ, THE NEXT REPLY STARTS A NEW ROW
+    row.read_at = timezone.now()
+    row.save(update_fields=["read_at"])
+    _reply(thread, repliers[0])
+    drain_all()
+    assert Notification.objects.filter(user=owner, read_at__isnull=True).count() == 1
+    assert Notification.objects.filter(user=owner).count() == 2
+
+
+@pytest.mark.django_db
+def test_rows_outside_the_window_do_not_absorb(settings):
+    settings.NOTIFICATION_COALESCE_WINDOW = 60
+    owner = baker.make(User)
+    thread = baker.make(Thread, author=owner)
+    _reply(thread, baker.make(User))
+    drain_all()
+    Notification.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+    _reply(thread, baker.make(User))
+    drain_all()
+    assert list(Notification.objects.values_list("count", flat=True)) == [1, 1]
+
+
+@pytest.mark.django_db
+def test_window_runs_from_the_last_fold(settings):
+    settings.NOTIFICATION_COALESCE_WINDOW = 60
+    owner = baker.make(User)
+    thread = baker.make(Thread, author=owner)
+    _reply(thread, baker.make(User))
+    drain_all()
+    created = timezone.now() - timedelta(minutes=5)
+    Notification.objects.update(created_at=created)
+    _reply(thread, baker.make(User))
+    drain_all()
+    (row,) = Notification.objects.all()
+    assert row.count == 2 and row.created_at == created
+
+
+@pytest.mark.django_db
+def test_purge_keeps_unread_and_recent_rows():
+    user = baker.make(User)
+    old = timezone.now() - timedelta(days=100)
+    baker.make(Notification, user=user, created_at=old, read_at=old, _quantity=5)
+    unread_old = baker.make(Notification, user=user, created_at=old)
+    recent = baker.make(Notification, user=user, read_at=timezone.now())
+
+    call_command("purge_notifications", "--batch-size", "2")
+
+    assert set(Notification.objects.values_list("id", flat=True)) == {
+        unread_old.id,
+        recent.id,
+    }
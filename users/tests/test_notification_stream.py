@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import AsyncClient, Client
+from model_bakery import baker
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from lucky_forums.asgi import application
+from lucky_forums.pubsub import LocalBroker
+from users.live import publish_notifications
+from users.models import Notification
+
+User = get_user_model()
+
+
+def _events(chunk):
+    text = chunk.decode() if isinstance(chunk, bytes) else chunk
+    out = []
+    for block in text.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        if "event" in lines:
+            out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def test_local_broker_fans_out_per_channel():
+    broker = LocalBroker()
+
+    async def scenario():
+        async with broker.subscribe("a") as qa, broker.subscribe("b") as qb:
+            broker.deliver("a", {"n": 1})
+            assert await asyncio.wait_for(qa.get(), 1) == {"n": 1}
+            assert qb.empty()
+        assert not broker._subscribers
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.django_db
+def test_stream_requires_authentication():
+    assert APIClient().get("/api/notifications/stream/").status_code == 401
+    r = APIClient().get("/api/notifications/stream/?token=bogus")
+    assert r.status_code == 401
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stream_pushes_unread_count_and_new_notifications(settings):
+    settings.PUBSUB_BACKEND = "local"
+    user = baker.make(User, username="reader")
+    baker.make(Notification, user=user, type="thread_reply", payload={})
+    token = str(RefreshToken.for_user(user).access_token)
+
+    def notify():
+        n = Notification.objects.create(
+            user=user, type="mention", payload={"post_id": 1}
+        )
+        publish_notifications([n])
+        connection.close()
+        return n.id
+
+    async def scenario():
+        r = await AsyncClient().get(f"/api/notifications/stream/?token={token}")
+        assert r.status_code == 200
+        assert r["Content-Type"] == "text/event-stream"
+        chunks = r.streaming_content
+        try:
+            first = await chunks.__anext__()
+            assert first.startswith(b"retry: ")
+            assert _events(first) == [("unread", {"unread": 1})]
+
+            new_id = await sync_to_async(notify)()
+            event, data = _events(await asyncio.wait_for(chunks.__anext__(), 5))[0]
+            assert event == "notification"
+            assert data["id"] == new_id and data["unread"] == 2
+        finally:
+            await chunks.aclose()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_stream_reads_the_session(settings):
+    # SERVED BY STREAMROUTER, WHICH LOADS THE SESSION ITSELF
+    settings.PUBSUB_BACKEND = "local"
+    user = baker.make(User, username="reader")
+    baker.make(Notification, user=user, type="thread_reply", payload={})
+    client = Client()
+    client.force_login(user)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    async def scenario(headers):
+        sent = asyncio.Queue()
+
+        async def receive():
+            await asyncio.sleep(60)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/notifications/stream/",
+            "query_string": b"",
+            "headers": headers,
+        }
+        task = asyncio.ensure_future(application(scope, receive, sent.put))
+        try:
+            start = await asyncio.wait_for(sent.get(), 5)
+            if start["status"] != 200:
+                return start["status"], None
+            return 200, _events((await asyncio.wait_for(sent.get(), 5))["body"])
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    assert asyncio.run(scenario([])) == (401, None)
+    opened = asyncio.run(scenario([(b"cookie", cookie.encode())]))
+    assert opened == (200, [("unread", {"unread": 1})])
@@ -4,6 +4,10 @@ import pytest
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 
+from forum.models import Thread
+from users.models import Notification
+from users.outbox import drain_all
+
 User = get_user_model()
 
 
@@ -25,6 +29,7 @@ def test_notifications_on_thread_reply_and_mentions():
     p = client.post(
         f"/api/threads/{t['slug']}/posts/", {"body": "Hi @other"}, format="json"
     ).json()
+    drain_all()
 
     # AUTHOR SHOULD HAVE A THREAD_REPLY NOTIFICATION; OTHER SHOULD HAVE MENTION
 
@@ -59,6 +64,7 @@ def test_notifications_on_profile_comment():
         "/api/users/owner/comments/", {"body": "Hello @owner"}, format="json"
     )
     assert r.status_code == 201
+    drain_all()
 
     client.force_authenticate(user=owner)
     n = client.get("/api/notifications/?unread=1").json()
@@ -78,3 +84,26 @@ def test_notifications_on_profile_comment():
             and mp.get("username") == "owner"
             and mp.get("comment_id")
         )
+
+
+@pytest.mark.django_db
+def test_payload_is_served_as_an_object_and_queryable():
+    owner = User.objects.create_user(username="owner", password="x")
+    replier = User.objects.create_user(username="replier", password="x")
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    t = client.post("/api/threads/", {"title": "Hello"}, format="json").json()
+    client.force_authenticate(user=replier)
+    client.post(f"/api/threads/{t['slug']}/posts/", {"body": "hi"}, format="json")
+    drain_all()
+
+    client.force_authenticate(user=owner)
+    (n,) = client.get("/api/notifications/").json()
+    assert n["payload"]["thread_slug"] == t["slug"]
+    assert n["payload"]["actor"] == "replier"
+    assert Notification.objects.filter(payload__actor="replier").count() == 1
+
+    # DELETING THE THREAD DROPS NOTIFICATIONS THAT LINK INTO IT
+
+    Thread.objects.get(slug=t["slug"]).delete()
+    assert not Notification.objects.filter(payload__thread_slug=t["slug"]).exists()
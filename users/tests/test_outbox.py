@@ -0,0 +1,133 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Thread
+from users import outbox
+from users.models import Notification, OutboxEvent
+
+User = get_user_model()
+
+
+def _reply(thread, author, body):
+    client = APIClient()
+    client.force_authenticate(author)
+    r = client.post(f"/api/threads/{thread.slug}/posts/", {"body": body}, format="json")
+    assert r.status_code == 201
+    return r
+
+
+@pytest.mark.django_db
+def test_reply_records_one_event_and_no_notifications():
+    owner = baker.make(User, username="owner")
+    baker.make(User, username="a")
+    baker.make(User, username="b")
+    thread = baker.make(Thread, author=owner)
+    replier = baker.make(User)
+
+    with CaptureQueriesContext(connection) as ctx:
+        _reply(thread, replier, "hi @a @b @nobody")
+    assert not any("users_notification" in q["sql"] for q in ctx.captured_queries)
+    assert OutboxEvent.objects.filter(kind="post_created").count() == 1
+
+    # ONE BULK INSERT FOR THE WHOLE BATCH
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert outbox.drain_all() == 1
+    inserts = [
+        q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "users_')
+    ]
+    assert len(inserts) == 1
+    assert sorted(Notification.objects.values_list("type", flat=True)) == [
+        "mention",
+        "mention",
+        "thread_reply",
+    ]
+
+    # PROCESSED EXACTLY ONCE
+
+    assert outbox.drain_all() == 0
+    assert Notification.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_failing_event_is_retried_with_backoff(monkeypatch):
+    event = outbox.enqueue("post_created", post_id=1)
+
+    def boom(payload):
+        raise RuntimeError("down")
+
+    monkeypatch.setitem(outbox.HANDLERS, "post_created", boom)
+    outbox.drain_all()
+    event.refresh_from_db()
+    assert event.processed_at is None and event.attempts == 1
+    assert "down" in event.last_error
+    assert event.available_at > timezone.now()
+
+    # NOT DUE YET
+
+    assert outbox.drain_all() == 0
+
+    monkeypatch.undo()
+    OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+    outbox.drain_all()
+    event.refresh_from_db()
+    assert event.processed_at is not None
+
+
+@pytest.mark.django_db
+def test_failing_batch_write_falls_back_to_one_event_at_a_time(monkeypatch):
+    good = baker.make(Thread, author=baker.make(User))
+    bad = baker.make(Thread, author=baker.make(User))
+    _reply(good, baker.make(User), "fine")
+    _reply(bad, baker.make(User), "poison")
+    count_new = outbox.count_new
+
+    def fail_for_bad(fresh):
+        if any(n.user_id == bad.author_id for n in fresh):
+            raise RuntimeError("write failed")
+        count_new(fresh)
+
+    monkeypatch.setattr(outbox, "count_new", fail_for_bad)
+    assert outbox.drain() == 2
+
+    # THE GOOD EVENT WENT THROUGH; THE BAD ONE COUNTED AN ATTEMPT AND BACKS OFF
+    assert list(Notification.objects.values_list("user_id", flat=True)) == [
+        good.author_id
+    ]
+    failed = OutboxEvent.objects.get(processed_at__isnull=True)
+    assert failed.attempts == 1 and "write failed" in failed.last_error
+    assert failed.available_at > timezone.now()
+    assert outbox.drain() == 0
+
+
+@pytest.mark.django_db
+def test_event_gives_up_after_max_attempts(monkeypatch):
+    event = outbox.enqueue("unknown_kind")
+    for _ in range(outbox.MAX_ATTEMPTS):
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        outbox.drain_all()
+    event.refresh_from_db()
+    assert event.attempts == outbox.MAX_ATTEMPTS
+    assert event.processed_at is not None and "KeyError" in event.last_error
+
+
+@pytest.mark.django_db
+def test_drain_outbox_command_and_purge():
+    owner = baker.make(User)
+    thread = baker.make(Thread, author=owner)
+    _reply(thread, baker.make(User), "hello")
+
+    call_command("drain_outbox")
+    assert Notification.objects.filter(user=owner, type="thread_reply").exists()
+
+    OutboxEvent.objects.update(processed_at=timezone.now() - timedelta(days=30))
+    call_command("drain_outbox", "--purge")
+    assert not OutboxEvent.objects.exists()
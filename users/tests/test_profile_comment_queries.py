@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from users.models import ProfileComment, ProfileCommentEdit, ProfileCommentRating
+
+User = get_user_model()
+
+
+def _seed(owner, n, voter):
+    for _ in range(n):
+        comment = baker.make(
+            ProfileComment, profile=owner.profile, author=baker.make(User)
+        )
+        baker.make(ProfileCommentEdit, comment=comment)
+        baker.make(ProfileCommentRating, comment=comment, user=voter, value=1)
+        baker.make(ProfileCommentRating, comment=comment, value=1)
+
+
+def _get(client, url, params=None):
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get(url, params)
+    assert r.status_code == 200
+    return len(ctx.captured_queries), r.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("authenticated", [False, True])
+def test_comment_list_query_count_is_constant(authenticated):
+    voter = baker.make(User)
+    client = APIClient()
+    if authenticated:
+        client.force_authenticate(user=voter)
+
+    small = baker.make(User, username="small")
+    _seed(small, 2, voter)
+    large = baker.make(User, username="large")
+    _seed(large, 25, voter)
+
+    # WARM THE VIEWER'S CACHED MODERATION STATUS (USERS.MODERATION)
+    client.get("/api/threads/")
+
+    small_queries, _ = _get(client, "/api/users/small/comments/")
+    large_queries, data = _get(client, "/api/users/large/comments/")
+    assert small_queries == large_queries
+
+    assert len(data) == 25
+    for comment in data:
+        assert comment["score"] == 2
+        assert comment["edit_count"] == 1
+        assert comment["my_vote"] == (1 if authenticated else 0)
+
+
+@pytest.mark.django_db
+def test_comment_list_is_keyset_paginated():
+    voter = baker.make(User)
+    owner = baker.make(User, username="owner")
+    _seed(owner, 5, voter)
+    client = APIClient()
+    client.force_authenticate(user=voter)
+
+    _, page = _get(client, "/api/users/owner/comments/", {"page_size": 2})
+    seen = [c["id"] for c in page["results"]]
+    assert page["previous"] is None
+    while page["next"]:
+        _, page = _get(client, page["next"])
+        seen += [c["id"] for c in page["results"]]
+        assert all(c["my_vote"] == 1 for c in page["results"])
+
+    expected = list(
+        ProfileComment.objects.filter(profile=owner.profile)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+    assert seen == expected
+
+    r = client.get("/api/users/owner/comments/", {"cursor": "bogus"})
+    assert r.status_code == 404
@@ -0,0 +1,107 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Thread
+from users.models import Notification, UnreadCounter
+from users.outbox import drain_all
+
+User = get_user_model()
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def _unread(client):
+    return client.get("/api/notifications/unread_count/").json()["unread"]
+
+
+@pytest.mark.django_db
+def test_counter_follows_outbox_and_orm_writes():
+    owner = baker.make(User, username="owner")
+    thread = baker.make(Thread, author=owner)
+    replier = _client(baker.make(User))
+    for body in ("one", "two @owner"):
+        replier.post(
+            f"/api/threads/{thread.slug}/posts/", {"body": body}, format="json"
+        )
+    drain_all()
+
+    # THE TWO REPLIES COALESCE INTO ONE ROW; THE MENTION STAYS SEPARATE
+    client = _client(owner)
+    assert _unread(client) == Notification.objects.filter(user=owner).count() == 2
+
+    baker.make(Notification, user=owner, type="mention")
+    assert _unread(client) == 3
+    Notification.objects.filter(user=owner).first().delete()
+    assert _unread(client) == 2
+
+
+@pytest.mark.django_db
+def test_deleting_users_leaves_no_counter_behind():
+    one, many = baker.make(User, _quantity=2)
+    for user in (one, many):
+        baker.make(Notification, user=user, type="mention")
+
+    # ONE USER, AND A QUERYSET (THE ADMIN'S BULK DELETE)
+    one.delete()
+    User.objects.filter(pk=many.pk).delete()
+    assert not UnreadCounter.objects.filter(user_id__in=[one.pk, many.pk]).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_mark_read_is_one_update():
+    user = baker.make(User)
+    first, second, third = baker.make(Notification, user=user, _quantity=3)
+    client = _client(user)
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.post(
+            "/api/notifications/read/", {"ids": [first.id, second.id]}, format="json"
+        )
+    assert r.json() == {"updated": 2, "unread": 1}
+    writes = [
+        q["sql"]
+        for q in ctx.captured_queries
+        if q["sql"].startswith("UPDATE") and "users_notification" in q["sql"]
+    ]
+    assert len(writes) == 1
+
+    # ALREADY READ IDS ARE NOT COUNTED TWICE
+    r = client.post("/api/notifications/read/", {"ids": [first.id]}, format="json")
+    assert r.json() == {"updated": 0, "unread": 1}
+
+    r = client.post("/api/notifications/read/", {"all": True}, format="json")
+    assert r.json() == {"updated": 1, "unread": 0}
+    assert client.post("/api/notifications/read/", {}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_recount_notifications_reconciles_drift():
+    user = baker.make(User)
+    baker.make(Notification, user=user, _quantity=2)
+    UnreadCounter.objects.filter(user=user).update(unread=40)
+    call_command("recount_notifications")
+    assert UnreadCounter.objects.get(user=user).unread == 2
+
+
+@pytest.mark.django_db
+def test_inbox_is_keyset_paginated():
+    user = baker.make(User)
+    baker.make(Notification, user=user, _quantity=5)
+    client = _client(user)
+
+    page = client.get("/api/notifications/", {"page_size": 2}).json()
+    ids = [n["id"] for n in page["results"]]
+    while page["next"]:
+        page = client.get(page["next"]).json()
+        ids += [n["id"] for n in page["results"]]
+    assert ids == sorted(Notification.objects.values_list("id", flat=True))[::-1]
+    assert len(client.get("/api/notifications/").json()) == 5
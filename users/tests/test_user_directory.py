@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post
+from users import directory
+from users.directory import username_index
+
+User = get_user_model()
+
+
+def _names(**params):
+    r = APIClient().get("/api/users/", params)
+    assert r.status_code == 200
+    return [u["username"] for u in r.json()]
+
+
+@pytest.fixture
+def people():
+    old = timezone.now() - timedelta(days=30)
+    alice = baker.make(User, username="alice", date_joined=old)
+    baker.make(User, username="Alex", date_joined=old - timedelta(days=1))
+    baker.make(User, username="al_ghost", date_joined=old, is_active=False)
+    baker.make(User, username="bob", date_joined=old)
+    baker.make(User, username="alpha%", date_joined=old - timedelta(days=2))
+    return alice
+
+
+@pytest.mark.django_db
+def test_prefix_is_case_insensitive_and_ranked_by_activity(people):
+    assert _names(prefix="AL") == ["alice", "Alex", "alpha%"]
+
+    # POSTING MAKES A USER RECENTLY ACTIVE
+    baker.make(Post, author=User.objects.get(username="Alex"))
+    assert _names(prefix="@al") == ["Alex", "alice", "alpha%"]
+
+    # LIKE WILDCARDS IN THE PREFIX ARE LITERAL
+    assert _names(prefix="al%") == []
+    assert _names(prefix="alpha%") == ["alpha%"]
+    assert _names(prefix="al", limit=1) == ["Alex"]
+
+
+@pytest.mark.django_db
+def test_prefix_is_required():
+    r = APIClient().get("/api/users/")
+    assert r.status_code == 400
+    assert (
+        APIClient().get("/api/users/", {"prefix": "a", "limit": "x"}).status_code == 400
+    )
+
+
+@pytest.mark.django_db
+def test_lookup_is_one_query_without_profiles(people):
+    with CaptureQueriesContext(connection) as ctx:
+        _names(prefix="a")
+    sql = [q["sql"] for q in ctx.captured_queries]
+    assert not any("users_profile" in s for s in sql)
+    assert sum("auth_user" in s for s in sql) == 1
+
+
+@pytest.mark.django_db
+def test_in_memory_index_follows_user_changes(
+    people, settings, django_capture_on_commit_callbacks
+):
+    settings.USERNAME_INDEX_TTL = 60
+    username_index.invalidate()
+    assert _names(prefix="al") == ["alice", "Alex", "alpha%"]
+
+    # SERVED FROM MEMORY
+    with CaptureQueriesContext(connection) as ctx:
+        assert _names(prefix="ALI") == ["alice"]
+    assert not any("auth_user" in q["sql"] for q in ctx.captured_queries)
+
+    # SIGN-UPS, RENAMES AND DELETIONS ARE PATCHED IN, NOT REBUILT
+    with django_capture_on_commit_callbacks(execute=True):
+        people.username = "zed"
+        people.save()
+        baker.make(User, username="alicia")
+        User.objects.get(username="alpha%").delete()
+    with CaptureQueriesContext(connection) as ctx:
+        assert _names(prefix="ali") == ["alicia"]
+        assert _names(prefix="z") == ["zed"]
+        assert _names(prefix="al") == ["alicia", "Alex"]
+    assert not any("auth_user" in q["sql"] for q in ctx.captured_queries)
+
+    username_index.invalidate()
+
+
+@pytest.mark.django_db
+def test_sql_ranks_only_the_first_candidates(people, settings, monkeypatch):
+    # THE QUERY RANKS THE FIRST CANDIDATES MATCHES IN NAME ORDER; THE
+    # IN-MEMORY INDEX RANKS EVERY MATCH
+    monkeypatch.setattr(directory, "CANDIDATES", 2)
+    alpha = User.objects.get(username="alpha%")
+    baker.make(Post, author=alpha, thread__author=alpha)
+    assert _names(prefix="al") == ["alice", "Alex"]
+    assert _names(prefix="alp") == ["alpha%"]
+
+    settings.USERNAME_INDEX_TTL = 60
+    username_index.invalidate()
+    assert _names(prefix="al") == ["alpha%", "alice", "Alex"]
+    assert _names(prefix="a", limit=2) == ["alpha%", "alice"]
+    username_index.invalidate()
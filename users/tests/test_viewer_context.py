@@ -0,0 +1,94 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework.test import APIClient
+
+from forum.models import Post, Thread
+from users.models import ProfileComment
+
+User = get_user_model()
+
+
+def _profile_reads(ctx):
+    return [q for q in ctx.captured_queries if 'FROM "users_profile"' in q["sql"]]
+
+
+@pytest.fixture
+def world():
+    viewer = baker.make(User, username="viewer")
+    owner = baker.make(User, username="owner")
+    thread = baker.make(Thread, author=viewer)
+    post = baker.make(Post, thread=thread, author=viewer, body="hello")
+    baker.make(Post, thread=thread, author=owner, _quantity=3)
+    comment = baker.make(ProfileComment, profile=owner.profile, author=viewer)
+    return viewer, owner, thread, post, comment
+
+
+def _calls(thread, post, comment):
+    posts = f"/api/threads/{thread.slug}/posts/"
+    return [
+        ("get", "/api/threads/", None),
+        ("get", f"/api/threads/{thread.slug}/", None),
+        ("get", posts, None),
+        ("post", "/api/threads/", {"title": "new"}),
+        ("post", posts, {"body": "reply @owner"}),
+        ("patch", f"{posts}{post.id}/", {"body": "edited"}),
+        ("post", f"{posts}{post.id}/rate/", {"value": 1}),
+        ("get", "/api/users/owner/profile/", None),
+        ("get", "/api/users/me/profile/", None),
+        ("get", "/api/users/owner/comments/", None),
+        ("post", "/api/users/owner/comments/", {"body": "hi"}),
+        ("patch", f"/api/users/owner/comments/{comment.id}/", {"body": "hey"}),
+    ]
+
+
+@pytest.mark.django_db
+def test_each_api_endpoint_reads_users_profile_at_most_once(world):
+    viewer, owner, thread, post, comment = world
+    client = APIClient()
+    client.force_authenticate(viewer)
+
+    for method, url, data in _calls(thread, post, comment):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            r = getattr(client, method)(url, data, format="json")
+        assert r.status_code < 300, (method, url, r.status_code)
+        assert len(_profile_reads(ctx)) <= 1, (method, url)
+
+
+@pytest.mark.django_db
+def test_each_page_reads_users_profile_at_most_once(world):
+    viewer, owner, thread, post, comment = world
+    client = Client()
+    client.force_login(viewer)
+
+    for url in [
+        "/",
+        f"/t/{thread.slug}/",
+        f"/t/{thread.slug}/edit/",
+        "/u/owner/",
+        "/u/viewer/edit/",
+    ]:
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            r = client.get(url)
+        assert r.status_code == 200, url
+        assert len(_profile_reads(ctx)) <= 1, url
+
+
+@pytest.mark.django_db
+def test_warm_viewer_reads_no_profile(world, settings):
+    settings.SHARED_CACHE = True
+    viewer, owner, thread, post, comment = world
+    client = APIClient()
+    client.force_authenticate(viewer)
+    client.get("/api/threads/")
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.post("/api/threads/", {"title": "again"}, format="json")
+    assert r.status_code == 201
+    assert _profile_reads(ctx) == []
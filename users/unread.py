@@ -0,0 +1,72 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Notification, UnreadCounter
+
+# PER-USER UNREAD COUNTERS (USERS.MODELS.UNREADCOUNTER). SINGLE ORM INSERTS AND
+# DELETES ARE COUNTED BY USERS.SIGNALS; BULK WRITES (THE OUTBOX INSERT, MARK
+# READ) ADJUST HERE IN THE SAME TRANSACTION. `MANAGE.PY RECOUNT_NOTIFICATIONS`
+# RECONCILES ANY DRIFT.
+
+_ADJUST_SQL = """
+INSERT INTO users_unreadcounter (user_id, unread) VALUES (%s, GREATEST(%s, 0))
+ON CONFLICT (user_id) DO UPDATE
+SET unread = GREATEST(users_unreadcounter.unread + %s, 0)
+"""
+
+_RECOUNT_SQL = """
+INSERT INTO users_unreadcounter (user_id, unread)
+SELECT u.id, (
+    SELECT count(*) FROM users_notification n
+    WHERE n.user_id = u.id AND n.read_at IS NULL
+)
+FROM auth_user u
+WHERE u.id = ANY(%s)
+ON CONFLICT (user_id) DO UPDATE SET unread = EXCLUDED.unread
+"""
+
+
+def adjust(deltas):
+    """ADD ``{USER_ID: DELTA}`` TO THE COUNTERS, NEVER BELOW ZERO."""
+
+    # SORTED SO CONCURRENT CALLERS LOCK COUNTER ROWS IN THE SAME ORDER
+    rows = [(uid, n, n) for uid, n in sorted(deltas.items()) if n]
+    if rows:
+        with connection.cursor() as cursor:
+            cursor.executemany(_ADJUST_SQL, rows)
+
+
+def count_new(notifications):
+    deltas = {}
+    for n in notifications:
+        if n.read_at is None:
+            deltas[n.user_id] = deltas.get(n.user_id, 0) + 1
+    adjust(deltas)
+
+
+def unread_counts(user_ids):
+    counts = dict.fromkeys(user_ids, 0)
+    counts.update(
+        UnreadCounter.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "unread"
+        )
+    )
+    return counts
+
+
+def mark_read(user_id, ids=None):
+    """MARK THE USER'S UNREAD NOTIFICATIONS (ALL, OR ``IDS``) READ IN ONE UPDATE."""
+
+    with transaction.atomic():
+        qs = Notification.objects.filter(user_id=user_id, read_at__isnull=True)
+        if ids is not None:
+            qs = qs.filter(id__in=ids)
+        updated = qs.update(read_at=timezone.now())
+        adjust({user_id: -updated})
+    return updated
+
+
+def reconcile(user_ids):
+    with connection.cursor() as cursor:
+        cursor.execute(_RECOUNT_SQL, [list(user_ids)])
+        return cursor.rowcount
@@ -0,0 +1,83 @@
+from .moderation import (
+    NOT_MODERATED,
+    cached_moderation_status,
+    remember_moderation_status,
+)
+
+
+class Viewer:
+    """
+    WHO IS MAKING THE REQUEST: IDENTITY, STAFF FLAGS, BAN/SILENCE STATE AND
+    (ON DEMAND) THE PROFILE. BUILT ONCE PER REQUEST BY ``GET_VIEWER``; THE
+    PROFILE ROW IS READ AT MOST ONCE, AND NOT AT ALL WHILE THE MODERATION
+    STATUS IS CACHED (SETTINGS.SHARED_CACHE) AND NOTHING ASKS FOR THE PROFILE
+    ITSELF.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.is_authenticated = bool(getattr(user, "is_authenticated", False))
+        self.id = user.pk if self.is_authenticated else None
+        self.username = user.username if self.is_authenticated else ""
+        self.is_staff = self.is_authenticated and user.is_staff
+        self.is_superuser = self.is_authenticated and user.is_superuser
+        self._profile = None
+        self._profile_loaded = False
+        if not self.is_authenticated:
+            self.moderation = NOT_MODERATED
+            return
+        status = cached_moderation_status(self.id)
+        if status is None:
+            status = remember_moderation_status(self.id, self.profile)
+        self.moderation = status
+
+    @property
+    def profile(self):
+        if not self._profile_loaded and self.is_authenticated:
+            self._profile = self._load_profile()
+            self._profile_loaded = True
+        return self._profile
+
+    def _load_profile(self):
+        from django.contrib.auth import get_user_model
+
+        from .models import Profile
+
+        # ALWAYS A FRESH ROW; IT ALSO SERVES LATER REQUEST.USER.PROFILE READS
+        profile = Profile.objects.filter(user_id=self.id).first()
+        if profile is not None:
+            get_user_model().profile.related.set_cached_value(self.user, profile)
+        return profile
+
+    @property
+    def is_admin(self):
+        return self.is_staff or self.is_superuser
+
+    @property
+    def is_banned(self):
+        return self.moderation.is_banned
+
+    @property
+    def is_silenced(self):
+        return self.moderation.is_silenced
+
+    def can_manage(self, owner_id):
+        # OWNERS AND ADMINS MAY EDIT/DELETE
+        return self.is_authenticated and (self.is_admin or self.id == owner_id)
+
+
+def get_viewer(request):
+    """
+    THE VIEWER FOR ``REQUEST`` (DJANGO OR DRF), CACHED AS ``REQUEST.VIEWER``.
+    DRF AUTHENTICATES LATER THAN MIDDLEWARE (JWT), SO A VIEWER BUILT FOR A
+    DIFFERENT USER IS REPLACED.
+    """
+
+    user = getattr(request, "user", None)
+    http = getattr(request, "_request", request)
+    viewer = http.__dict__.get("viewer")
+    pk = user.pk if getattr(user, "is_authenticated", False) else None
+    if viewer is None or viewer.id != pk:
+        viewer = Viewer(user)
+        http.viewer = viewer
+    return viewer
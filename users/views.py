@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .directory import DEFAULT_LIMIT, search_usernames
 from .serializers import RegisterSerializer, UserSerializer
 
 
@@ -28,3 +29,29 @@ class MeView(APIView):
 
     def get(self, request):
         return Response(UserSerializer(request.user).data)
+
+
+class UserDirectoryView(APIView):
+    """
+    GET /API/USERS/?PREFIX=<START OF A USERNAME>&LIMIT=<N>
+
+    CASE-INSENSITIVE PREFIX MATCH FOR @MENTION AUTOCOMPLETE; A LEADING "@" IS
+    IGNORED. AT MOST 25 USERS, MOST RECENTLY ACTIVE FIRST (USERS.DIRECTORY).
+    """
+
+    def get(self, request):
+        prefix = (request.query_params.get("prefix") or "").strip().lstrip("@")
+        if not prefix:
+            return Response(
+                {"detail": "prefix is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(prefix) > 150:
+            return Response([])
+        try:
+            limit = int(request.query_params.get("limit") or DEFAULT_LIMIT)
+        except ValueError:
+            return Response(
+                {"detail": "limit must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(search_usernames(prefix, limit))